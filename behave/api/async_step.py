@@ -35,6 +35,12 @@ EXAMPLE:
         yield from asyncio.sleep(duration)
 
 
+.. note::
+
+    With option ``--async-runtime``, the async-steps use the event loop
+    of the test run (if no event loop or async-context is specified).
+    See :mod:`behave.async_runtime`.
+
 .. requires:: Python 3.5 (or 3.4) or :mod:`asyncio` backport (like :pypi:`trollius`)
 .. seealso::
     https://docs.python.org/3/library/asyncio.html
@@ -48,6 +54,7 @@ from __future__ import print_function
 # MAYBE BACKPORT: trollius
 import functools
 from six import string_types
+from behave.async_runtime import get_async_runtime
 try:
     import asyncio
     has_asyncio = True
@@ -115,6 +122,11 @@ def async_run_until_complete(astep_func=None, loop=None, timeout=None,
             else:
                 assert isinstance(async_context, AsyncContext)
                 loop = async_context.loop
+        async_runtime = get_async_runtime(context)
+        if loop is None and async_runtime is not None:
+            # -- ASYNC-RUNTIME: Use the event loop of the test run.
+            async_runtime.run(astep_func(context, *args, **kwargs), timeout)
+            return
         if loop is None:
             loop = asyncio.get_event_loop() or asyncio.new_event_loop()
 
@@ -134,7 +146,8 @@ def async_run_until_complete(astep_func=None, loop=None, timeout=None,
                 if exception:
                     raise exception
         finally:
-            if loop and should_close:
+            if loop and should_close and not (async_runtime and
+                                              loop is async_runtime.loop):
                 # -- MAYBE-AVOID:
                 loop.close()
 
@@ -275,11 +288,23 @@ def use_or_create_async_context(context, name=None, loop=None, **kwargs):
     :param loop:        Optional event_loop object to use for create call.
     :param kwargs:      Optional :class:`AsyncContext` params for create call.
     :return: :class:`AsyncContext` object from the param:`context`.
+
+    .. note::
+
+        With an async runtime (``--async-runtime``, ``--async-scenarios``),
+        a new :class:`AsyncContext` uses the event loop of the test run
+        (if no event loop is provided).
     """
     if name is None:
         name = AsyncContext.default_name
     async_context = getattr(context, name, None)
     if async_context is None:
+        async_runtime = None
+        if loop is None:
+            async_runtime = get_async_runtime(context)
+        if async_runtime is not None:
+            # -- SCENARIO THREAD: Has no current event loop.
+            loop = async_runtime.select_context_loop()
         async_context = AsyncContext(loop=loop, name=name, **kwargs)
         setattr(context, async_context.name, async_context)
     assert isinstance(async_context, AsyncContext)
@@ -0,0 +1,262 @@
+# -*- coding: UTF-8 -*-
+"""
+Provides one :mod:`asyncio` event loop for a whole test run
+(option: ``--async-runtime``).
+
+The runner starts the event loop before the ``before_all()`` hook and closes
+it after the ``after_all()`` hook. The event loop is the current event loop
+of the test run (and provided as ``context.async_runtime.loop``):
+
+* Coroutine steps (``async def`` step functions, with or without the
+  :func:`behave.api.async_step.async_run_until_complete` decorator)
+  are run until completion on this event loop.
+* Coroutine hooks (``async def before_scenario(context, scenario)``, ...)
+  in ``environment.py`` are run until completion on this event loop.
+* Background tasks (that are created on this event loop, for example with
+  an :class:`behave.api.async_step.AsyncContext`) are kept running over
+  the whole test run. They make progress while a coroutine step/hook
+  awaits something and after each step/hook.
+
+.. code-block:: python
+
+    # -- FILE: features/environment.py
+    async def before_all(context):
+        context.instrument = await connect_instrument()
+        context.samples = []
+        context.async_runtime.loop.create_task(
+            read_samples(context.instrument, context.samples))
+
+.. note::
+
+    The event loop runs in the thread of the runner (except with
+    ``--async-scenarios``, see :class:`ThreadedAsyncRuntime`). A blocking (non-async)
+    step blocks the background tasks until it is finished. Remaining tasks
+    are cancelled when the test run is finished.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import inspect
+import threading
+import warnings
+try:
+    import asyncio
+    import concurrent.futures
+    has_asyncio = True
+except ImportError:
+    has_asyncio = False
+
+
+def is_awaitable(value):
+    """Indicates if a value is a coroutine (or another awaitable)."""
+    if value is None or not has_asyncio:
+        return False
+    if hasattr(inspect, "isawaitable"):
+        # -- SINCE: Python 3.5
+        return inspect.isawaitable(value)
+    return asyncio.iscoroutine(value) or isinstance(value, asyncio.Future)
+
+
+def get_async_runtime(context):
+    """Provides the async runtime of the runner of a context
+    (or None, if no async runtime is used).
+    """
+    runner = getattr(context, "_runner", None)
+    try:
+        async_runtime = getattr(runner, "async_runtime", None)
+    except ReferenceError:
+        # -- RUNNER (weak reference) NO LONGER EXISTS:
+        return None
+    if isinstance(async_runtime, AsyncRuntime):
+        return async_runtime
+    return None
+
+
+class AsyncRuntime(object):
+    """Owns the event loop of a test run (while it is started)."""
+
+    def __init__(self):
+        self.loop = None
+        self.old_loop = None
+
+    def start(self):
+        """Creates the event loop (as current event loop of this thread)."""
+        assert has_asyncio, "REQUIRES: asyncio"
+        self.old_loop = self.select_current_loop()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    @staticmethod
+    def select_current_loop():
+        """Provides the current event loop of this thread (or None)."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            try:
+                return asyncio.get_event_loop()
+            except RuntimeError:
+                return None
+
+    def select_context_loop(self):
+        """Provides the event loop for an async-context of a step or hook
+        (see :class:`behave.api.async_step.AsyncContext`).
+        """
+        return self.loop
+
+    def run(self, awaitable, timeout=None):
+        """Runs a coroutine (or awaitable) until completion (or timeout).
+        The background tasks make progress meanwhile.
+
+        :return: Result of the coroutine.
+        :raises AssertionError: If the timeout occurs.
+        """
+        if timeout is not None:
+            awaitable = asyncio.wait_for(awaitable, timeout)
+        try:
+            return self.loop.run_until_complete(awaitable)
+        except asyncio.TimeoutError:
+            if timeout is None:
+                raise
+            raise AssertionError("TIMEOUT-OCCURED: timeout=%s" % timeout)
+
+    def run_pending(self):
+        """Lets the background tasks make progress (without waiting)."""
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def complete(self, result):
+        """Completes the result of a step/hook function: A coroutine is run
+        until completion. Otherwise, the background tasks make progress.
+        """
+        if is_awaitable(result):
+            return self.run(result)
+        self.run_pending()
+        return result
+
+    def select_tasks(self):
+        if hasattr(asyncio, "all_tasks"):
+            # -- SINCE: Python 3.7
+            return asyncio.all_tasks(self.loop)
+        return asyncio.Task.all_tasks(self.loop)
+
+    def stop(self):
+        """Cancels the remaining tasks and closes the event loop."""
+        if self.loop is None:
+            return
+
+        loop = self.loop
+        try:
+            tasks = [task for task in self.select_tasks() if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks,
+                                                       return_exceptions=True))
+            if hasattr(loop, "shutdown_asyncgens"):
+                loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            # -- RESTORE: Event loop that was used before the test run.
+            asyncio.set_event_loop(self.old_loop)
+            loop.close()
+            self.loop = None
+            self.old_loop = None
+
+
+class ThreadedAsyncRuntime(AsyncRuntime):
+    """Runs the event loop of a test run in its own thread
+    (option: ``--async-scenarios``, see :mod:`behave.async_scenarios`).
+    Coroutines of several threads are run concurrently on this event loop.
+    The event loop keeps running while the caller of :meth:`run()` waits.
+    """
+
+    def __init__(self):
+        super(ThreadedAsyncRuntime, self).__init__()
+        self.thread = None
+
+    def start(self):
+        """Creates the event loop and starts its thread."""
+        assert has_asyncio, "REQUIRES: asyncio"
+        self.old_loop = self.select_current_loop()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_forever,
+                                       name="behave-event-loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def select_context_loop(self):
+        """Provides the event loop (proxy) for an async-context of a step
+        or hook in another thread (that has no current event loop).
+        """
+        return ThreadedEventLoop(self)
+
+    def run(self, awaitable, timeout=None):
+        """Runs a coroutine (or awaitable) on the event loop thread and
+        waits until it is completed (or the timeout occurs).
+
+        :return: Result of the coroutine.
+        :raises AssertionError: If the timeout occurs.
+        """
+        # -- HINT: wait_for() provides a coroutine for any awaitable.
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(awaitable, timeout), self.loop)
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            if timeout is None:
+                raise
+            raise AssertionError("TIMEOUT-OCCURED: timeout=%s" % timeout)
+
+    def run_pending(self):
+        """Nothing to do: The background tasks make progress in the
+        event loop thread.
+        """
+
+    def stop(self):
+        """Stops the event loop thread, cancels the remaining tasks and
+        closes the event loop.
+        """
+        if self.loop is None:
+            return
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+        super(ThreadedAsyncRuntime, self).stop()
+
+
+class ThreadedEventLoop(object):
+    """Provides the event loop of a :class:`ThreadedAsyncRuntime` to the
+    other threads (for example: to an async-context of a scenario thread).
+    Tasks are created in the event loop thread. :meth:`run_until_complete()`
+    waits until the event loop thread has completed the coroutine.
+    Other attributes are provided by the event loop itself.
+    """
+
+    def __init__(self, async_runtime):
+        self.async_runtime = async_runtime
+
+    def __getattr__(self, name):
+        return getattr(self.async_runtime.loop, name)
+
+    def create_task(self, coro):
+        loop = self.async_runtime.loop
+        if threading.current_thread() is self.async_runtime.thread:
+            return loop.create_task(coro)
+
+        future = concurrent.futures.Future()
+        loop.call_soon_threadsafe(
+            lambda: future.set_result(loop.create_task(coro)))
+        return future.result()
+
+    def run_until_complete(self, awaitable):
+        return self.async_runtime.run(awaitable)
+
+    def is_closed(self):
+        loop = self.async_runtime.loop
+        return loop is None or loop.is_closed()
+
+    def close(self):
+        """Nothing to do: The async runtime closes its event loop."""
@@ -0,0 +1,292 @@
+# -*- coding: UTF-8 -*-
+"""
+Runs up to K scenarios concurrently in one process
+(option: ``--async-scenarios=K``).
+
+This mode is intended for I/O-bound test suites that talk to many
+instruments or services (over sockets, ...) where worker processes
+(see :mod:`behave.parallel`) are too heavy.
+
+The work units (scenarios or, with ``--parallel-unit=feature``, features)
+are run by K scenario threads of this process. Coroutine steps and hooks
+(``async def`` functions, with or without the
+:func:`behave.api.async_step.async_run_until_complete` decorator)
+are awaited on one shared event loop (see
+:class:`behave.async_runtime.ThreadedAsyncRuntime`). While a scenario awaits
+a coroutine step, the other scenarios make progress.
+
+.. code-block:: sh
+
+    behave --async-scenarios=8 --format=pretty features/
+
+* The ``before_all()`` and ``after_all()`` hooks are run once
+  (in the main thread). The scenario threads inherit the attributes of
+  the root context layer (like: ``context.instrument``).
+* Each scenario thread has its own :class:`behave.runner.Context`
+  (with its own layer stack). The parsed features are shared (read-only)
+  by the scenario threads: A scenario thread only copies the feature of
+  its current work unit (for the run-time state of its run).
+* The captured output (stdout, stderr, logging) is collected per scenario:
+  While the scenario threads run, the ``sys.stdout``/``sys.stderr`` streams
+  (if their output is captured) and the logging handler route the output
+  to the capture of the current scenario (by using :mod:`contextvars`,
+  that are inherited by the coroutine steps). Output of other threads
+  is passed through. The original streams are restored afterwards.
+* An :class:`behave.api.async_step.AsyncContext` (that is created with
+  :func:`behave.api.async_step.use_or_create_async_context`) uses the
+  shared event loop, too (see :class:`behave.async_runtime.ThreadedEventLoop`).
+* The results are reported in the order of the features (like in a
+  serial run, see :mod:`behave.parallel`).
+
+.. note::
+
+    A blocking (non-async) step only blocks its own scenario thread.
+    But the step implementations must be thread-safe if they share state
+    (for example: with the ``before_all()`` hook).
+
+.. requires:: Python >= 3.7 (for :mod:`contextvars`)
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import copy
+import logging
+import sys
+import threading
+from six.moves.queue import Queue
+from behave.async_runtime import ThreadedAsyncRuntime, has_asyncio
+from behave.capture import CaptureController
+from behave.exception import ConfigError
+from behave.parallel import ParallelRunner, ParallelWorker, run_parallel_worker
+from behave.runner import Context, ModelRunner
+try:
+    import contextvars
+    current_capture = contextvars.ContextVar("behave_current_capture",
+                                             default=None)
+except ImportError:
+    contextvars = None
+    current_capture = None
+
+
+# -----------------------------------------------------------------------------
+# CAPTURE PER SCENARIO:
+# -----------------------------------------------------------------------------
+class ContextCaptureStream(object):
+    """Replaces ``sys.stdout`` (or ``sys.stderr``) while scenarios run
+    concurrently. Writes the output to the capture stream of the current
+    scenario (or to the original stream, if its output is not captured).
+    """
+
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.name = name    # -- CAPTURE STREAM: "stdout_capture", ...
+
+    def select_stream(self):
+        capture_controller = current_capture.get()
+        capture_stream = getattr(capture_controller, self.name, None)
+        if capture_stream is not None:
+            return capture_stream
+        return self.stream
+
+    def write(self, text):
+        return self.select_stream().write(text)
+
+    def flush(self):
+        self.select_stream().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.select_stream(), name)
+
+
+class ContextLogHandler(logging.Handler):
+    """Routes the log records to the log capture of the current scenario."""
+
+    def emit(self, record):
+        capture_controller = current_capture.get()
+        log_capture = getattr(capture_controller, "log_capture", None)
+        if log_capture is not None and record.levelno >= log_capture.level:
+            log_capture.handle(record)
+
+
+def is_not_routed(record):
+    """Log record filter: Log records of scenarios are captured per scenario
+    (and not by the log capture of the main thread).
+    """
+    # pylint: disable=unused-argument
+    return current_capture.get() is None
+
+
+class ContextCaptureController(CaptureController):
+    """Capture controller of a scenario thread. While the output is captured,
+    it is the current capture of its scenario thread (and of the coroutine
+    steps that it awaits). The ``sys.stdout`` and ``sys.stderr`` streams and
+    the logging handler are only replaced once (by the
+    :class:`AsyncScenarioRunner`).
+    """
+
+    def install_log_capture(self):
+        """Nothing to do: The log records are routed to this log capture
+        (by the :class:`ContextLogHandler`).
+        """
+
+    def start_capture(self):
+        current_capture.set(self)
+
+    def stop_capture(self):
+        current_capture.set(None)
+
+
+# -----------------------------------------------------------------------------
+# SCENARIO THREADS:
+# -----------------------------------------------------------------------------
+def copy_root_attributes(context, other):
+    """Provides the attributes of the root layer of the other context
+    (set by the ``before_all()`` hook, ...) in a context.
+    """
+    # pylint: disable=protected-access
+    for name, value in other._root.items():
+        if name.startswith("@") or name == "config":
+            continue
+        context._set_root_attribute(name, value)
+        if name in other._origin:
+            context._origin[name] = other._origin[name]
+
+
+class ScenarioThreadWorker(ParallelWorker):
+    """Worker of a scenario thread. The features are shared with the other
+    scenario threads (and the main thread, that reports them). Therefore,
+    the feature of a work unit is copied before it is run (the copy is
+    reused for the next work units of the same feature).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ScenarioThreadWorker, self).__init__(*args, **kwargs)
+        self.feature_copy = (None, None)
+
+    def select_feature(self, features, feature_index):
+        copied_index, feature = self.feature_copy
+        if copied_index != feature_index:
+            feature = copy.deepcopy(features[feature_index])
+            self.feature_copy = (feature_index, feature)
+        return feature
+
+
+class ThreadRunner(object):
+    """Creates the runner of a scenario thread that shares the step registry,
+    hooks, async runtime and root context attributes of the main runner.
+    """
+
+    def __init__(self, runner, features):
+        self.runner = runner
+        self.features = features
+
+    def make_runner(self):
+        main_runner = self.runner
+        config = copy.copy(main_runner.config)
+        # -- MEMORY TRACKING: Is process-wide (not per scenario thread).
+        config.memory_report = False
+        config.max_worker_memory = None
+        runner = ModelRunner(config, step_registry=main_runner.step_registry)
+        runner.hooks = main_runner.hooks
+        runner.async_runtime = main_runner.async_runtime
+        runner.capture_controller = ContextCaptureController(config)
+        runner.context = Context(runner)
+        copy_root_attributes(runner.context, main_runner.context)
+        return runner
+
+    def run(self, runner):
+        return runner.run_model(self.features)
+
+
+class AsyncScenarioRunner(ParallelRunner):
+    """Runs the work units of a runner in K scenario threads of this process
+    (instead of worker processes) and awaits their coroutine steps on one
+    shared event loop.
+    """
+
+    def __init__(self, runner, concurrency):
+        if not (has_asyncio and contextvars):
+            raise ConfigError("--async-scenarios: Requires Python >= 3.7")
+        super(AsyncScenarioRunner, self).__init__(runner, concurrency)
+        if getattr(runner.config, "parallel_unit", None) is None:
+            self.parallel_unit = "scenario"
+        # -- SCENARIO THREADS: Inherit the state of before_all() (like the
+        #    workers of a fork-server) and are never recycled.
+        self.fork_server = True
+        self.max_scenarios = None
+        self.max_memory = None
+        self.old_streams = None
+        self.log_handler = None
+
+    def start_workers(self, features):
+        result_queue = Queue()
+        stop_event = threading.Event()
+        self.worker_setup = (None, features, result_queue, stop_event)
+        self.install_capture_routing()
+        self.processes = []
+        self.task_queues = []
+        for worker_id in range(self.jobs):
+            self.task_queues.append(Queue())
+            self.processes.append(None)
+            self.start_worker(worker_id)
+        return result_queue, stop_event
+
+    def start_worker(self, worker_id):
+        """Starts the scenario thread of a worker (with its task queue)."""
+        _, features, result_queue, stop_event = self.worker_setup
+        worker = ScenarioThreadWorker(worker_id, self.task_queues[worker_id],
+                                      result_queue, stop_event,
+                                      inherits_hooks=True)
+        thread = threading.Thread(target=run_parallel_worker,
+                                  args=(worker, ThreadRunner(self.runner,
+                                                             features)),
+                                  name="behave-scenarios-%d" % worker_id)
+        thread.daemon = True
+        thread.start()
+        self.processes[worker_id] = thread
+
+    def install_capture_routing(self):
+        """Routes the output of the scenario threads to the capture
+        controller of the current scenario. Only the streams whose output
+        is captured are replaced (until :meth:`uninstall_capture_routing()`).
+        """
+        config = self.runner.config
+        self.old_streams = (sys.stdout, sys.stderr)
+        if config.stdout_capture:
+            sys.stdout = ContextCaptureStream(sys.stdout, "stdout_capture")
+        if config.stderr_capture:
+            sys.stderr = ContextCaptureStream(sys.stderr, "stderr_capture")
+        if config.log_capture:
+            self.log_handler = ContextLogHandler()
+            logging.getLogger().addHandler(self.log_handler)
+            main_log_capture = self.runner.capture_controller.log_capture
+            if main_log_capture is not None:
+                main_log_capture.addFilter(is_not_routed)
+
+    def uninstall_capture_routing(self):
+        if self.old_streams is not None:
+            sys.stdout, sys.stderr = self.old_streams
+            self.old_streams = None
+        if self.log_handler is not None:
+            logging.getLogger().removeHandler(self.log_handler)
+            self.log_handler = None
+            main_log_capture = self.runner.capture_controller.log_capture
+            if main_log_capture is not None:
+                main_log_capture.removeFilter(is_not_routed)
+
+    def run_model(self, features):
+        # pylint: disable=protected-access
+        runner = self.runner
+        if not runner.context:
+            runner.context = Context(runner)
+        async_runtime = ThreadedAsyncRuntime()
+        async_runtime.start()
+        runner.async_runtime = async_runtime
+        runner.context._set_root_attribute("async_runtime", async_runtime)
+        try:
+            return super(AsyncScenarioRunner, self).run_model(features)
+        finally:
+            # -- RESTORE: Streams and logging handler (even on errors).
+            self.uninstall_capture_routing()
+            runner.async_runtime = None
+            async_runtime.stop()
@@ -4,8 +4,14 @@ Capture output (stdout, stderr), logs, etc.
 """
 
 from __future__ import absolute_import
+from collections import deque
 from contextlib import contextmanager
+import codecs
+import io
+import os
 import sys
+import tempfile
+import six
 from six import StringIO, PY2
 from behave.log_capture import LoggingCapture
 from behave.textutil import text as _text
@@ -21,6 +27,255 @@ def add_text_to(value, more_text, separator="\n"):
     return value
 
 
+def iter_text_chunks(value):
+    """Provides the text chunks of a captured output part
+    (text or :class:`CapturedTextFile`).
+    """
+    iter_chunks = getattr(value, "iter_chunks", None)
+    if iter_chunks is not None:
+        return iter_chunks()
+    return iter([_text(value)])
+
+
+def iter_rstripped(chunks):
+    """Strips trailing whitespace from a stream of text chunks."""
+    pending_whitespace = u""
+    for chunk in chunks:
+        stripped = chunk.rstrip()
+        if stripped:
+            yield pending_whitespace + stripped
+            pending_whitespace = chunk[len(stripped):]
+        else:
+            pending_whitespace += chunk
+
+
+def iter_joined(parts, separator):
+    """Joins parts (text or iterator of text chunks) as stream of chunks."""
+    for index, part in enumerate(parts):
+        if index:
+            yield separator
+        if isinstance(part, six.string_types):
+            yield part
+        else:
+            for chunk in part:
+                yield chunk
+
+
+class SpillFile(object):
+    """Temporary file that stores the spilled output of a capture stream.
+    The file is only kept open while output is written to it. Views of the
+    spilled output reopen it (by path) when they are read. The file is
+    removed when it is no longer used (by its capture stream or any view).
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix="behave-capture-")
+        self.writer = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        self.writer.write(data)
+
+    def open(self):
+        if self.writer is not None:
+            self.writer.flush()
+        return io.open(self.path, "rb")
+
+    def close(self):
+        """Closes the file for writing (views can still read it)."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except (OSError, TypeError):
+            pass    # -- ALREADY REMOVED (or: at interpreter shutdown).
+
+    def __del__(self):
+        self.remove()
+
+
+class CapturedTextFile(object):
+    """Read-only view of captured text that was spilled to a temporary file.
+    The view covers the text that was written before the view was created.
+    The file is only opened while the captured text is read.
+    """
+    chunk_size = 64 * 1024
+    encoding = "utf-8"
+
+    def __init__(self, spill_file, size):
+        self.spill_file = spill_file
+        self.size = size    # -- IN BYTES.
+
+    def iter_chunks(self):
+        """Reads the captured text in chunks (without loading all of it)."""
+        decoder = codecs.getincrementaldecoder(self.encoding)("replace")
+        position = 0
+        with self.spill_file.open() as f:
+            while position < self.size:
+                data = f.read(min(self.chunk_size, self.size - position))
+                if not data:
+                    break
+                position += len(data)
+                chunk = decoder.decode(data, final=position >= self.size)
+                if chunk:
+                    yield chunk
+
+    def getvalue(self):
+        return u"".join(self.iter_chunks())
+
+    def rstrip(self):
+        return self.getvalue().rstrip()
+
+    def __bool__(self):
+        return self.size > 0
+
+    if PY2:
+        __nonzero__ = __bool__
+        __unicode__ = getvalue
+    else:
+        __str__ = getvalue
+
+
+class BoundedCaptureStream(io.TextIOBase):
+    """Capture stream whose in-memory size is bounded by a limit
+    (in characters). Output beyond the limit is either:
+
+    * "spill": stored in a temporary file (complete output is kept), or
+    * "head_tail": dropped, except for a head and a tail window
+      (each one with half of the limit).
+    """
+    overflow_modes = ("spill", "head_tail")
+    omitted_marker = u"\n... [%d characters omitted] ...\n"
+
+    def __init__(self, limit, overflow=None):
+        super(BoundedCaptureStream, self).__init__()
+        if overflow is None:
+            overflow = self.overflow_modes[0]
+        assert limit > 0, "REQUIRE: limit > 0, but: %r" % limit
+        assert overflow in self.overflow_modes, "UNKNOWN: %s" % overflow
+        self.limit = limit
+        self.overflow = overflow
+        self.size = 0
+        self.omitted_size = 0
+        self._memory = []
+        self._memory_size = 0
+        self._spill_file = None
+        self._spill_size = 0
+        self._tail = deque()
+        self._tail_size = 0
+
+    @property
+    def spilled(self):
+        return self._spill_file is not None
+
+    def reset(self):
+        """Discards the captured output (to reuse this stream).
+        NOTE: Views of the spilled output remain valid.
+        """
+        if self._spill_file is not None:
+            # -- RELEASE FILE DESCRIPTOR: Views reopen the file by path.
+            self._spill_file.close()
+        self.size = 0
+        self.omitted_size = 0
+        self._memory = []
+        self._memory_size = 0
+        self._spill_file = None
+        self._spill_size = 0
+        self._tail = deque()
+        self._tail_size = 0
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.reset()
+        super(BoundedCaptureStream, self).close()
+
+    def write(self, text):
+        if not isinstance(text, six.text_type):
+            text = _text(text)
+        if not text:
+            return 0
+        self.size += len(text)
+        if self._spill_file is not None:
+            self._write_spill_file(text)
+        elif self._memory_size + len(text) <= self.limit:
+            self._memory.append(text)
+            self._memory_size += len(text)
+        elif self.overflow == "spill":
+            self._spill_file = SpillFile()
+            for chunk in self._memory:
+                self._write_spill_file(chunk)
+            self._memory = []
+            self._memory_size = 0
+            self._write_spill_file(text)
+        else:
+            self._write_head_tail(text)
+        return len(text)
+
+    def _write_spill_file(self, text):
+        data = text.encode(CapturedTextFile.encoding)
+        self._spill_file.write(data)
+        self._spill_size += len(data)
+
+    def _write_head_tail(self, text):
+        head_limit = self.limit // 2
+        if self._memory_size > head_limit:
+            # -- FIRST OVERFLOW: Move output beyond head window to tail.
+            memory_text = u"".join(self._memory)
+            self._memory = [memory_text[:head_limit]]
+            self._memory_size = head_limit
+            text = memory_text[head_limit:] + text
+        elif self._memory_size < head_limit:
+            # -- HEAD WINDOW: Fill it up.
+            head_size = head_limit - self._memory_size
+            self._memory.append(text[:head_size])
+            self._memory_size += len(text[:head_size])
+            text = text[head_size:]
+
+        tail_limit = self.limit - head_limit
+        self._tail.append(text)
+        self._tail_size += len(text)
+        while self._tail_size > tail_limit:
+            excess = self._tail_size - tail_limit
+            oldest = self._tail[0]
+            if len(oldest) <= excess:
+                self._tail.popleft()
+                self._tail_size -= len(oldest)
+                self.omitted_size += len(oldest)
+            else:
+                self._tail[0] = oldest[excess:]
+                self._tail_size -= excess
+                self.omitted_size += excess
+
+    def iter_chunks(self):
+        """Provides the captured output as stream of text chunks."""
+        if self._spill_file is not None:
+            return CapturedTextFile(self._spill_file,
+                                    self._spill_size).iter_chunks()
+        return self._iter_memory_chunks()
+
+    def _iter_memory_chunks(self):
+        for chunk in self._memory:
+            yield chunk
+        if self.omitted_size:
+            yield self.omitted_marker % self.omitted_size
+        for chunk in self._tail:
+            yield chunk
+
+    def getvalue(self):
+        return u"".join(self.iter_chunks())
+
+    def snapshot(self):
+        """Provides the captured output (as text or view of spilled output)."""
+        if self._spill_file is not None:
+            return CapturedTextFile(self._spill_file, self._spill_size)
+        return self.getvalue()
+
+
 class Captured(object):
     """Stores and aggregates captured output data."""
     empty = u""
@@ -49,9 +304,9 @@ class Captured(object):
         """Makes a simple report of the captured data by concatenating
         all parts.
         """
-        output_text = self.stdout
-        output_text = add_text_to(output_text, self.stderr)
-        output_text = add_text_to(output_text, self.log_output)
+        output_text = _text(self.stdout)
+        output_text = add_text_to(output_text, _text(self.stderr))
+        output_text = add_text_to(output_text, _text(self.log_output))
         return output_text
 
     def add(self, captured):
@@ -61,10 +316,12 @@ class Captured(object):
         :return: self, to allow daisy-chaining (if needed).
         """
         assert isinstance(captured, Captured)
-        self.stdout = add_text_to(self.stdout, captured.stdout, self.linesep)
-        self.stderr = add_text_to(self.stderr, captured.stderr, self.linesep)
-        self.log_output = add_text_to(self.log_output, captured.log_output,
-                                      self.linesep)
+        self.stdout = add_text_to(_text(self.stdout), _text(captured.stdout),
+                                  self.linesep)
+        self.stderr = add_text_to(_text(self.stderr), _text(captured.stderr),
+                                  self.linesep)
+        self.log_output = add_text_to(_text(self.log_output),
+                                      _text(captured.log_output), self.linesep)
         return self
 
     def make_report(self):
@@ -72,17 +329,25 @@ class Captured(object):
 
         :returns: Report as string.
         """
+        return u"".join(self.iter_report())
+
+    def iter_report(self):
+        """Provides the report of the captured output data
+        as stream of text chunks. Captured output parts that were spilled
+        to a file are read in chunks.
+        """
         report_parts = []
         if self.stdout:
-            parts = ["Captured stdout:", _text(self.stdout).rstrip(), ""]
-            report_parts.extend(parts)
+            body = iter_rstripped(iter_text_chunks(self.stdout))
+            report_parts.extend([u"Captured stdout:", body, u""])
         if self.stderr:
-            parts = ["Captured stderr:", _text(self.stderr).rstrip(), ""]
-            report_parts.extend(parts)
+            body = iter_rstripped(iter_text_chunks(self.stderr))
+            report_parts.extend([u"Captured stderr:", body, u""])
         if self.log_output:
-            parts = ["Captured logging:", _text(self.log_output)]
-            report_parts.extend(parts)
-        return self.linesep.join(report_parts).strip()
+            body = iter_text_chunks(self.log_output)
+            report_parts.extend([u"Captured logging:", body])
+        # -- HINT: Report starts with header (no leading whitespace to strip).
+        return iter_rstripped(iter_joined(report_parts, self.linesep))
 
     def __add__(self, other):
         """Supports incremental add::
@@ -107,7 +372,19 @@ class Captured(object):
 
 
 class CaptureController(object):
-    """Simplifies the lifecycle to capture output from various sources."""
+    """Simplifies the lifecycle to capture output from various sources.
+
+    The capture sinks (and the logging handler) are created once per
+    test run. Each :meth:`setup_capture()` call truncates them (for example:
+    at the start of a scenario) and installs the logging handler.
+    :meth:`teardown_capture()` uninstalls the logging handler (at the end of
+    the scenario). Therefore, log records of hooks outside of scenarios
+    (like: ``before_feature()``) reach the original logging handlers and
+    the root logger level is restored between scenarios.
+
+    If a capture limit is configured, each capture sink keeps at most this
+    number of characters in memory (see: :class:`BoundedCaptureStream`).
+    """
     def __init__(self, config):
         self.config = config
         self.stdout_capture = None
@@ -126,28 +403,82 @@ class CaptureController(object):
         stderr = None
         log_out = None
         if self.config.stdout_capture and self.stdout_capture:
-            stdout = _text(self.stdout_capture.getvalue())
+            stdout = self.make_captured_text(self.stdout_capture)
         if self.config.stderr_capture and self.stderr_capture:
-            stderr = _text(self.stderr_capture.getvalue())
+            stderr = self.make_captured_text(self.stderr_capture)
         if self.config.log_capture and self.log_capture:
-            log_out = _text(self.log_capture.getvalue())
+            log_out = self.make_captured_text(self.log_capture)
         return Captured(stdout, stderr, log_out)
 
+    @staticmethod
+    def make_captured_text(capture_sink):
+        if isinstance(capture_sink, LoggingCapture) and capture_sink.sink:
+            capture_sink = capture_sink.sink
+        if isinstance(capture_sink, BoundedCaptureStream):
+            # -- BOUNDED CAPTURE: May provide a view of spilled output.
+            return capture_sink.snapshot()
+        return _text(capture_sink.getvalue())
+
+    def select_capture_limit(self):
+        """Provides the in-memory limit for each capture sink (if any).
+
+        :return: Limit (in characters) or None (for: unbounded).
+        """
+        capture_limit = getattr(self.config, "capture_limit", None)
+        if isinstance(capture_limit, six.string_types):
+            capture_limit = int(capture_limit)
+        if isinstance(capture_limit, six.integer_types) and capture_limit > 0:
+            return capture_limit
+        return None
+
+    def make_capture_stream(self):
+        capture_limit = self.select_capture_limit()
+        if capture_limit is None:
+            return StringIO()
+        overflow = getattr(self.config, "capture_overflow", None)
+        if overflow not in BoundedCaptureStream.overflow_modes:
+            overflow = None
+        return BoundedCaptureStream(capture_limit, overflow)
+
     def setup_capture(self, context):
+        """Prepares the capture sinks (and resets any captured data).
+
+        :param context:  Context object to use (provides the capture sinks).
+        """
         assert context is not None
         if self.config.stdout_capture:
-            self.stdout_capture = StringIO()
+            if self.stdout_capture is None:
+                self.stdout_capture = self.make_capture_stream()
+            else:
+                truncate_stream(self.stdout_capture)
             context.stdout_capture = self.stdout_capture
 
         if self.config.stderr_capture:
-            self.stderr_capture = StringIO()
+            if self.stderr_capture is None:
+                self.stderr_capture = self.make_capture_stream()
+            else:
+                truncate_stream(self.stderr_capture)
             context.stderr_capture = self.stderr_capture
 
         if self.config.log_capture:
-            self.log_capture = LoggingCapture(self.config)
-            self.log_capture.inveigle()
+            if self.log_capture is None:
+                self.log_capture = LoggingCapture(self.config)
+                if self.select_capture_limit():
+                    self.log_capture.sink = self.make_capture_stream()
+                self.install_log_capture()
+            else:
+                self.log_capture.truncate()
+                if not self.log_capture.installed:
+                    # -- REINSTALL: If it was removed/abandoned meanwhile.
+                    self.install_log_capture()
             context.log_capture = self.log_capture
 
+    def install_log_capture(self):
+        """Installs the logging handler of the log capture
+        (at the root logger).
+        """
+        self.log_capture.inveigle()
+
     def start_capture(self):
         if self.config.stdout_capture:
             # -- REPLACE ONLY: In non-capturing mode.
@@ -179,7 +510,7 @@ class CaptureController(object):
             assert sys.stderr is not self.stderr_capture
 
     def teardown_capture(self):
-        if self.config.log_capture:
+        if self.config.log_capture and self.log_capture is not None:
             self.log_capture.abandon()
 
     def make_capture_report(self):
@@ -206,6 +537,15 @@ class CaptureController(object):
 # -----------------------------------------------------------------------------
 # UTILITY FUNCTIONS:
 # -----------------------------------------------------------------------------
+def truncate_stream(stream):
+    """Discards the contents of a capture stream (to reuse it)."""
+    if isinstance(stream, BoundedCaptureStream):
+        stream.reset()
+    else:
+        stream.seek(0)
+        stream.truncate()
+
+
 @contextmanager
 def capture_output(controller, enabled=True):
     """Provides a context manager that starts capturing output
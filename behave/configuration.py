@@ -13,6 +13,7 @@ from six.moves import configparser
 from behave.model import ScenarioOutline
 from behave.model_core import FileLocation
 from behave.reporter.junit import JUnitReporter
+from behave.reporter.memory import MemoryReporter
 from behave.reporter.summary import SummaryReporter
 from behave.tag_expression import make_tag_expression
 from behave.formatter.base import StreamOpener
@@ -62,6 +63,36 @@ class LogLevel(object):
         return logging.getLevelName(level)
 
 
+def parse_shard(text):
+    """Parses a shard specification "INDEX/COUNT" (option: ``--shard``).
+
+    :param text:  Shard specification (as string).
+    :return: Tuple (index, count) with 1 <= index <= count.
+    :raises argparse.ArgumentTypeError: If the shard specification is invalid.
+    """
+    match = re.match(r"^\s*(\d+)\s*/\s*(\d+)\s*$", text)
+    if match:
+        index, count = int(match.group(1)), int(match.group(2))
+        if 1 <= index <= count:
+            return index, count
+    message = "%s is invalid, use: INDEX/COUNT (with 1 <= INDEX <= COUNT)" % text
+    raise argparse.ArgumentTypeError(message)
+
+
+def parse_size(text):
+    """Parses a memory size "NUMBER[K|M|G]" (option: ``--max-worker-memory``).
+
+    :param text:  Memory size (as string), like: "500M".
+    :return: Memory size in bytes (as int).
+    :raises argparse.ArgumentTypeError: If the memory size is invalid.
+    """
+    match = re.match(r"^\s*(\d+)\s*([KMG]?)B?\s*$", text, re.IGNORECASE)
+    if match:
+        factor = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+        return int(match.group(1)) * factor[match.group(2).upper()]
+    raise argparse.ArgumentTypeError("%s is invalid, use: NUMBER[K|M|G]" % text)
+
+
 # -----------------------------------------------------------------------------
 # CONFIGURATION SCHEMA:
 # -----------------------------------------------------------------------------
@@ -133,6 +164,113 @@ options = [
           help="""Specify name annotation schema for scenario outline
                   (default="{name} -- @{row.id} {examples.name}").""")),
 
+    (("--outline-expansion",),
+     dict(dest="scenario_outline_expansion", metavar="MODE",
+          choices=["eager", "lazy"],
+          help="""Specify how scenario outlines are expanded (default: eager).
+                  "lazy" builds the scenario of each examples row just before
+                  it runs and keeps only its result afterwards. Formatters
+                  or reporters that need all details (like: junit) enforce
+                  "eager" mode.""")),
+
+    (("-j", "--jobs"),
+     dict(type=int, metavar="N",
+          help="""Run the features in N worker processes (in parallel).
+                  Each worker process runs its own before_all/after_all hooks.
+                  The results are reported in the order of the features
+                  (like in a serial run). Default: 1 (no worker processes).""")),
+
+    (("--parallel-unit",),
+     dict(metavar="UNIT", choices=["feature", "scenario"],
+          help="""Specify which work unit is distributed to the worker
+                  processes (with --jobs): "feature" (default) or "scenario"
+                  (each scenario or scenario outline row). Idle workers steal
+                  work units from other workers. Features or scenarios that
+                  are tagged with @serial are pinned to the first worker.""")),
+
+    (("--fork-server",),
+     dict(action="store_true",
+          help="""Run the before_all hook once in the main process and fork
+                  the worker processes afterwards (POSIX only). The workers
+                  inherit the initialized state (copy-on-write), the after_all
+                  hook is run by the main process. Uses --jobs worker
+                  processes (default: 1).""")),
+
+    (("--max-scenarios-per-worker",),
+     dict(type=int, metavar="N", dest="max_scenarios_per_worker",
+          help="""Replace a worker process with a new one after it has run
+                  N scenarios. Runs the features in worker processes
+                  (default: --jobs=1). Limits the effects of memory leaks
+                  in long test runs.""")),
+
+    (("--max-worker-memory",),
+     dict(type=parse_size, metavar="SIZE", dest="max_worker_memory",
+          help="""Replace a worker process with a new one (after its current
+                  feature or work unit) when its RSS has grown by more than
+                  SIZE bytes (suffix: K, M, G) since before_all(). Runs the
+                  features in worker processes (default: --jobs=1).""")),
+
+    (("--memory-report",),
+     dict(action="store_true", dest="memory_report",
+          help="""Measure the memory growth (RSS and traced Python memory)
+                  of each feature and show it after the test run
+                  (largest first) to find features that leak memory.""")),
+
+    (("--async-runtime",),
+     dict(action="store_true", dest="async_runtime",
+          help="""Use one asyncio event loop for the whole test run.
+                  Coroutine steps and hooks are run on this event loop,
+                  background tasks keep running between the steps
+                  (requires: Python >= 3.5).""")),
+
+    (("--async-scenarios",),
+     dict(type=int, metavar="K", dest="async_scenarios",
+          help="""Run up to K scenarios concurrently in this process
+                  (for I/O-bound test suites). Coroutine steps and hooks are
+                  awaited on one shared asyncio event loop. Each scenario
+                  has its own context and captured output. The before_all
+                  and after_all hooks are run once (requires: Python >= 3.7).
+                  See also: --parallel-unit.""")),
+
+    (("--coordinator",),
+     dict(metavar="[HOST:]PORT",
+          help="""Run as coordinator that distributes the work units to
+                  remote workers (that connect over TCP to this address,
+                  default host: 127.0.0.1) and reports their results.
+                  Coordinator and workers authenticate each other with
+                  the shared secret in the BEHAVE_AUTHKEY environment
+                  variable.""")),
+
+    (("--worker",),
+     dict(metavar="HOST:PORT",
+          help="""Run as remote worker of the coordinator at this address.
+                  Use the same feature files and selection (tags, ...)
+                  and the same BEHAVE_AUTHKEY as the coordinator.""")),
+
+    (("--run-history",),
+     dict(metavar="FILE", dest="run_history",
+          help="""Use a persistent run history (stored in FILE) with the
+                  durations and results of the scenarios of the last runs.
+                  It is updated after each run (with --shard: a separate
+                  run history file per shard). In parallel mode (--jobs),
+                  the longest work units are scheduled first.""")),
+
+    (("--shard",),
+     dict(type=parse_shard, metavar="INDEX/COUNT",
+          help="""Run only one shard (INDEX: 1..COUNT) of the selected
+                  scenarios, to split the test run across COUNT nodes.
+                  The scenarios are assigned by a stable hash (or balanced
+                  by their durations, with --run-history). Use
+                  "python -m behave.shard" to merge the JSON/JUnit reports
+                  (and the run histories) of the shards.""")),
+
+    (("--order",),
+     dict(metavar="ORDER", choices=["defined", "fast-first", "failed-first"],
+          help="""Specify the order of features and scenarios (with
+                  --run-history): "defined" (default, as in the feature
+                  files), "fast-first" (quickest first) or "failed-first"
+                  (scenarios that failed in the last run first).""")),
+
     (("-k", "--no-skipped"),
      dict(action="store_false", dest="show_skipped",
           help="Don't print skipped steps (due to tags).")),
@@ -194,6 +332,20 @@ options = [
                   This is the default behaviour. This switch is used to
                   override a configuration file setting.""")),
 
+    (("--capture-limit",),
+     dict(type=int, metavar="SIZE",
+          help="""Limit the in-memory size of each captured output stream
+                  (stdout, stderr, logging) to SIZE characters.
+                  Output beyond the limit is handled by --capture-overflow.
+                  Default: unlimited.""")),
+
+    (("--capture-overflow",),
+     dict(metavar="MODE", choices=["spill", "head_tail"],
+          help="""Specify how captured output beyond the --capture-limit is
+                  kept: "spill" writes it to a temporary file (default),
+                  "head_tail" keeps only the head and the tail of the output
+                  (each one with half of the limit).""")),
+
     (("--no-logcapture",),
      dict(action="store_false", dest="log_capture",
           help="""Don't capture logging. Logging configuration will
@@ -308,6 +460,13 @@ options = [
                          on the tag expression given. See below for how to code
                          tag expressions in configuration files.""")),
 
+    (("--tag-index",),
+     dict(metavar="FILE", dest="tag_index",
+          help="""Use a persistent tag index (stored in FILE) to skip
+                  feature files without any scenario that is selected by
+                  the tag expression (without parsing them). The index is
+                  updated when feature files are parsed.""")),
+
     (("-T", "--no-timings"),
      dict(action="store_false", dest="show_timings",
           help="""Don't print the time taken for each step.""")),
@@ -426,6 +585,7 @@ def read_configuration(path):
     special_config_section_map = {
         "behave.formatters": "more_formatters",
         "behave.userdata":   "userdata",
+        "behave.resources":  "resources",
     }
     for section_name, data_name in special_config_section_map.items():
         result[data_name] = {}
@@ -506,10 +666,12 @@ class Configuration(object):
         junit=False,
         stage=None,
         userdata={},
+        resources={},
         # -- SPECIAL:
         default_format="pretty",    # -- Used when no formatters are configured.
         default_tags="",            # -- Used when no tags are defined.
-        scenario_outline_annotation_schema=u"{name} -- @{row.id} {examples.name}"
+        scenario_outline_annotation_schema=u"{name} -- @{row.id} {examples.name}",
+        scenario_outline_expansion="eager",
     )
     cmdline_only_options = set("userdata_defines")
 
@@ -545,6 +707,7 @@ class Configuration(object):
             # -- AUTO-DISCOVER: Verbose mode from command-line args.
             verbose = ("-v" in command_args) or ("--verbose" in command_args)
 
+        self.command_args = command_args
         self.version = None
         self.tags_help = None
         self.lang_list = None
@@ -651,6 +814,8 @@ class Configuration(object):
             self.stderr_capture = True
             self.log_capture = True
             self.reporters.append(JUnitReporter(self))
+        if self.memory_report:
+            self.reporters.append(MemoryReporter(self))
         if self.summary:
             self.reporters.append(SummaryReporter(self))
 
@@ -0,0 +1,422 @@
+# -*- coding: UTF-8 -*-
+"""
+Runs the scenarios on worker processes of several nodes that are connected
+over TCP sockets (coordinator/worker mode).
+
+The coordinator hands out the work units (features or scenarios,
+see option: ``--parallel-unit``) to the workers that connect to it.
+Each worker loads its hooks, step definitions and features (like a normal
+test run, with the same feature files and selection as the coordinator)
+and runs the work units that it gets. The workers stream back the recorded
+formatter events and results (like the worker processes in
+:mod:`behave.parallel`). The coordinator produces the combined formatter
+and reporter output.
+
+.. code-block:: sh
+
+    # -- ON THE COORDINATOR NODE:
+    export BEHAVE_AUTHKEY=<shared-secret>
+    behave --coordinator=0.0.0.0:7700 --parallel-unit=scenario -f pretty
+
+    # -- ON EACH WORKER NODE:
+    export BEHAVE_AUTHKEY=<shared-secret>
+    behave --worker=coordinator-host:7700
+
+Workers may connect (and disconnect) at any time. If a worker disconnects
+before its current work unit is finished, the work unit is requeued and run
+by another worker. Features or scenarios tagged with ``@serial`` are never
+run concurrently. The coordinator finishes when all work units are run.
+
+TRUST MODEL:
+
+The messages are pickled Python objects. Unpickling a message of an
+untrusted peer may execute arbitrary code. Therefore, the coordinator and
+each worker authenticate each other (HMAC challenge/response) with a shared
+secret (environment variable: ``BEHAVE_AUTHKEY``) before any message is
+unpickled. Connections that fail the authentication are closed.
+
+* Everyone who knows the shared secret can run code on the coordinator
+  and on the workers. Keep it secret (like a password).
+* The messages are not encrypted. Use a trusted network (or a tunnel)
+  if the test results are confidential.
+* The coordinator listens on "127.0.0.1" by default. Provide the host
+  (like: ``--coordinator=0.0.0.0:7700``) to accept remote workers.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import, print_function
+import itertools
+import os
+import pickle
+import socket
+import struct
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import answer_challenge, deliver_challenge
+import six
+from six.moves.queue import Empty, Queue
+from behave.exception import ConfigError
+from behave.parallel import (
+    InheritedRunner, ModelIndex, ParallelRunner, ParallelWorker,
+    WorkStealingScheduler
+)
+
+
+AUTHKEY_NAME = "BEHAVE_AUTHKEY"
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    """Parses a socket address "[HOST:]PORT".
+
+    :return: Tuple (host, port).
+    :raises ConfigError: If the address is invalid.
+    """
+    host, _, port = text.rpartition(":")
+    if not port.isdigit():
+        raise ConfigError("%s: Invalid address, use: [HOST:]PORT" % text)
+    return host or default_host, int(port)
+
+
+def select_authkey(environ=None):
+    """Provides the shared secret of the coordinator and its workers
+    (environment variable: ``BEHAVE_AUTHKEY``).
+
+    :return: Shared secret (as bytes).
+    :raises ConfigError: If no shared secret is provided.
+    """
+    if environ is None:
+        environ = os.environ
+    authkey = environ.get(AUTHKEY_NAME)
+    if not authkey:
+        raise ConfigError("Coordinator/worker mode requires a shared secret "
+                          "(environment variable: %s)" % AUTHKEY_NAME)
+    if isinstance(authkey, six.text_type):
+        authkey = authkey.encode("utf-8")
+    return authkey
+
+
+def make_features_signature(features):
+    """Describes the features (to ensure that a worker and the coordinator
+    use the same features and model keys).
+    """
+    return [(feature.filename, len(ModelIndex(feature).elements))
+            for feature in features]
+
+
+class Connection(object):
+    """Sends/receives messages (pickled objects with a length header)
+    over a socket.
+    """
+    header = struct.Struct("!I")
+    pickle_protocol = 2
+    challenge_size = 256
+
+    def __init__(self, socket_):
+        self.socket = socket_
+
+    def authenticate(self, authkey, coordinator=False):
+        """Authenticates both ends of the connection with the shared secret
+        (HMAC challenge/response). Must be called before any message
+        is sent or received.
+
+        :raises AuthenticationError: If the other end uses another secret.
+        """
+        if coordinator:
+            deliver_challenge(self, authkey)
+            answer_challenge(self, authkey)
+        else:
+            answer_challenge(self, authkey)
+            deliver_challenge(self, authkey)
+
+    def send(self, message):
+        self.send_bytes(pickle.dumps(message, self.pickle_protocol))
+
+    def receive(self):
+        """Receives the next message.
+
+        :raises EOFError: If the connection was closed.
+        """
+        return pickle.loads(self.recv_bytes())
+
+    def send_bytes(self, data):
+        self.socket.sendall(self.header.pack(len(data)) + data)
+
+    def recv_bytes(self, maxlength=None):
+        size = self.header.unpack(self.receive_bytes(self.header.size))[0]
+        if maxlength is not None and size > maxlength:
+            raise IOError("Message too long (size=%d)" % size)
+        return self.receive_bytes(size)
+
+    def receive_bytes(self, size):
+        chunks = []
+        while size > 0:
+            chunk = self.socket.recv(min(size, 65536))
+            if not chunk:
+                raise EOFError("Connection closed")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except (IOError, OSError):
+            pass
+        self.socket.close()
+
+    # -- QUEUE ADAPTER: Used as task queue and result queue of a worker.
+    get = receive
+    put = send
+
+
+class RemoteStopEvent(object):
+    """Stop event of a remote worker (that tells the coordinator to stop)."""
+
+    def __init__(self, connection, worker_id):
+        self.connection = connection
+        self.worker_id = worker_id
+        self.stopped = False
+
+    def is_set(self):
+        return self.stopped
+
+    def set(self):
+        self.stopped = True
+        self.connection.send(("stop", self.worker_id, None, None))
+
+
+# -----------------------------------------------------------------------------
+# WORKER NODE:
+# -----------------------------------------------------------------------------
+def connect(address, authkey, timeout=30.0, retry_interval=0.2):
+    """Connects to the coordinator (and retries until it is started).
+
+    :return: Connection object (that is authenticated).
+    :raises ConfigError: If the coordinator cannot be reached in time
+        (or uses another shared secret).
+    """
+    host, port = parse_address(address)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            connection = Connection(socket.create_connection((host, port)))
+            break
+        except (IOError, OSError) as e:
+            if time.time() >= deadline:
+                raise ConfigError("Cannot connect to coordinator at %s: %s" %
+                                  (address, e))
+            time.sleep(retry_interval)
+
+    try:
+        connection.authenticate(authkey)
+    except (AuthenticationError, IOError, OSError, EOFError) as e:
+        connection.close()
+        raise ConfigError("Cannot authenticate with coordinator at %s: %s" %
+                          (address, e))
+    return connection
+
+
+def run_remote_worker(runner, address, features):
+    """Runs the work units of a coordinator with the runner (and its features).
+    Called by :meth:`behave.runner.ModelRunner.run_model()`.
+
+    :return: True, if the worker failed. False, otherwise.
+    :raises ConfigError: If the features differ from the coordinator features.
+    """
+    features = list(features)
+    connection = connect(address, select_authkey())
+    try:
+        _, worker_id, _, signature = connection.receive()
+        if make_features_signature(features) != signature:
+            raise ConfigError("Features differ from coordinator features "
+                              "(use the same feature files and selection)")
+
+        worker = ParallelWorker(worker_id, connection, connection,
+                                RemoteStopEvent(connection, worker_id))
+        return worker.run(InheritedRunner(runner, features))
+    except (IOError, OSError, EOFError) as e:
+        print("REMOTE-WORKER-ERROR: Connection to coordinator lost (%s)" % e)
+        return True
+    finally:
+        connection.close()
+
+
+# -----------------------------------------------------------------------------
+# COORDINATOR NODE:
+# -----------------------------------------------------------------------------
+class SharedQueueScheduler(WorkStealingScheduler):
+    """Provides the work units from one work queue that all workers share
+    (workers may come and go). Pinned work units are run one after another
+    (by any worker).
+    """
+
+    def __init__(self, resource_pool=None):
+        super(SharedQueueScheduler, self).__init__(1, resource_pool)
+        self.pinned_unit_id = None
+
+    def can_run(self, work_unit):
+        if work_unit.pinned and self.pinned_unit_id is not None:
+            return False
+        return super(SharedQueueScheduler, self).can_run(work_unit)
+
+    def has_work_units(self, worker_id):
+        return super(SharedQueueScheduler, self).has_work_units(0)
+
+    def take_batch(self, worker_id, work_unit, max_size=None):
+        # -- NO BATCHES: The first worker would take all work units of
+        #    a feature from the shared work queue.
+        return work_unit
+
+    def next_work_unit(self, worker_id, max_size=None):
+        work_unit = super(SharedQueueScheduler, self).next_work_unit(0)
+        if work_unit is not None and work_unit.pinned:
+            self.pinned_unit_id = work_unit.unit_id
+        return work_unit
+
+    def release_work_unit(self, unit_id):
+        if unit_id == self.pinned_unit_id:
+            self.pinned_unit_id = None
+        super(SharedQueueScheduler, self).release_work_unit(unit_id)
+
+
+class DistributedRunner(ParallelRunner):
+    """Coordinator that runs the features of a runner on remote workers
+    (that connect over TCP sockets).
+    """
+    authenticate_timeout = 10.0
+
+    def __init__(self, runner, address):
+        super(DistributedRunner, self).__init__(runner, 1)
+        self.address = parse_address(address)
+        self.authkey = select_authkey()
+        self.listener = None
+        self.connections = {}
+        self.active_workers = set()
+        self.features_signature = None
+        # -- REMOTE WORKERS: Run their own before_all()/after_all() hooks.
+        self.fork_server = False
+
+    def make_scheduler(self, work_units):
+        scheduler = SharedQueueScheduler(self.make_resource_pool(work_units))
+        scheduler.add_work_units(work_units)
+        return scheduler
+
+    def send_work_unit(self, worker_id, work_unit):
+        try:
+            self.connections[worker_id].send(work_unit)
+        except (IOError, OSError):
+            pass    # -- LOST WORKER: Is detected by its reader thread.
+
+    def start_workers(self, features):
+        self.features_signature = make_features_signature(features)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen(5)
+        self.listener.settimeout(self.poll_timeout)
+        self.address = self.listener.getsockname()
+        print("COORDINATOR: Waiting for workers at %s:%d" % self.address,
+              file=sys.stderr)
+
+        message_queue = Queue()
+        thread = threading.Thread(target=self.accept_workers,
+                                  args=(message_queue,),
+                                  name="behave-coordinator")
+        thread.daemon = True
+        thread.start()
+        return message_queue, threading.Event()
+
+    def accept_workers(self, message_queue):
+        worker_ids = itertools.count()
+        while self.listener is not None:
+            try:
+                socket_, _ = self.listener.accept()
+            except socket.timeout:
+                continue
+            except (IOError, OSError, AttributeError):
+                return  # -- LISTENER CLOSED: Coordinator is finished.
+
+            worker_id = next(worker_ids)
+            thread = threading.Thread(target=self.serve_worker,
+                                      args=(Connection(socket_), worker_id,
+                                            message_queue),
+                                      name="behave-worker-%d" % worker_id)
+            thread.daemon = True
+            thread.start()
+
+    def serve_worker(self, connection, worker_id, message_queue):
+        """Authenticates a worker and receives its messages
+        (in its own thread).
+        """
+        try:
+            connection.socket.settimeout(self.authenticate_timeout)
+            connection.authenticate(self.authkey, coordinator=True)
+            connection.socket.settimeout(None)
+            connection.send(("welcome", worker_id, None,
+                             self.features_signature))
+        except (AuthenticationError, IOError, OSError, EOFError) as e:
+            print("COORDINATOR: Rejected worker connection (%s: %s)" %
+                  (e.__class__.__name__, e), file=sys.stderr)
+            connection.close()
+            return
+
+        self.connections[worker_id] = connection
+        message_queue.put(("connected", worker_id, None, None))
+        self.receive_messages(connection, worker_id, message_queue)
+
+    @staticmethod
+    def receive_messages(connection, worker_id, message_queue):
+        while True:
+            try:
+                message = connection.receive()
+            except (IOError, OSError, EOFError):
+                message_queue.put(("lost", worker_id, None, None))
+                return
+            # -- ENSURE: Worker id of the connection is used.
+            message_queue.put((message[0], worker_id) + tuple(message[2:]))
+            if message[0] == "done":
+                return
+
+    def is_finished(self):
+        if self.active_workers:
+            return False
+        return (self.runner.aborted or
+                (len(self.scheduler) == 0 and not self.running_units))
+
+    def iter_messages(self, result_queue, stop_event):
+        """Provides the messages of all workers until all work units are
+        finished and all connected workers are done.
+        """
+        try:
+            while not self.is_finished():
+                try:
+                    message = result_queue.get(timeout=self.poll_timeout)
+                except Empty:
+                    continue
+                except KeyboardInterrupt:
+                    self.runner.aborted = True
+                    stop_event.set()
+                    continue
+
+                kind, worker_id = message[:2]
+                if kind == "connected":
+                    self.active_workers.add(worker_id)
+                    continue
+                elif kind in ("done", "lost"):
+                    if worker_id not in self.active_workers:
+                        continue    # -- LOST AFTER DONE: Connection closed.
+                    self.active_workers.discard(worker_id)
+                yield message
+        finally:
+            self.close()
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        for connection in list(self.connections.values()):
+            connection.close()
+        self.connections = {}
@@ -92,9 +92,16 @@ class Formatter(object):
                     formatter.result(step.status)
             formatter.eof() # -- FEATURE-END
         formatter.close()
+
+    .. attribute:: requires_expanded_outlines
+
+        Indicates that this formatter needs the complete scenarios of a
+        ScenarioOutline after it was run (with steps, captured output, ...).
+        Disables the lazy scenario outline expansion mode if true.
     """
     name = None
     description = None
+    requires_expanded_outlines = False
 
     def __init__(self, stream_opener, config):
         self.stream_opener = stream_opener
@@ -66,6 +66,7 @@ class JSONFormatter(Formatter):
             element["description"] = feature.description
 
     def background(self, background):
+        self.finish_current_scenario()
         element = self.add_feature_element({
             "type": "background",
             "keyword": background.keyword,
@@ -225,6 +226,7 @@ class JSONFormatter(Formatter):
         if self.current_scenario:
             status_name = self.current_scenario.status.name
             self.current_feature_element["status"] = status_name
+            self.current_scenario = None
 
     # -- JSON-WRITER:
     def write_json_header(self):
@@ -343,6 +343,7 @@ class StepsUsageFormatter(AbstractStepsFormatter):
         Supports behave dry-run mode.
     """
     name = "steps.usage"
+    requires_expanded_outlines = True
     description = "Shows how step definitions are used by steps."
     doc_prefix = make_indentation(4)
     min_location_column = 40
@@ -54,14 +54,23 @@ class LoggingCapture(BufferingHandler):
     Finally there may be `filtering of logging events`__ specified by the
     configuration variable ``logging_filter``.
 
+    If a :attr:`sink` (text stream) is assigned, logging events are
+    formatted immediately and written to the sink instead of being stored
+    in the :attr:`buffer` (used for bounded capture).
+
     .. __: behave.html#command-line-arguments
     """
+    error_levelnames = ("ERROR", "CRITICAL")
 
     def __init__(self, config, level=None):
         BufferingHandler.__init__(self, 1000)
         self.config = config
         self.old_handlers = []
         self.old_level = None
+        self.sink = None
+        self._cleared_loggers = []
+        self._logger_dict_size = None
+        self._reset_cache()
 
         # set my formatter
         log_format = datefmt = None
@@ -87,36 +96,138 @@ class LoggingCapture(BufferingHandler):
             self.addFilter(RecordFilter(config.logging_filter))
 
     def __bool__(self):
+        if self.sink is not None:
+            return self.sink.size > 0
         return bool(self.buffer)
 
+    def emit(self, record):
+        if self.sink is None:
+            BufferingHandler.emit(self, record)
+            return
+
+        # -- BOUNDED CAPTURE: Store formatted logging event in sink.
+        self._sink_level_counts[record.levelname] = \
+            self._sink_level_counts.get(record.levelname, 0) + 1
+        if self.sink.size:
+            self.sink.write(u"\n")
+        self.sink.write(self.format(record))
+
     def flush(self):
         pass  # do nothing
 
     def truncate(self):
         self.buffer = []
+        self._reset_cache()
+        if self.sink is not None:
+            self.sink.reset()
+
+    @property
+    def installed(self):
+        """Indicates if this handler is installed (at the root logger)."""
+        return self in logging.getLogger().handlers
+
+    # -- CACHED DATA: Derived incrementally from new records in buffer.
+    def _reset_cache(self):
+        self._cached_buffer = self.buffer
+        self._formatted = []
+        self._value = u""
+        self._messages = []
+        self._records_by_level = {}
+        self._indexed_size = 0
+        self._found_events = {}
+        self._sink_level_counts = {}
+
+    def _check_cache(self):
+        if (self._cached_buffer is not self.buffer or
+                len(self.buffer) < self._indexed_size or
+                len(self.buffer) < len(self._formatted) or
+                len(self.buffer) < len(self._messages)):
+            # -- BUFFER WAS REPLACED/SHORTENED: Discard cached data.
+            self._reset_cache()
 
     def getvalue(self):
-        return '\n'.join(self.formatter.format(r) for r in self.buffer)
+        """Provides the formatted logging events (as text).
+        Each logging event is formatted only once.
+        """
+        if self.sink is not None:
+            return self.sink.getvalue()
+
+        self._check_cache()
+        start = len(self._formatted)
+        if start < len(self.buffer):
+            format_record = self.formatter.format
+            new_formatted = [format_record(record)
+                             for record in self.buffer[start:]]
+            self._formatted.extend(new_formatted)
+            if start:
+                new_formatted.insert(0, self._value)
+            self._value = '\n'.join(new_formatted)
+        return self._value
+
+    def _update_level_index(self):
+        self._check_cache()
+        for record in self.buffer[self._indexed_size:]:
+            records = self._records_by_level.setdefault(record.levelname, [])
+            records.append(record)
+        self._indexed_size = len(self.buffer)
+
+    def select_records(self, levelname):
+        """Select the captured logging events with this level.
+
+        :param levelname:   Name of the log level (as string), like: "ERROR".
+        :return: List of logging records (empty, if a sink is used).
+        """
+        if self.sink is not None:
+            return []
+        self._update_level_index()
+        return list(self._records_by_level.get(levelname, []))
+
+    def count_records(self, levelname):
+        """Counts the captured logging events with this level.
+
+        :param levelname:   Name of the log level (as string), like: "ERROR".
+        :return: Number of logging events (as int).
+        """
+        if self.sink is not None:
+            return self._sink_level_counts.get(levelname, 0)
+        self._update_level_index()
+        return len(self._records_by_level.get(levelname, ()))
 
     def find_event(self, pattern):
         """Search through the buffer for a message that matches the given
         regular expression.
 
         Returns boolean indicating whether a match was found.
+
+        .. note:: With a sink, the formatted (retained) output is searched.
         """
-        pattern = re.compile(pattern)
-        for record in self.buffer:
-            if pattern.search(record.getMessage()) is not None:
-                return True
-        return False
+        if self.sink is not None:
+            pattern = re.compile(pattern)
+            return any(pattern.search(line) is not None
+                       for line in iter_lines(self.sink.iter_chunks()))
+
+        # -- INCREMENTAL: Search only the new messages (since last search).
+        self._check_cache()
+        start = len(self._messages)
+        self._messages.extend(record.getMessage()
+                              for record in self.buffer[start:])
+        scanned_size, found = self._found_events.get(pattern, (0, False))
+        if not found:
+            compiled = re.compile(pattern)
+            for message in self._messages[scanned_size:]:
+                if compiled.search(message) is not None:
+                    found = True
+                    break
+            self._found_events[pattern] = (len(self._messages), found)
+        return found
 
     def any_errors(self):
         """Search through the buffer for any ERROR or CRITICAL events.
 
         Returns boolean indicating whether a match was found.
         """
-        return any(record for record in self.buffer
-                   if record.levelname in ('ERROR', 'CRITICAL'))
+        return any(self.count_records(levelname)
+                   for levelname in self.error_levelnames)
 
     def inveigle(self):
         """Turn on logging capture by replacing all existing handlers
@@ -132,11 +243,10 @@ class LoggingCapture(BufferingHandler):
         root_logger = logging.getLogger()
         if self.config.logging_clear_handlers:
             # kill off all the other log handlers
-            for logger in logging.Logger.manager.loggerDict.values():
-                if hasattr(logger, "handlers"):
-                    for handler in logger.handlers:
-                        self.old_handlers.append((logger, handler))
-                        logger.removeHandler(handler)
+            for logger in self.select_cleared_loggers():
+                for handler in logger.handlers[:]:
+                    self.old_handlers.append((logger, handler))
+                    logger.removeHandler(handler)
 
         # sanity check: remove any existing LoggingCapture
         for handler in root_logger.handlers[:]:
@@ -150,9 +260,24 @@ class LoggingCapture(BufferingHandler):
         root_logger.addHandler(self)
 
         # capture the level we're interested in
-        self.old_level = root_logger.level
+        if self.old_level is None:
+            self.old_level = root_logger.level
         root_logger.setLevel(self.level)
 
+    def select_cleared_loggers(self):
+        """Provides the loggers with handlers (that are removed by
+        :meth:`inveigle()`). Because :meth:`inveigle()` is called for each
+        scenario, the loggers are only searched again if new loggers were
+        created (since the last search).
+        """
+        logger_dict = logging.Logger.manager.loggerDict
+        if len(logger_dict) != self._logger_dict_size:
+            self._cleared_loggers = [logger
+                                     for logger in list(logger_dict.values())
+                                     if getattr(logger, "handlers", None)]
+            self._logger_dict_size = len(logger_dict)
+        return self._cleared_loggers
+
     def abandon(self):
         """Turn off logging capture.
 
@@ -167,6 +292,7 @@ class LoggingCapture(BufferingHandler):
         if self.config.logging_clear_handlers:
             for logger, handler in self.old_handlers:
                 logger.addHandler(handler)
+            self.old_handlers = []
 
         if self.old_level is not None:
             # -- RESTORE: Old log.level before inveigle() was used.
@@ -177,6 +303,18 @@ class LoggingCapture(BufferingHandler):
 MemoryHandler = LoggingCapture
 
 
+def iter_lines(chunks):
+    """Provides the lines of a stream of text chunks."""
+    pending = u""
+    for chunk in chunks:
+        lines = (pending + chunk).split(u"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
 def capture(*args, **kw):
     """Decorator to wrap an *environment file function* in log file capture.
 
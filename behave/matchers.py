@@ -12,6 +12,7 @@ import parse
 import six
 from parse_type import cfparse
 from behave._types import ChainedExceptionUtil, ExceptionUtil
+from behave.async_runtime import get_async_runtime
 from behave.model_core import Argument, FileLocation, Replayable
 
 
@@ -58,6 +59,7 @@ class Match(Replayable):
        matched parameters from the step name.
     """
     type = "match"
+    __slots__ = ("func", "arguments", "location")
 
     def __init__(self, func, arguments=None):
         super(Match, self).__init__()
@@ -94,7 +96,11 @@ class Match(Replayable):
                 args.append(arg.value)
 
         with context.use_with_user_mode():
-            self.func(context, *args, **kwargs)
+            result = self.func(context, *args, **kwargs)
+            async_runtime = get_async_runtime(context)
+            if async_runtime is not None:
+                # -- ASYNC-RUNTIME: Run coroutine step on shared event loop.
+                async_runtime.complete(result)
 
     @staticmethod
     def make_location(step_function):
@@ -111,6 +117,7 @@ class NoMatch(Match):
     """Used for an "undefined step" when it can not be matched with a
     step definition.
     """
+    __slots__ = ()
 
     def __init__(self):
         Match.__init__(self, func=None)
@@ -126,6 +133,8 @@ class MatchWithError(Match):
       * Type conversion error occured.
       * ...
     """
+    __slots__ = ("stored_error",)
+
     def __init__(self, func, error):
         if not ExceptionUtil.has_traceback(error):
             ExceptionUtil.set_traceback(error)
@@ -0,0 +1,117 @@
+# -*- coding: UTF-8 -*-
+"""
+Tracks the memory growth of a test run per feature (to find features that
+leak memory in long test runs).
+
+Two measures are used:
+
+* RSS: Resident set size of the process (as provided by the OS).
+* traced: Size of the Python memory blocks that are traced by
+  :mod:`tracemalloc` (Python >= 3.4, only used with ``--memory-report``).
+
+The memory growth of each feature is stored as ``feature.memory_usage``
+and shown by the memory report (option: ``--memory-report``).
+A worker process is replaced by a new one when its RSS growth exceeds
+the limit of the option ``--max-worker-memory=SIZE``.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import collections
+import gc
+import os
+import sys
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def get_rss():
+    """Provides the resident set size (RSS) of this process in bytes
+    (or None, if it cannot be determined).
+    HINT: The peak RSS is used if the current RSS is not provided by the OS.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss      # -- IN BYTES.
+    return max_rss * 1024   # -- IN KILOBYTES.
+
+
+class MemoryUsage(collections.namedtuple("MemoryUsage", ["rss", "traced"])):
+    """Memory growth (in bytes) of the RSS and of the traced Python memory
+    blocks (or None, if unknown).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def combine(cls, memory_usages):
+        """Provides the sum of some memory usages (or None, if none is given)."""
+        memory_usages = [x for x in memory_usages if x is not None]
+        if not memory_usages:
+            return None
+        values = []
+        for index in range(len(cls._fields)):
+            parts = [x[index] for x in memory_usages if x[index] is not None]
+            values.append(sum(parts) if parts else None)
+        return cls(*values)
+
+
+class MemoryTracker(object):
+    """Measures the memory growth of a process since it was started
+    and per feature.
+
+    :param trace:  If true, uses :mod:`tracemalloc` (if available).
+    """
+
+    def __init__(self, trace=False):
+        self.started_tracing = False
+        if trace and tracemalloc is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.initial = self.measure()
+        self.feature_initial = self.initial
+
+    @staticmethod
+    def measure(collect=False):
+        """Provides the current RSS and traced memory size (as MemoryUsage)."""
+        if collect:
+            gc.collect()
+        traced = None
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+        return MemoryUsage(get_rss(), traced)
+
+    @staticmethod
+    def diff(current, initial):
+        return MemoryUsage(*[None if None in (value, initial_value)
+                             else value - initial_value
+                             for value, initial_value in zip(current, initial)])
+
+    def growth(self):
+        """Provides the memory growth since this tracker was created."""
+        return self.diff(self.measure(), self.initial)
+
+    def start_feature(self):
+        self.feature_initial = self.measure(collect=True)
+
+    def finish_feature(self):
+        """Provides the memory growth since :meth:`start_feature()`."""
+        return self.diff(self.measure(collect=True), self.feature_initial)
+
+    def close(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
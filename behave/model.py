@@ -12,14 +12,18 @@ This module provides the model element class that represent a behave model:
 
 from __future__ import absolute_import, with_statement
 import copy
+import csv
 import difflib
+import io
 import logging
 import itertools
+import os.path
 import time
 import six
 from six.moves import zip       # pylint: disable=redefined-builtin
 from behave.model_core import \
-        Status, BasicStatement, TagAndStatusStatement, TagStatement, Replayable
+        Status, BasicStatement, TagAndStatusStatement, TagStatement, Replayable, \
+        RunResults, intern_text
 from behave.matchers import NoMatch
 from behave.textutil import text as _text
 if six.PY2:
@@ -156,6 +160,9 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
        The line number of the *feature file* where the feature was found.
     """
     type = "feature_or_rule"
+    __slots__ = ("description", "hook_failed", "run_starttime", "run_endtime",
+                 "run_items", "scenarios", "background", "_run_results",
+                 "_effective_tags")
 
     def __init__(self, filename, line, keyword, name, tags=None,
                  description=None, scenarios=None, background=None):
@@ -168,6 +175,8 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         self.run_items = []     # CASE: Rule, Scenario, ScenarioOutline
         self.scenarios = []
         self.background = background
+        self._run_results = None
+        self._effective_tags = None
         if scenarios:
             for scenario in scenarios:
                 self.add_scenario(scenario)
@@ -178,9 +187,22 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         self.hook_failed = False
         self.run_starttime = 0
         self.run_endtime = 0
+        self._run_results = None
         for run_item in self.run_items:
             run_item.reset()
 
+    @property
+    def effective_tags(self):
+        """Effective tags of this feature/rule (as frozenset):
+          * own tags
+          * tags inherited from its feature (for a rule)
+
+        Cached until its tags (or the tags of its feature) are changed.
+
+        .. versionadded:: 1.2.7
+        """
+        return select_effective_tags(self, self.parent)
+
     def _setup_context_for_run(self, context):
         """Setup/Init runner context for run."""
         # -- OVERRIDDEN: By derived classes.
@@ -211,6 +233,16 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         if self.hook_failed:
             return Status.failed
 
+        run_results = self._run_results
+        if run_results is not None and run_results.usable:
+            # -- FAST-PATH: Use results that were pushed by the run items.
+            if run_results.status is not None:
+                return run_results.status
+            elif run_results.completed:
+                if run_results.skipped_count == run_results.count:
+                    return Status.skipped
+                return Status.passed
+
         skipped = True
         passed_count = 0
         for run_item in self.run_items:
@@ -231,8 +263,31 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         # -- OTHERWISE:
         return Status.passed
 
+    def _add_run_item_result(self, run_item):
+        """Push the result of a run item (after it was run)."""
+        run_results = self._run_results
+        status = run_item.status
+        duration = 0
+        if not isinstance(run_item, Rule):
+            # -- SAME-AS: duration property (uses only: self.scenarios).
+            duration = run_item.duration
+        if not run_results.add(status, duration):
+            return
+        if status == Status.failed:
+            run_results.decide(Status.failed)
+        elif status == Status.untested:
+            if run_results.passed_count > 0:
+                # ABORTED: Some passed, now untested.
+                run_results.decide(Status.failed)
+            run_results.decide(Status.untested)
+
     @property
     def duration(self):
+        run_results = self._run_results
+        if (run_results is not None and run_results.usable and
+                run_results.completed):
+            return run_results.duration
+
         # -- NEW: Background is executed N times, now part of scenarios.
         # TODO: Use self.run_endtime - self.run_starttime
         feature_duration = 0.0
@@ -308,7 +363,7 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         :param tag_expression:  Runner/config environment tags to use.
         :return: True, if feature should run. False, otherwise (skip it).
         """
-        run_feature = tag_expression.check(self.tags)
+        run_feature = tag_expression.check(self.effective_tags)
         if not run_feature:
             for scenario in self:
                 if scenario.should_run_with_tags(tag_expression):
@@ -358,6 +413,7 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
         self.clear_status()
         self.hook_failed = False
         self.run_starttime = time.time()
+        self._run_results = None
 
         entity_name = self.type # VALUE: "feature" or "rule"
         hook_before_entity = "before_{0}".format(entity_name)
@@ -396,6 +452,7 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
 
         if not skip_entity_untested:
             # -- RUN: Rules, Scenarios or ScenarioOutlines
+            self._run_results = RunResults()
             for run_item in self.run_items:
                 # -- OPTIONAL: Select scenario by name (regular expressions).
                 should_run_with_name = \
@@ -403,14 +460,18 @@ class ScenarioContainer(TagAndStatusStatement, Replayable):
                 if (runner.config.name and should_run_with_name and
                         not should_run_with_name(runner.config)):
                     run_item.mark_skipped()
+                    self._add_run_item_result(run_item)
                     continue
 
                 failed = run_item.run(runner)
+                self._add_run_item_result(run_item)
                 if failed:
                     failed_count += 1
                     if runner.config.stop or runner.aborted:
                         # -- FAIL-EARLY: Stop after first failure.
                         break
+            else:
+                self._run_results.completed = True
 
         self.clear_status()  # -- ENFORCE: compute_status() after run.
         if not self.run_items and not should_run_entity:
@@ -527,10 +588,19 @@ class Feature(ScenarioContainer):
 
        .. versionadded:: 1.2.6
 
+    .. attribute:: memory_usage
+
+       The memory growth while this feature was run (as
+       :class:`~behave.memory_usage.MemoryUsage`) or None, if it was not
+       measured (see option: ``--memory-report``).
+
+       .. versionadded:: 1.2.7
+
     .. _`feature`: gherkin.html#features
     """
 
     type = "feature"
+    __slots__ = ("rules", "language", "parser", "memory_usage")
 
     def __init__(self, filename, line, keyword, name, tags=None,
                  description=None, scenarios=None, background=None,
@@ -541,6 +611,7 @@ class Feature(ScenarioContainer):
         self.rules = []
         self.language = language
         self.parser = None
+        self.memory_usage = None
 
     def __repr__(self):
         return '<Feature "%s": %s run items, %d rules, %d scenarios>' % \
@@ -674,6 +745,7 @@ class Rule(ScenarioContainer):
     .. _`feature`: gherkin.html#rule
     """
     type = "rule"
+    __slots__ = ("feature", "_use_background_inheritance")
 
     def __init__(self, filename, line, keyword, name, tags=None,
                  description=None, scenarios=None, background=None,
@@ -767,6 +839,8 @@ class Background(BasicStatement, Replayable):
     .. _`background`: gherkin.html#backgrounds
     """
     type = "background"
+    __slots__ = ("description", "steps", "parent", "inherited_background",
+                 "_use_inheritance", "_inherited_steps")
 
     def __init__(self, filename, line, keyword=u"Background", name=u"",
                  steps=None, description=None):
@@ -808,7 +882,7 @@ class Background(BasicStatement, Replayable):
             # -- LAZY-INIT: Support enable/disable the inheritance mechanism.
             steps = []
             if self.inherited_background and self._use_inheritance:
-                steps = copy_and_reset_steps(self.inherited_background.steps)
+                steps = make_background_steps(self.inherited_background.steps)
             self._inherited_steps = steps
         return self._inherited_steps
 
@@ -922,6 +996,9 @@ class Scenario(TagAndStatusStatement, Replayable):
     # pylint: disable=too-many-instance-attributes
     type = "scenario"
     continue_after_failed_step = False
+    __slots__ = ("description", "steps", "background", "feature",
+                 "hook_failed", "was_dry_run", "_background_steps",
+                 "_use_background", "_row", "_run_results", "_effective_tags")
 
     def __init__(self, filename, line, keyword, name, tags=None, steps=None,
                  description=None, parent=None):
@@ -937,6 +1014,8 @@ class Scenario(TagAndStatusStatement, Replayable):
         self._use_background = True
         self._row = None
         self.was_dry_run = False
+        self._run_results = None
+        self._effective_tags = None
 
     def reset(self):
         """Reset the internal data to reintroduce new-born state just after the
@@ -946,6 +1025,7 @@ class Scenario(TagAndStatusStatement, Replayable):
         self.hook_failed = False
         self._row = None
         self.was_dry_run = False
+        self._run_results = None
         for step in self.all_steps:
             step.reset()
 
@@ -973,20 +1053,22 @@ class Scenario(TagAndStatusStatement, Replayable):
     @property
     def background_steps(self):
         """Provide background steps if feature/rule has a background.
-        Lazy init that copies the background steps.
+        Lazy init that provides per-scenario views of the background steps.
 
-        Note that a copy of the background steps is needed to ensure
+        Note that each scenario needs its own background steps to ensure
         that the background step status is specific to the scenario.
+        The static step data is shared with the background steps
+        (see :class:`BackgroundStep`).
 
         :return:  List of background steps or empty list
         """
         if self._background_steps is None:
-            # -- LAZY-INIT (need copy of background.steps):
-            # Each scenario needs own background.steps.
+            # -- LAZY-INIT (need own view of background.steps):
+            # Each scenario needs own background.steps run-time data.
             # Otherwise, background step status of the last-run scenario is used.
             steps = []
             if self.background and self.use_background:
-                steps = copy_and_reset_steps(self.background.all_steps)
+                steps = make_background_steps(self.background.all_steps)
             self._background_steps = steps
         return self._background_steps
 
@@ -1018,6 +1100,14 @@ class Scenario(TagAndStatusStatement, Replayable):
         if self.hook_failed:
             return Status.failed
 
+        run_results = self._run_results
+        if run_results is not None and run_results.usable:
+            # -- FAST-PATH: Use results that were pushed by the steps.
+            if run_results.status is not None:
+                return run_results.status
+            elif run_results.completed:
+                return Status.passed
+
         for step in self.all_steps:
             if step.status == Status.undefined:
                 if self.was_dry_run:
@@ -1032,8 +1122,27 @@ class Scenario(TagAndStatusStatement, Replayable):
                 return step.status
         return Status.passed
 
+    def _add_step_result(self, step):
+        """Push the result of a step (after it was run or skipped)."""
+        run_results = self._run_results
+        status = step.status
+        if not run_results.add(status, step.duration):
+            return
+        if status == Status.undefined:
+            if self.was_dry_run:
+                # -- SPECIAL CASE: In dry-run with undefined-step discovery
+                run_results.decide(Status.untested)
+            run_results.decide(Status.failed)
+        elif status != Status.passed:
+            run_results.decide(status)
+
     @property
     def duration(self):
+        run_results = self._run_results
+        if (run_results is not None and run_results.usable and
+                run_results.completed):
+            return run_results.duration
+
         # -- ORIG: for step in self.steps:  Background steps were excluded.
         scenario_duration = 0
         for step in self.all_steps:
@@ -1043,14 +1152,17 @@ class Scenario(TagAndStatusStatement, Replayable):
     @property
     def effective_tags(self):
         """
-        Effective tags for this scenario:
+        Effective tags for this scenario (as frozenset):
           * own tags
-          * tags inherited from its feature
+          * tags inherited from its rule and feature
+          * tags inherited from its scenario outline (and its examples)
+
+        Cached until its tags (or the tags of its containers) are changed.
+
+        .. versionchanged:: 1.2.7
+            Returns frozenset (was: list). Includes the tags of its rule.
         """
-        tags = self.tags
-        if self.feature:
-            tags = self.feature.tags + self.tags
-        return tags
+        return select_effective_tags(self, self.parent or self.feature)
 
     def should_run(self, config=None):
         """
@@ -1129,6 +1241,7 @@ class Scenario(TagAndStatusStatement, Replayable):
         self.clear_status()
         self.captured.reset()
         self.hook_failed = False
+        self._run_results = None
         failed = False
         skip_scenario_untested = runner.aborted
         run_scenario = self.should_run(runner.config)
@@ -1161,6 +1274,8 @@ class Scenario(TagAndStatusStatement, Replayable):
                 formatter.scenario(self)
 
         # TODO: Reevaluate location => Move in front of hook-calls
+        # HINT: Reuses the capture sinks (truncated at scenario boundary).
+        #       The logging handler is only installed while the scenario runs.
         runner.setup_capture()
 
         if run_scenario or runner.config.show_skipped:
@@ -1169,6 +1284,7 @@ class Scenario(TagAndStatusStatement, Replayable):
                     formatter.step(step)
 
         if not skip_scenario_untested:
+            self._run_results = RunResults()
             for step in self.all_steps:
                 if run_steps:
                     if not step.run(runner):
@@ -1209,6 +1325,8 @@ class Scenario(TagAndStatusStatement, Replayable):
                     #   * Undefined steps are not detected (by intention).
                     #   * Step skipped remaining scenario.
                     step.status = Status.skipped
+                self._add_step_result(step)
+            self._run_results.completed = True
 
         self.clear_status()  # -- ENFORCE: compute_status() after run.
         if not run_scenario and not self.steps:
@@ -1321,7 +1439,7 @@ class ScenarioOutlineBuilder(object):
                 # -- OOPS: Unknown placeholder, drop tag.
                 continue
             new_tag = Tag.make_name(tag, unescape=True)
-            tags.append(new_tag)
+            tags.append(intern_text(new_tag))
         return tags
 
     @classmethod
@@ -1339,18 +1457,27 @@ class ScenarioOutlineBuilder(object):
                 for step_row in new_step.table:
                     for i, cell in enumerate(step_row.cells):
                         step_row.cells[i] = cell.replace(placeholder, value)
+            new_step.table._update_heading_index()  # pylint: disable=protected-access
         return new_step
 
     def build_scenarios(self, scenario_outline):
         """Build scenarios for a ScenarioOutline from its examples."""
         # -- BUILD SCENARIOS (once): For this ScenarioOutline from examples.
+        return list(self.iter_scenarios(scenario_outline))
+
+    def iter_scenarios(self, scenario_outline):
+        """Build the scenarios of a ScenarioOutline on demand (one per
+        examples row). Used by the lazy scenario outline expansion.
+
+        :param scenario_outline:  ScenarioOutline to use (as template).
+        :return: Iterator/generator of scenarios.
+        """
         params = {
             "examples.name": None,
             "examples.index": None,
             "row.index": None,
             "row.id": None,
         }
-        scenarios = []
         for example_index, example in enumerate(scenario_outline.examples):
             example.index = example_index+1
             params["examples.name"] = example.name
@@ -1380,8 +1507,94 @@ class ScenarioOutlineBuilder(object):
                 scenario.background = scenario_outline.background
                 scenario.description = scenario_outline.description
                 scenario._row = row     # pylint: disable=protected-access
-                scenarios.append(scenario)
-        return scenarios
+                yield scenario
+
+
+class ScenarioResult(object):
+    """Compact result record of an executed (or skipped) scenario.
+    Used by the lazy scenario outline expansion: It replaces the scenario
+    of an examples row after it was run (and its steps are discarded).
+
+    The attributes are:
+
+    .. attribute:: keyword, name, location, tags, description
+
+       Same as for the :class:`~behave.model.Scenario`.
+
+    .. attribute:: status
+
+       Final status of the scenario (as :class:`~behave.model_core.Status`).
+
+    .. attribute:: duration
+
+       The time, in seconds, that it took to run the scenario.
+
+    .. attribute:: step_statuses
+
+       Status of each step (including background steps, as tuple).
+
+    .. attribute:: error_message
+
+       Error message of the failed step or hook (or None).
+
+    .. versionadded:: 1.2.7
+    """
+    __slots__ = ("keyword", "name", "location", "tags", "description",
+                 "status", "duration", "hook_failed", "step_statuses",
+                 "error_message", "feature", "parent")
+    type = "scenario"
+
+    def __init__(self, keyword, name, location, tags=None, status=None,
+                 duration=0.0, step_statuses=None, error_message=None):
+        self.keyword = keyword
+        self.name = name
+        self.location = location
+        self.tags = tags or []
+        self.description = []
+        self.status = status or Status.untested
+        self.duration = duration
+        self.hook_failed = False
+        self.step_statuses = tuple(step_statuses or ())
+        self.error_message = error_message
+        self.feature = None
+        self.parent = None
+
+    @classmethod
+    def from_scenario(cls, scenario):
+        """Create the result record of a (finished) scenario."""
+        error_message = scenario.error_message
+        step_statuses = []
+        for step in scenario.all_steps:
+            step_statuses.append(step.status)
+            if error_message is None and step.status == Status.failed:
+                error_message = step.error_message
+        result = cls(scenario.keyword, scenario.name, scenario.location,
+                     tags=scenario.tags, status=scenario.status,
+                     duration=scenario.duration, step_statuses=step_statuses,
+                     error_message=error_message)
+        result.description = scenario.description
+        result.hook_failed = scenario.hook_failed
+        result.feature = scenario.feature
+        result.parent = scenario.parent
+        return result
+
+    @property
+    def filename(self):
+        return self.location.filename
+
+    @property
+    def line(self):
+        return self.location.line
+
+    @property
+    def effective_tags(self):
+        return make_effective_tags(self)
+
+    def reset(self):
+        pass    # -- NOTHING TO RESET: Result data is discarded by its outline.
+
+    def __repr__(self):
+        return '<ScenarioResult "%s": %s>' % (self.name, self.status.name)
 
 
 class ScenarioOutline(Scenario):
@@ -1457,10 +1670,21 @@ class ScenarioOutline(Scenario):
 
        The line number of the *feature file* where the scenario was found.
 
+    .. attribute:: expand_lazily
+
+       Enables the lazy expansion mode (default: false). Then, the scenario
+       of each examples row is built just before it is run. After the run,
+       it is replaced by its :class:`~behave.model.ScenarioResult`.
+       Normally enabled by the runner (option: ``--outline-expansion=lazy``).
+
+       .. versionadded:: 1.2.7
+
     .. _`scenario outline`: gherkin.html#scenario-outlines
     """
     type = "scenario_outline"
     annotation_schema = ScenarioOutlineBuilder.annotation_schema
+    expand_lazily = False
+    __slots__ = ("examples", "_scenarios")
 
     def __init__(self, filename, line, keyword, name, tags=None,
                  steps=None, examples=None, description=None):
@@ -1472,9 +1696,32 @@ class ScenarioOutline(Scenario):
     def reset(self):
         """Reset runtime temporary data like before a test run."""
         super(ScenarioOutline, self).reset()
+        if self._has_scenario_results():
+            # -- LAZY EXPANSION: Discard results of the last run.
+            self._scenarios = []
         for scenario in self._scenarios:    # -- AVOID: BUILD-SCENARIOS
             scenario.reset()
 
+    def _has_scenario_results(self):
+        return bool(self._scenarios) and \
+            isinstance(self._scenarios[0], ScenarioResult)
+
+    def _should_expand_lazily(self):
+        """Indicates if scenarios are built on demand (and not stored)."""
+        return self.expand_lazily and \
+            (not self._scenarios or self._has_scenario_results())
+
+    def iter_scenarios(self):
+        """Provides the scenarios of this outline without storing them
+        if the lazy expansion mode is used (otherwise: same as scenarios).
+
+        .. versionadded:: 1.2.7
+        """
+        if self._should_expand_lazily():
+            builder = ScenarioOutlineBuilder(self.annotation_schema)
+            return builder.iter_scenarios(self)
+        return iter(self.scenarios)
+
     @property
     def scenarios(self):
         """Return the scenarios with the steps altered to take the values from
@@ -1495,6 +1742,16 @@ class ScenarioOutline(Scenario):
         return iter(self.scenarios) # -- REQUIRE: BUILD-SCENARIOS
 
     def compute_status(self):
+        run_results = self._run_results
+        if run_results is not None and run_results.usable:
+            # -- FAST-PATH: Use results that were pushed by the scenarios.
+            if run_results.status is not None:
+                return run_results.status
+            elif run_results.completed:
+                if 0 < run_results.skipped_count == run_results.count:
+                    return Status.skipped
+                return Status.passed
+
         skipped_count = 0
         for scenario in self._scenarios:    # -- AVOID: BUILD-SCENARIOS
             scenario_status = scenario.status
@@ -1508,8 +1765,22 @@ class ScenarioOutline(Scenario):
         # -- OTHERWISE: ALL PASSED (some scenarios may have been excluded)
         return Status.passed
 
+    def _add_scenario_result(self, scenario):
+        """Push the result of a scenario (after it was run)."""
+        run_results = self._run_results
+        status = scenario.status
+        if not run_results.add(status, scenario.duration):
+            return
+        if status in (Status.failed, Status.untested):
+            run_results.decide(status)
+
     @property
     def duration(self):
+        run_results = self._run_results
+        if (run_results is not None and run_results.usable and
+                run_results.completed):
+            return run_results.duration
+
         outline_duration = 0
         for scenario in self._scenarios:    # -- AVOID: BUILD-SCENARIOS
             outline_duration += scenario.duration
@@ -1525,7 +1796,7 @@ class ScenarioOutline(Scenario):
         if tag_expression.check(self.effective_tags):
             return True
 
-        for scenario in self.scenarios:     # -- REQUIRE: BUILD-SCENARIOS
+        for scenario in self.iter_scenarios():  # -- REQUIRE: BUILD-SCENARIOS
             if scenario.should_run_with_tags(tag_expression):
                 return True
         # -- NOTHING SELECTED:
@@ -1540,7 +1811,7 @@ class ScenarioOutline(Scenario):
         if not config.name:
             return True # -- SELECT-ALL: Select by name is not specified.
 
-        for scenario in self.scenarios:     # -- REQUIRE: BUILD-SCENARIOS
+        for scenario in self.iter_scenarios():  # -- REQUIRE: BUILD-SCENARIOS
             if scenario.should_run_with_name_select(config):
                 return True
         # -- NOTHING SELECTED:
@@ -1568,6 +1839,13 @@ class ScenarioOutline(Scenario):
 
         self.clear_status()
         self.should_skip = True
+        if self._should_expand_lazily():
+            # -- LAZY EXPANSION: Scenarios are skipped when they are built.
+            if not self._scenarios:
+                self.set_status(Status.skipped)
+            assert self.status in self.final_status
+            return
+
         for scenario in self.scenarios:
             scenario.skip(reason, require_not_executed)
         if not self.scenarios:
@@ -1578,16 +1856,55 @@ class ScenarioOutline(Scenario):
     def run(self, runner):
         # pylint: disable=protected-access
         # REASON: context._set_root_attribute(), scenario._row
+        if self._should_expand_lazily():
+            return self.run_lazily(runner)
+
         self.clear_status()
+        self._run_results = RunResults()
         failed_count = 0
         for scenario in self.scenarios:     # -- REQUIRE: BUILD-SCENARIOS
             runner.context._set_root_attribute("active_outline", scenario._row)
             failed = scenario.run(runner)
+            self._add_scenario_result(scenario)
             if failed:
                 failed_count += 1
                 if runner.config.stop or runner.aborted:
                     # -- FAIL-EARLY: Stop after first failure.
                     break
+        else:
+            self._run_results.completed = True
+        runner.context._set_root_attribute("active_outline", None)
+        return failed_count > 0
+
+    def run_lazily(self, runner):
+        """Run the scenario outline in lazy expansion mode:
+        Each scenario is built just before it is run. Afterwards, only its
+        :class:`ScenarioResult` is kept.
+
+        .. versionadded:: 1.2.7
+        """
+        # pylint: disable=protected-access
+        # REASON: context._set_root_attribute(), scenario._row
+        self.clear_status()
+        self._scenarios = []
+        self._run_results = RunResults()
+        builder = ScenarioOutlineBuilder(self.annotation_schema)
+        failed_count = 0
+        for scenario in builder.iter_scenarios(self):
+            if self.should_skip:
+                scenario.skip(require_not_executed=True)
+            runner.context._set_root_attribute("active_outline", scenario._row)
+            failed = scenario.run(runner)
+            scenario_result = ScenarioResult.from_scenario(scenario)
+            self._scenarios.append(scenario_result)
+            self._add_scenario_result(scenario_result)
+            if failed:
+                failed_count += 1
+                if runner.config.stop or runner.aborted:
+                    # -- FAIL-EARLY: Stop after first failure.
+                    break
+        else:
+            self._run_results.completed = True
         runner.context._set_root_attribute("active_outline", None)
         return failed_count > 0
 
@@ -1608,7 +1925,8 @@ class Examples(TagStatement, Replayable):
     .. attribute:: table
 
        An instance  of :class:`~behave.model.Table` that came with the example
-       in the *feature file*.
+       in the *feature file*. Or a :class:`~behave.model.TableFile`, if the
+       examples data is provided by a file (tag: ``@examples.file=FILENAME``).
 
     .. attribute:: filename
 
@@ -1622,6 +1940,8 @@ class Examples(TagStatement, Replayable):
     .. _`examples`: gherkin.html#examples
     """
     type = "examples"
+    data_file_tag_prefix = u"examples.file="
+    __slots__ = ("table", "index")
 
     def __init__(self, filename, line, keyword, name, tags=None, table=None):
         super(Examples, self).__init__(filename, line, keyword, name, tags)
@@ -1709,6 +2029,8 @@ class Step(BasicStatement, Replayable):
     .. _`step`: gherkin.html#steps
     """
     type = "step"
+    __slots__ = ("step_type", "text", "table", "status", "hook_failed",
+                 "duration")
 
     def __init__(self, filename, line, keyword, step_type, name, text=None,
                  table=None):
@@ -1851,6 +2173,100 @@ class Step(BasicStatement, Replayable):
         return keep_going
 
 
+class BackgroundStep(Step):
+    """Lightweight, per-scenario view of a background step (flyweight).
+
+    All scenarios of a feature/rule share the same background steps.
+    Instead of copying each background step for each scenario, the static
+    step data (keyword, name, step_type, text, table, location) is provided
+    by the shared background step. Only the run-time data (status, duration,
+    error information, captured output) is stored in this object.
+
+    Assigning any other attribute stores it in this object only
+    (copy-on-write), the shared background step is never modified.
+
+    .. versionadded:: 1.2.7
+    """
+    __slots__ = ("_step",)
+
+    def __init__(self, step):
+        # pylint: disable=super-init-not-called
+        # -- NOTE: Static step data is provided by the shared step.
+        while isinstance(step, BackgroundStep):
+            step = step._step
+        self._step = step
+        self._captured = None
+        self.reset()
+
+    def __getattr__(self, name):
+        # -- DELEGATE: Static data lookup to the shared background step.
+        if name == "_step" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._step, name)
+
+    @property
+    def step(self):
+        """Provides the shared background step (with the static data)."""
+        return self._step
+
+    def reset(self):
+        """Reset temporary runtime data to reach clean state again."""
+        # -- NOTE: Replace (instead of reset) a shared Captured object.
+        self._captured = None
+        super(BackgroundStep, self).reset()
+
+
+def make_effective_tags(scenario):
+    """Make the effective tags of a scenario (as frozenset).
+    The tags of its container (rule and feature, or scenario outline)
+    are inherited.
+
+    :param scenario:    Scenario (or ScenarioResult) to use.
+    :return: Effective tags (as frozenset).
+    """
+    tags = frozenset(scenario.tags)
+    container = scenario.parent or scenario.feature
+    if container is not None:
+        tags = container.effective_tags | tags
+    return tags
+
+
+def select_effective_tags(element, container):
+    """Provides the effective tags of a feature, rule or scenario
+    (as frozenset) that inherits the effective tags of its container.
+    The effective tags are cached in the element. The cache is invalidated
+    when the tags of the element or the effective tags of its container
+    are changed (for example: by a ``before_feature()`` hook).
+
+    :param element:     Model element with tags (and ``_effective_tags`` slot).
+    :param container:   Container of the element (or None).
+    :return: Effective tags (as frozenset).
+    """
+    # pylint: disable=protected-access
+    container_tags = None
+    if container is not None:
+        container_tags = container.effective_tags
+    key = (tuple(element.tags), container_tags)
+    cached = element._effective_tags
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    tags = frozenset(key[0])
+    if container_tags is not None:
+        tags = container_tags | tags
+    element._effective_tags = (key, tags)
+    return tags
+
+
+def make_background_steps(steps):
+    """Make per-scenario views of the (shared) background steps.
+
+    :param steps:   Background steps (to share).
+    :return: List of background steps (with own run-time data).
+    """
+    return [BackgroundStep(step) for step in steps]
+
+
 class Table(Replayable):
     """A `table`_ extracted from a *feature file*.
 
@@ -1865,6 +2281,12 @@ class Table(Replayable):
       table[0] gives the first non-heading row and table[-1] gives the last
       row.
 
+    **column access**
+      The cells of one column may be accessed (and type-converted) by using
+      :meth:`column()`, like ``table.column("freq", type=float)``.
+      A 2-D numeric array of the table is provided by :meth:`as_array()`
+      (requires: NumPy). Converted columns and arrays are cached per table.
+
     The attributes are:
 
     .. attribute:: headings
@@ -1888,12 +2310,92 @@ class Table(Replayable):
         self.headings = headings
         self.line = line
         self.rows = []
+        self._heading_index = make_heading_index(headings)
+        self._converted = {}
         if rows:
             for row in rows:
                 self.add_row(row, line)
 
     def add_row(self, row, line=None):
-        self.rows.append(Row(self.headings, row, line))
+        self.rows.append(Row(self.headings, row, line,
+                             heading_index=self._heading_index))
+        self._converted.clear()
+
+    def _update_heading_index(self):
+        """Rebuild the heading-to-index map that is shared with all rows.
+        Needed after the headings (or cells) were modified.
+        """
+        update_heading_index(self._heading_index, self.headings)
+        self._converted.clear()
+
+    def clear_cache(self):
+        """Discard cached column conversions (and arrays).
+        Needed if the cells of the table were modified directly,
+        like: ``row.cells[0] = u"other"``.
+        """
+        self._converted.clear()
+
+    def column(self, column_name, type=None):
+        # pylint: disable=redefined-builtin
+        """Provides the cells of one column (optionally type-converted).
+        The result is cached per table and conversion type.
+
+        EXAMPLE::
+
+            # -- FILE: features/steps/example_steps.py
+            @then(u'the measured waveform matches')
+            def step_impl(context):
+                frequencies = context.table.column("freq", type=float)
+                ...
+
+        :param column_name: Name of the column (or column index, as number).
+        :param type:        Optional converter for each cell (float, int, ...).
+        :return: Cell values of the column (as tuple).
+        :raises: KeyError, if the column is unknown.
+        """
+        column_index = column_name
+        if not isinstance(column_name, int):
+            try:
+                column_index = self.get_column_index(column_name)
+            except ValueError:
+                raise KeyError("column=%s is unknown" % column_name)
+
+        key = (column_index, type)
+        values = self._converted.get(key)
+        if values is None:
+            cells = [row.cells[column_index] for row in self.rows]
+            if type is not None:
+                cells = [type(cell) for cell in cells]
+            values = self._converted[key] = tuple(cells)
+        return values
+
+    def as_array(self, dtype=float, columns=None):
+        """Converts the table cells into a 2-D numeric array
+        (one array row per table row).
+        The (read-only) array is cached per table, dtype and columns.
+
+        :param dtype:   NumPy data type of the array (default: float).
+        :param columns: Optional column names to use (default: all columns).
+        :return: 2-D numpy array (shape: number of rows x columns).
+        :raises: ImportError, if NumPy is not installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("Table.as_array() requires numpy (not installed)")
+
+        if columns is None:
+            columns = self.headings
+        columns = tuple(columns)
+        key = (columns, numpy.dtype(dtype).str)
+        array = self._converted.get(key)
+        if array is None:
+            data = [self.column(name) for name in columns]
+            array = numpy.array(data, dtype=dtype).T.reshape(
+                len(self.rows), len(columns))
+            array.flags.writeable = False
+            self._converted[key] = array
+        return array
 
     def add_column(self, column_name, values=None, default_value=u""):
         """Adds a new column to this table.
@@ -1922,6 +2424,7 @@ class Table(Replayable):
         for row, value in zip(self.rows, values):
             assert len(row.cells) == new_column_index
             row.cells.append(value)
+        self._update_heading_index()
         return new_column_index
 
     def remove_column(self, column_name):
@@ -1937,6 +2440,7 @@ class Table(Replayable):
         for row in self.rows:
             assert column_index < len(row.cells)
             del row.cells[column_index]
+        self._update_heading_index()
 
     def remove_columns(self, column_names):
         for column_name in column_names:
@@ -1946,7 +2450,11 @@ class Table(Replayable):
         return column_name in self.headings
 
     def get_column_index(self, column_name):
-        return self.headings.index(column_name)
+        index = lookup_heading_index(self._heading_index, self.headings,
+                                     column_name)
+        if index is None:
+            raise ValueError("%r is not in headings" % column_name)
+        return index
 
     def require_column(self, column_name):
         """Require that a column exists in the table.
@@ -2020,6 +2528,97 @@ class Table(Replayable):
         raise NotImplementedError
 
 
+class TableFile(Replayable):
+    """A table whose rows are stored in an external CSV or TSV file.
+    Used as table of an :class:`~behave.model.Examples` section
+    if its data is provided by a file.
+
+    The rows are not kept in memory. Each iteration reads (streams) the rows
+    from the file. The first line of the file contains the headings.
+
+    .. code-block:: gherkin
+
+        Scenario Outline: Sweep <freq>
+          Given a signal with frequency <freq>
+          Then the amplitude is <amplitude>
+
+        @examples.file=data/sweep.csv
+        Examples: Frequency sweep
+
+    The attributes are:
+
+    .. attribute:: filename
+
+       Path of the data file (CSV: ``*.csv``, TSV: ``*.tsv``).
+
+    .. attribute:: headings
+
+       The headings of the table as a list of strings (first file line).
+
+    .. attribute:: line
+
+       The line number in the *feature file* (used by all rows).
+
+    .. versionadded:: 1.2.7
+    """
+    type = "table"
+    delimiters = {".csv": ",", ".tsv": "\t"}
+    encoding = "utf-8"
+
+    def __init__(self, filename, line=None, delimiter=None):
+        Replayable.__init__(self)
+        if delimiter is None:
+            extension = os.path.splitext(filename)[1].lower()
+            delimiter = self.delimiters.get(extension, ",")
+        self.filename = filename
+        self.line = line
+        self.delimiter = delimiter
+        self._headings = None
+        self._heading_index = None
+
+    def _open(self):
+        return io.open(self.filename, encoding=self.encoding, newline="")
+
+    def _read_cells(self, stream):
+        for cells in csv.reader(stream, delimiter=self.delimiter):
+            if not cells or not "".join(cells).strip():
+                continue    # -- SKIP: Empty lines.
+            yield [_text(cell).strip() for cell in cells]
+
+    @property
+    def headings(self):
+        if self._headings is None:
+            headings = []
+            with self._open() as stream:
+                for cells in self._read_cells(stream):
+                    headings = cells
+                    break
+            self._headings = headings
+            self._heading_index = make_heading_index(headings)
+        return self._headings
+
+    def __iter__(self):
+        """Stream the rows (without headings) from the data file."""
+        headings = self.headings
+        with self._open() as stream:
+            data_rows = self._read_cells(stream)
+            next(data_rows, None)   # -- SKIP: Headings
+            for cells in data_rows:
+                if len(cells) != len(headings):
+                    message = "%s: Malformed table row (expected: %d cells): %s"
+                    raise ValueError(message % (self.filename, len(headings),
+                                                ", ".join(cells)))
+                yield Row(headings, cells, self.line,
+                          heading_index=self._heading_index)
+
+    @property
+    def rows(self):
+        return list(self)
+
+    def __repr__(self):
+        return '<TableFile: "%s">' % self.filename
+
+
 class Row(object):
     """One row of a `table`_ parsed from a *feature file*.
 
@@ -2049,20 +2648,33 @@ class Row(object):
     Rows are also comparable, for what that's worth. Only the cells are
     compared.
 
+    .. note::
+        Rows of a :class:`Table` share the headings and the heading-to-index
+        map of their table. Therefore, named access does not need to scan
+        the headings.
+
     .. _`table`: gherkin.html#table
     """
-    def __init__(self, headings, cells, line=None, comments=None):
+    __slots__ = ("headings", "cells", "line", "comments", "index", "id",
+                 "_heading_index")
+
+    def __init__(self, headings, cells, line=None, comments=None,
+                 heading_index=None):
+        if heading_index is None:
+            heading_index = make_heading_index(headings)
         self.headings = headings
         self.comments = comments
         for c in cells:
             assert isinstance(c, six.text_type)
         self.cells = cells
         self.line = line
+        self.index = None
+        self.id = None      # pylint: disable=invalid-name
+        self._heading_index = heading_index
 
     def __getitem__(self, name):
-        try:
-            index = self.headings.index(name)
-        except ValueError:
+        index = lookup_heading_index(self._heading_index, self.headings, name)
+        if index is None:
             if isinstance(name, int):
                 index = name
             else:
@@ -2112,12 +2724,17 @@ class Tag(six.text_type):
     """
     allowed_chars = u"._-=:,;()"    # In addition to aplha-numerical chars.
     quoting_chars = ("'", '"', "<", ">")
+    __slots__ = ("line",)
 
     def __new__(cls, name, line):
         o = six.text_type.__new__(cls, name)
         o.line = line
         return o
 
+    def __getnewargs__(self):
+        # -- NEEDED-FOR: copy, pickle (with slots).
+        return (six.text_type(self), self.line)
+
     @classmethod
     def make_name(cls, text, unescape=False, allowed_chars=None):
         """Translate text into a "valid tag" without whitespace, etc.
@@ -2213,6 +2830,51 @@ class Text(six.text_type):
 # -----------------------------------------------------------------------------
 # UTILITY FUNCTIONS:
 # -----------------------------------------------------------------------------
+def make_heading_index(headings):
+    """Build a map from table heading to its column index.
+    If a heading occurs more than once, the first column is used
+    (like: ``headings.index(name)``).
+
+    :param headings:  Table headings (as list of strings).
+    :return: Heading-to-index map (as dict).
+    """
+    heading_index = {}
+    update_heading_index(heading_index, headings)
+    return heading_index
+
+
+def update_heading_index(heading_index, headings):
+    """Rebuild a heading-to-index map in-place.
+    The map object is shared by all rows of a table.
+    """
+    heading_index.clear()
+    for index, heading in enumerate(headings):
+        heading_index.setdefault(heading, index)
+
+
+def lookup_heading_index(heading_index, headings, name):
+    """Lookup the column index of a heading by using a heading-to-index map.
+    The map is rebuilt if it is out-of-date, for example, when someone
+    modified the headings list directly.
+
+    :return: Column index (as number) or None, if heading is unknown.
+    """
+    try:
+        index = heading_index.get(name)
+    except TypeError:
+        return None     # -- UNHASHABLE: slice, ...
+    if index is not None:
+        if index < len(headings) and headings[index] == name:
+            return index
+    elif not isinstance(name, six.string_types) or name not in headings:
+        # -- UNKNOWN HEADING: Or column index (as number).
+        return None
+
+    # -- SLOW PATH: Map is outdated (headings were modified directly).
+    update_heading_index(heading_index, headings)
+    return heading_index.get(name)
+
+
 def reset_model(model_elements):
     """Reset the test run information stored in model elements.
 
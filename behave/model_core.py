@@ -4,6 +4,7 @@ This module provides the abstract base classes and core concepts
 for the model elements in behave.
 """
 
+import numbers
 import os.path
 import sys
 import six
@@ -17,6 +18,43 @@ def posixpath_normalize(path):
     return path.replace("\\", "/")
 
 
+def make_bounded_intern_text(max_size=10000):
+    """Provides an intern function that stores at most ``max_size``
+    distinct texts (used on Python 2, where unicode texts cannot be interned
+    with :func:`intern()`). Texts beyond this limit are not shared,
+    so that the stored texts cannot grow for the whole process.
+    """
+    interned_texts = {}
+
+    def intern_text(text):
+        """Share repeated strings (keywords, filenames, tag names, ...).
+
+        :param text:    Text to intern.
+        :return: Interned text (first occurrence of an equal text).
+        """
+        interned = interned_texts.get(text)
+        if interned is not None:
+            return interned
+        if len(interned_texts) < max_size:
+            interned_texts[text] = text
+        return text
+    return intern_text
+
+
+if six.PY2:
+    intern_text = make_bounded_intern_text()
+else:
+    def intern_text(text):
+        """Share repeated strings (keywords, filenames, tag names, ...).
+
+        :param text:    Text to intern.
+        :return: Interned text (first occurrence of an equal text).
+        """
+        if type(text) is str:   # pylint: disable=unidiomatic-typecheck
+            return sys.intern(text)
+        return text
+
+
 # -----------------------------------------------------------------------------
 # GENERIC MODEL CLASSES:
 # -----------------------------------------------------------------------------
@@ -114,6 +152,8 @@ class Argument(object):
 
        The end index in the step name of the argument. Used for display.
     """
+    __slots__ = ("start", "end", "original", "value", "name")
+
     def __init__(self, start, end, original, value, name=None):
         self.start = start
         self.end = end
@@ -137,11 +177,12 @@ class FileLocation(object):
       * "{filename}" (if line number is not present)
     """
     __pychecker__ = "missingattrs=line"     # -- Ignore warnings for 'line'.
+    __slots__ = ("filename", "line")
 
     def __init__(self, filename, line=None):
         if PLATFORM_WIN:
             filename = posixpath_normalize(filename)
-        self.filename = filename
+        self.filename = intern_text(filename)
         self.line = line
 
     def get(self):
@@ -266,21 +307,52 @@ class FileLocation(object):
 # ABSTRACT MODEL CLASSES (and concepts):
 # -----------------------------------------------------------------------------
 class BasicStatement(object):
+    """Abstract base class for all statements of a *feature file*.
+
+    The model classes use ``__slots__`` for their attributes to reduce
+    the memory footprint of large test runs (many features, steps, ...).
+
+    EXTENSION MECHANISM:
+    Additional attributes, that are not part of the model class, can still be
+    assigned to any model element (for example: by hooks or formatters).
+    They are stored in the per-instance ``__dict__`` that is only created
+    when the first additional attribute is assigned.
+    Subclasses should provide ``__slots__`` for their own attributes.
+
+    .. versionchanged:: 1.2.7
+        Uses ``__slots__`` and interned keywords/filenames.
+    """
+    __slots__ = ("location", "keyword", "name", "_captured",
+                 "exception", "exc_traceback", "error_message",
+                 "__dict__")
+
     def __init__(self, filename, line, keyword, name):
         filename = filename or '<string>'
         filename = os.path.relpath(filename, os.getcwd())   # -- NEEDS: abspath?
         self.location = FileLocation(filename, line)
         assert isinstance(keyword, six.text_type)
         assert isinstance(name, six.text_type)
-        self.keyword = keyword
+        self.keyword = intern_text(keyword)
         self.name = name
         # -- SINCE: 1.2.6
-        self.captured = Captured()
+        self._captured = None
         # -- ERROR CONTEXT INFO:
         self.exception = None
         self.exc_traceback = None
         self.error_message = None
 
+    @property
+    def captured(self):
+        """Captured output data (as :class:`~behave.capture.Captured`)."""
+        if self._captured is None:
+            # -- LAZY-INIT: Most statements never store any captured output.
+            self._captured = Captured()
+        return self._captured
+
+    @captured.setter
+    def captured(self, value):
+        self._captured = value
+
     @property
     def filename(self):
         # return os.path.abspath(self.location.filename)
@@ -292,7 +364,8 @@ class BasicStatement(object):
 
     def reset(self):
         # -- RESET: Captured output data
-        self.captured.reset()
+        if self._captured is not None:
+            self._captured.reset()
         # -- RESET: ERROR CONTEXT INFO
         self.exception = None
         self.exc_traceback = None
@@ -341,6 +414,7 @@ class BasicStatement(object):
 
 
 class TagStatement(BasicStatement):
+    __slots__ = ("tags",)
 
     def __init__(self, filename, line, keyword, name, tags):
         if tags is None:
@@ -360,6 +434,8 @@ class TagStatement(BasicStatement):
 class TagAndStatusStatement(BasicStatement):
     # final_status = ('passed', 'failed', 'skipped')
     final_status = (Status.passed, Status.failed, Status.skipped)
+    __slots__ = ("parent", "tags", "should_skip", "skip_reason",
+                 "_cached_status")
 
     def __init__(self, filename, line, keyword, name, tags, parent=None):
         super(TagAndStatusStatement, self).__init__(filename, line, keyword, name)
@@ -401,7 +477,71 @@ class TagAndStatusStatement(BasicStatement):
         raise NotImplementedError
 
 
+class RunResults(object):
+    """Aggregates the results (status, duration) of the run items of a model
+    element incrementally, while the run items are run (in order).
+    Each run item pushes its result after it was run.
+
+    .. attribute:: status
+
+        Status that is already decided by the results so far (or None).
+
+    .. attribute:: duration
+
+        Sum of the durations of all run items so far (in seconds).
+
+    .. attribute:: completed
+
+        Indicates that all run items have pushed their results.
+
+    .. attribute:: usable
+
+        Indicates if the results can be used. A run item that provides
+        no model result (like a duck-typed run item) disables them.
+
+    .. versionadded:: 1.2.7
+    """
+    __slots__ = ("status", "duration", "count", "passed_count",
+                 "skipped_count", "completed", "usable")
+
+    def __init__(self):
+        self.status = None
+        self.duration = 0
+        self.count = 0
+        self.passed_count = 0
+        self.skipped_count = 0
+        self.completed = False
+        self.usable = True
+
+    def add(self, status, duration=0):
+        """Add the result of the next run item.
+
+        :param status:      Status of the run item.
+        :param duration:    Duration of the run item (in seconds).
+        :return: True, if result was added. False, if results are unusable.
+        """
+        if not (self.usable and isinstance(status, Status) and
+                isinstance(duration, numbers.Number)):
+            # -- UNSUPPORTED RUN ITEM: Status/duration must be recomputed.
+            self.usable = False
+            return False
+
+        self.count += 1
+        self.duration += duration
+        if status == Status.passed:
+            self.passed_count += 1
+        elif status == Status.skipped:
+            self.skipped_count += 1
+        return True
+
+    def decide(self, status):
+        """Decide the status if it is not already decided (first one wins)."""
+        if self.status is None:
+            self.status = status
+
+
 class Replayable(object):
+    __slots__ = ()
     type = None
 
     def replay(self, formatter):
@@ -0,0 +1,1243 @@
+# -*- coding: UTF-8 -*-
+"""
+Runs features in parallel worker processes (option: ``--jobs=N``).
+
+Each worker process runs its own runner (with ``before_all()`` and
+``after_all()`` hooks) and asks the main process for its next work unit.
+A work unit is a feature or, with ``--parallel-unit=scenario``,
+a scenario (or a row of a scenario outline).
+Instead of the configured formatters, a worker uses an :class:`EventRecorder`
+that records the formatter callbacks (with model keys) and the run-time
+state of the model elements (status, duration, error information,
+captured output). The recorded events of each feature are streamed back
+to the main process.
+
+The main process applies the results to its own model (of the same features)
+and replays the formatter callbacks in the order of the features. Therefore,
+the configured formatters and reporters see the same protocol as in a
+serial run.
+
+.. code-block:: sh
+
+    behave --jobs=4 --format=pretty --junit features/
+
+WORK STEALING: The work units are dealt to the work queues of the workers
+in contiguous blocks (to keep the scenarios of a feature together).
+A worker with an empty work queue steals a work unit from the end of the
+longest work queue of the other workers. A worker runs the
+``before_feature()`` and ``after_feature()`` hooks around each part of a
+feature that it runs. A feature or scenario that is tagged with ``@serial``
+is pinned to the first worker (and never stolen). A feature that is
+tagged with ``@serial`` is not split into scenarios.
+
+LONGEST FIRST: If a run history is used (option: ``--run-history=FILE``),
+the work units are dealt to the work queues by their expected duration
+(longest first, to the work queue with the least expected duration).
+
+RESOURCES: A scenario that requires shared test resources (by using tags,
+like: ``@resource.scope=1``) is only run if the resources can be leased from
+the resource pool (see :mod:`behave.resource_pool`). A worker that has only
+work units with unavailable resources waits until another worker releases
+its resources.
+
+FORK-SERVER: With ``--fork-server`` (POSIX only), the main process runs the
+``before_all()`` hook once before it forks the worker processes. The workers
+inherit the initialized state (copy-on-write) and do not run the
+``before_all()`` and ``after_all()`` hooks. The ``after_all()`` hook is run
+by the main process after all workers are finished.
+
+RECYCLING: With ``--max-scenarios-per-worker=N``, a worker process is
+replaced by a new one after it has run N scenarios (at the end of a work
+unit). With ``--max-worker-memory=SIZE``, a worker process is replaced
+when its RSS has grown by more than SIZE after the before_all() hook
+(see :mod:`behave.memory_usage`).
+This limits the effects of memory leaks and damaged global state.
+
+FAIL-FAST: If ``--stop`` is used, a worker that detects a failed feature
+tells all workers to stop. Features that are already running are completed,
+any other feature is reported as not run (untested).
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import, print_function
+import collections
+import contextlib
+import multiprocessing
+import pickle
+import sys
+import six
+from six.moves.queue import Empty
+from behave.capture import Captured
+from behave.configuration import Configuration
+from behave.formatter.base import Formatter
+from behave.matchers import Match, NoMatch
+from behave.memory_usage import MemoryUsage
+from behave.model import Rule, Scenario, ScenarioContainer, ScenarioOutline, Step
+from behave.model_core import Argument, FileLocation, Status
+from behave.resource_pool import ResourcePool
+from behave.runner import Context
+from behave.textutil import text as _text
+
+
+class RemoteError(Exception):
+    """Used for an exception of a worker process that cannot be transferred
+    to the main process (because it cannot be pickled).
+    The error message contains the original exception class name.
+    """
+
+
+# -----------------------------------------------------------------------------
+# MODEL KEYS AND RUN-TIME STATE:
+# -----------------------------------------------------------------------------
+def iter_model_elements(scenario_container):
+    """Provides all model elements of a feature (or rule) that are used
+    in the formatter protocol (in a deterministic order).
+    """
+    yield scenario_container
+    background = scenario_container.background
+    if background is not None:
+        yield background
+        for step in background.steps:
+            yield step
+    for run_item in scenario_container.run_items:
+        if isinstance(run_item, Rule):
+            for element in iter_model_elements(run_item):
+                yield element
+            continue
+
+        yield run_item
+        scenarios = [run_item]
+        if isinstance(run_item, ScenarioOutline):
+            scenarios = run_item.scenarios
+            for scenario in scenarios:
+                yield scenario
+        for scenario in scenarios:
+            for step in scenario.all_steps:
+                yield step
+
+
+class ModelIndex(object):
+    """Maps the model elements of a feature to keys (and back).
+    A key is the index of the model element in :func:`iter_model_elements()`.
+    Therefore, a key can be resolved in another process that has parsed
+    the same feature.
+    """
+
+    def __init__(self, feature):
+        self.feature = feature
+        self.elements = list(iter_model_elements(feature))
+        self._keys = dict((id(element), key)
+                          for key, element in enumerate(self.elements))
+
+    def key_of(self, element):
+        """Provides the key of a model element (or None, if it is unknown)."""
+        return self._keys.get(id(element))
+
+    def iter_scenario_keys(self):
+        """Provides the keys of all scenarios (in run order)
+        with the key of their rule (or None).
+        """
+        rule_key = None
+        for element in self.feature.walk_scenarios(with_rules=True):
+            if isinstance(element, Rule):
+                rule_key = self.key_of(element)
+                continue
+            yield rule_key, self.key_of(element)
+
+
+def narrow_run_items(scenario_container, selected, saved):
+    """Removes all run items that contain no selected scenario.
+    The original attribute values are stored in the ``saved`` list.
+
+    :return: True, if any run item remains.
+    """
+    # pylint: disable=protected-access
+    run_items = []
+    for run_item in scenario_container.run_items:
+        if isinstance(run_item, Rule):
+            if narrow_run_items(run_item, selected, saved):
+                run_items.append(run_item)
+        elif isinstance(run_item, ScenarioOutline):
+            scenarios = [scenario for scenario in run_item.scenarios
+                         if id(scenario) in selected]
+            if scenarios:
+                saved.append((run_item, "_scenarios", run_item._scenarios))
+                run_item._scenarios = scenarios
+                run_items.append(run_item)
+        elif id(run_item) in selected:
+            run_items.append(run_item)
+    saved.append((scenario_container, "run_items", scenario_container.run_items))
+    scenario_container.run_items = run_items
+    return bool(run_items)
+
+
+@contextlib.contextmanager
+def select_scenarios(feature, scenarios=None):
+    """Narrows a feature (temporarily) to some of its scenarios,
+    so that only these scenarios are run (and reported).
+
+    :param feature:     Feature to use.
+    :param scenarios:   Scenarios to select (or None, to select all).
+    """
+    if scenarios is None:
+        yield feature
+        return
+
+    saved = []
+    narrow_run_items(feature, set(id(scenario) for scenario in scenarios),
+                     saved)
+    try:
+        yield feature
+    finally:
+        for element, name, value in reversed(saved):
+            setattr(element, name, value)
+
+
+STATE_NAMES = ("error_message",)
+STEP_STATE_NAMES = STATE_NAMES + ("status", "duration", "hook_failed")
+SCENARIO_STATE_NAMES = STATE_NAMES + ("_cached_status", "should_skip",
+                                      "skip_reason", "hook_failed",
+                                      "was_dry_run")
+CONTAINER_STATE_NAMES = STATE_NAMES + ("_cached_status", "should_skip",
+                                       "skip_reason", "hook_failed",
+                                       "run_starttime", "run_endtime")
+
+
+def select_state_names(element):
+    if isinstance(element, Step):
+        return STEP_STATE_NAMES
+    elif isinstance(element, Scenario):
+        return SCENARIO_STATE_NAMES
+    elif isinstance(element, ScenarioContainer):
+        return CONTAINER_STATE_NAMES
+    return STATE_NAMES
+
+
+def make_transferable_exception(exception):
+    """Ensures that an exception can be transferred to another process.
+    Otherwise, it is replaced by an exception with its description.
+    """
+    if exception is None:
+        return None
+    try:
+        pickle.loads(pickle.dumps(exception))
+        return exception
+    except Exception:   # pylint: disable=broad-except
+        if isinstance(exception, AssertionError):
+            return AssertionError(_text(exception))
+        return RemoteError(u"%s: %s" % (exception.__class__.__name__,
+                                        _text(exception)))
+
+
+def make_transferable_captured(captured):
+    if not captured:
+        return None
+    # -- HINT: Captured output may be spilled into a file (read it as text).
+    return Captured(_text(captured.stdout), _text(captured.stderr),
+                    _text(captured.log_output))
+
+
+def make_state(element):
+    """Provides the run-time state of a model element (as dict)."""
+    state = dict((name, getattr(element, name))
+                 for name in select_state_names(element))
+    # pylint: disable=protected-access
+    state["exception"] = make_transferable_exception(element.exception)
+    state["captured"] = make_transferable_captured(element._captured)
+    return state
+
+
+def apply_state(element, state):
+    """Applies the run-time state of a model element from a worker process.
+    NOTE: The traceback of an exception is only provided as text
+    (as part of the error message).
+    """
+    for name, value in six.iteritems(state):
+        if name == "captured":
+            if value is not None:
+                element.captured = value
+            continue
+        setattr(element, name, value)
+
+
+def merge_state(element, state):
+    """Merges the run-time state of a feature, rule or scenario outline
+    from a partial run (work unit) with the state of the other parts.
+    Its status is recomputed from its scenarios (unless a part failed).
+    """
+    if state.get("hook_failed"):
+        element.hook_failed = True
+    if state.get("_cached_status") == Status.failed:
+        element.set_status(Status.failed)
+    if not element.error_message and state.get("error_message"):
+        element.error_message = state["error_message"]
+        element.exception = state["exception"]
+    if state.get("captured") is not None:
+        element.captured.add(state["captured"])
+    for name, select in (("run_starttime", min), ("run_endtime", max)):
+        value = state.get(name)
+        if value is not None:
+            old_value = getattr(element, name)
+            if old_value is not None:
+                value = select(old_value, value)
+            setattr(element, name, value)
+
+
+def make_match_data(match):
+    if match is None or isinstance(match, NoMatch):
+        return None
+    location = None
+    if match.location:
+        location = (match.location.filename, match.location.line)
+    arguments = [(argument.start, argument.end, argument.original,
+                  argument.value, argument.name)
+                 for argument in match.arguments or []]
+    try:
+        pickle.dumps(arguments)
+    except Exception:   # pylint: disable=broad-except
+        # -- CASE: Type-converted value cannot be transferred => Use text.
+        arguments = [(start, end, original, original, name)
+                     for start, end, original, _, name in arguments]
+    return (location, arguments)
+
+
+def make_match(match_data):
+    """Rebuilds the step match (without step function) of a worker."""
+    if match_data is None:
+        return NoMatch()
+    location, arguments = match_data
+    match = Match(None, [Argument(*argument) for argument in arguments])
+    if location:
+        match.location = FileLocation(*location)
+    return match
+
+
+# -----------------------------------------------------------------------------
+# WORKER PROCESS:
+# -----------------------------------------------------------------------------
+class EventRecorder(Formatter):
+    """Formatter of a worker process that records the formatter callbacks
+    (as events with model keys) instead of writing any output.
+    """
+    name = "parallel.events"
+    description = "Records formatter events of a parallel worker."
+    requires_expanded_outlines = True
+
+    def __init__(self, config):
+        # pylint: disable=super-init-not-called
+        self.stream_opener = None
+        self.stream = None
+        self.config = config
+        self.events = []
+        self.model_index = None
+
+    def start_feature(self, feature):
+        self.events = []
+        self.model_index = ModelIndex(feature)
+
+    def record(self, name, element):
+        key = self.model_index.key_of(element)
+        if key is not None:
+            self.events.append((name, key))
+
+    def uri(self, uri):
+        self.events.append(("uri", uri))
+
+    def feature(self, feature):
+        self.record("feature", feature)
+
+    def rule(self, rule):
+        self.record("rule", rule)
+
+    def rule_finished(self):
+        self.events.append(("rule_finished",))
+
+    def background(self, background):
+        self.record("background", background)
+
+    def scenario(self, scenario):
+        self.record("scenario", scenario)
+
+    def step(self, step):
+        self.record("step", step)
+
+    def match(self, match):
+        self.events.append(("match", make_match_data(match)))
+
+    def result(self, step):
+        key = self.model_index.key_of(step)
+        if key is not None:
+            self.events.append(("result", key, make_state(step)))
+
+    def eof(self):
+        self.events.append(("eof",))
+
+    def make_states(self):
+        """Provides the run-time state of all model elements of the feature
+        (or its selected scenarios) as list of ``(key, state)`` pairs.
+        """
+        model_index = self.model_index
+        return [(model_index.key_of(element), make_state(element))
+                for element in iter_model_elements(model_index.feature)]
+
+
+class EventSegments(object):
+    """Splits the recorded events of a (partial) feature run into segments:
+
+    * prologue: Events before the first rule/scenario (feature, background)
+    * rule prologues: Events of a rule before its first scenario
+    * scenario segments: Events of a scenario (scenario, steps and results)
+    """
+
+    def __init__(self, events):
+        self.prologue = []
+        self.rules = {}
+        self.scenarios = {}
+        segment = self.prologue
+        for event in events:
+            name = event[0]
+            if name == "rule":
+                segment = self.rules[event[1]] = [event]
+            elif name == "scenario":
+                segment = self.scenarios[event[1]] = [event]
+            elif name in ("rule_finished", "eof"):
+                segment = []    # -- DISCARD: Is provided by merge.
+            else:
+                segment.append(event)
+
+
+def merge_events(model_index, event_lists):
+    """Merges the recorded events of the parts of a feature (work units)
+    into the events of one feature run (in the order of its scenarios).
+
+    :param model_index: Model index of the feature.
+    :param event_lists: Recorded events of each part (as list of lists).
+    :return: Merged events (as list).
+    """
+    all_segments = [EventSegments(events) for events in event_lists]
+    events = []
+    for segments in all_segments:
+        if segments.prologue:
+            events.extend(segments.prologue)
+            break
+
+    def select_segment(name, key):
+        for segments in all_segments:
+            segment = getattr(segments, name).get(key)
+            if segment is not None:
+                return segment
+        return None
+
+    current_rule_key = None
+    rule_shown = False
+    for rule_key, scenario_key in model_index.iter_scenario_keys():
+        scenario_segment = select_segment("scenarios", scenario_key)
+        if scenario_segment is None:
+            continue    # -- SCENARIO NOT SHOWN: Not run/not selected.
+        if rule_key != current_rule_key:
+            if rule_shown:
+                events.append(("rule_finished",))
+            rule_segment = select_segment("rules", rule_key)
+            rule_shown = rule_segment is not None
+            events.extend(rule_segment or [])
+            current_rule_key = rule_key
+        events.extend(scenario_segment)
+    if rule_shown:
+        events.append(("rule_finished",))
+    if any(("eof",) in event_list for event_list in event_lists):
+        events.append(("eof",))
+    return events
+
+
+class ParallelWorker(object):
+    """Runs the work units that it gets from the main process
+    in a worker process and sends the results to the main process.
+
+    Messages (as tuples) on the result queue:
+
+    * ``("ready", worker_id, None, max_size)``: Worker needs its next work
+      unit (with at most max_size scenarios, or None if unlimited).
+    * ``("unit", worker_id, unit_id, result)``: Work unit was run.
+    * ``("not_run", worker_id, unit_id, None)``: Work unit was not run.
+    * ``("done", worker_id, None, summary)``: Worker is finished.
+
+    The main process answers each "ready" message with the next work unit
+    (or None, if no work unit is left) on the task queue of this worker.
+
+    A worker with a maximum number of scenarios (or a memory limit) retires
+    (stops to ask for work units) after it has run this number of scenarios
+    (or after its RSS growth has exceeded the memory limit). A worker of
+    the fork-server inherits the state of the ``before_all()`` hook from
+    the main process (and does not run the ``before_all()`` and
+    ``after_all()`` hooks itself).
+    """
+
+    def __init__(self, worker_id, task_queue, result_queue, stop_event,
+                 max_scenarios=None, inherits_hooks=False, max_memory=None):
+        self.worker_id = worker_id
+        self.task_queue = task_queue
+        self.result_queue = result_queue
+        self.stop_event = stop_event
+        self.max_scenarios = max_scenarios
+        self.max_memory = max_memory
+        self.inherits_hooks = inherits_hooks
+        self.scenario_count = 0
+        self.retired = False
+        self.recorder = None
+
+    def should_retire(self, runner):
+        """Indicates if this worker should be replaced by a new worker
+        process (after it has run its maximum number of scenarios or
+        its RSS growth has exceeded its memory limit).
+        """
+        if self.max_scenarios and self.scenario_count >= self.max_scenarios:
+            return True
+        memory_tracker = runner.memory_tracker
+        if self.max_memory and memory_tracker is not None:
+            rss_growth = memory_tracker.growth().rss
+            return rss_growth is not None and rss_growth > self.max_memory
+        return False
+
+    def select_max_size(self):
+        """Provides the maximum number of scenarios of the next work unit
+        (before this worker retires), or None if it is unlimited.
+        """
+        if not self.max_scenarios:
+            return None
+        return max(1, self.max_scenarios - self.scenario_count)
+
+    def send(self, kind, unit_id=None, data=None):
+        self.result_queue.put((kind, self.worker_id, unit_id, data))
+
+    def setup_runner(self, runner, features):
+        """Prepares the runner of this worker to run its features.
+        Called by :meth:`behave.runner.ModelRunner.run_model()`.
+
+        :return: Features to run (as iterator that uses the work units).
+        """
+        self.recorder = EventRecorder(runner.config)
+        runner.formatters = [self.recorder]
+        # -- REPORTERS: Are only used by the main process.
+        runner.config.reporters = []
+        return self.iter_features(runner, list(features))
+
+    @staticmethod
+    def select_feature(features, feature_index):
+        """Provides the feature of a work unit (that is run by this worker)."""
+        return features[feature_index]
+
+    def iter_work_units(self):
+        while not self.retired:
+            self.send("ready", data=self.select_max_size())
+            work_unit = self.task_queue.get()
+            if work_unit is None:
+                return
+            yield work_unit
+
+    def iter_features(self, runner, features):
+        undefined_steps_size = len(runner.undefined_steps)
+        uses_resources = bool(runner.make_resource_pool().resources)
+        for work_unit in self.iter_work_units():
+            if self.stop_event.is_set() or runner.aborted:
+                self.send("not_run", work_unit.unit_id)
+                continue
+
+            feature = self.select_feature(features, work_unit.feature_index)
+            if uses_resources:
+                runner.context._set_root_attribute("resource_lease",
+                                                   work_unit.lease or {})
+            self.recorder.start_feature(feature)
+            model_index = self.recorder.model_index
+            scenarios = None
+            if work_unit.scenario_keys is not None:
+                scenarios = [model_index.elements[key]
+                             for key in work_unit.scenario_keys]
+            with select_scenarios(feature, scenarios):
+                yield feature
+
+                # -- WORK UNIT IS FINISHED: Send its results.
+                undefined_steps = runner.undefined_steps[undefined_steps_size:]
+                undefined_steps_size = len(runner.undefined_steps)
+                failed = (feature.status == Status.failed)
+                result = dict(events=self.recorder.events,
+                              states=self.recorder.make_states(),
+                              undefined_steps=[model_index.key_of(step)
+                                               for step in undefined_steps],
+                              failed=failed,
+                              memory_usage=feature.memory_usage)
+            self.scenario_count += len(scenarios or feature.walk_scenarios())
+            self.retired = self.should_retire(runner)
+            self.send("unit", work_unit.unit_id, result)
+            if failed and runner.config.stop:
+                # -- FAIL-EARLY: Tell all workers to stop.
+                self.stop_event.set()
+
+    def run(self, runner_spec):
+        """Runs the work units with the runner of the runner spec.
+
+        :return: True, if the worker failed. False, otherwise.
+        """
+        summary = dict(failed=True, hook_failures=0, aborted=False,
+                       retired=False)
+        try:
+            runner = runner_spec.make_runner()
+            runner.parallel_worker = self
+            summary["failed"] = runner_spec.run(runner)
+            summary["hook_failures"] = runner.hook_failures
+            summary["aborted"] = runner.aborted
+            summary["retired"] = self.retired
+        except Exception as e:  # pylint: disable=broad-except
+            print("PARALLEL-WORKER-ERROR (worker=%s): %s: %s" %
+                  (self.worker_id, e.__class__.__name__, e))
+        finally:
+            sys.stdout.flush()
+            self.send("done", data=summary)
+        return summary["failed"]
+
+
+def run_parallel_worker(worker, runner_spec):
+    """Entry point of a worker process."""
+    worker.run(runner_spec)
+
+
+class InheritedRunner(object):
+    """Uses the runner (and its features) of the main process
+    in a forked worker process.
+    """
+
+    def __init__(self, runner, features):
+        self.runner = runner
+        self.features = features
+
+    def make_runner(self):
+        return self.runner
+
+    def run(self, runner):
+        return runner.run_model(self.features)
+
+
+class RunnerFactory(object):
+    """Creates a new runner in a worker process (if fork is not supported).
+    The runner loads hooks, steps and features with the command-line args
+    of the main process.
+    """
+
+    def __init__(self, runner_class, command_args):
+        self.runner_class = runner_class
+        self.command_args = command_args
+
+    def make_runner(self):
+        config = Configuration(self.command_args)
+        return self.runner_class(config)
+
+    @staticmethod
+    def run(runner):
+        return runner.run()
+
+
+# -----------------------------------------------------------------------------
+# MAIN PROCESS:
+# -----------------------------------------------------------------------------
+WorkUnit = collections.namedtuple("WorkUnit",
+    ["unit_id", "feature_index", "scenario_keys", "pinned", "cost",
+     "resources", "lease"])
+WorkUnit.__new__.__defaults__ = (None, None)
+WorkUnit.__doc__ = """Part of a feature that is run by a worker process.
+The scenario keys select the scenarios (or None, for the whole feature).
+A pinned work unit is run by the first worker (and never stolen).
+The cost is its expected duration (or None, if unknown).
+The resources are the number of required resources per resource kind
+(or None), the lease are the leased resource names (when it is run).
+"""
+
+
+class WorkStealingScheduler(object):
+    """Provides the work units for the workers (by using work stealing).
+
+    Each worker has its own work queue. A worker takes the work units from
+    the front of its own work queue. If its work queue is empty, it steals
+    the last (not pinned) work unit from the longest other work queue.
+    Work units whose required resources cannot be leased (currently)
+    from the resource pool are passed over. Consecutive work units of
+    the scenarios of one feature are provided as one batch (work unit).
+    """
+
+    def __init__(self, jobs, resource_pool=None):
+        self.work_queues = [collections.deque() for _ in range(jobs)]
+        self.resource_pool = resource_pool
+        self.leases = {}
+        self.batches = {}
+
+    def __len__(self):
+        return sum(len(work_queue) for work_queue in self.work_queues)
+
+    def add_work_units(self, work_units):
+        """Deals the work units to the work queues in contiguous blocks
+        (or longest first, if their costs are known).
+        Pinned work units are added to the work queue of the first worker.
+        """
+        costs = [work_unit.cost for work_unit in work_units]
+        if work_units and None not in costs and any(costs):
+            self.add_work_units_longest_first(work_units)
+            return
+
+        unpinned_count = len([work_unit for work_unit in work_units
+                              if not work_unit.pinned])
+        jobs = len(self.work_queues)
+        block_size = max(1, -(-unpinned_count // jobs))  # -- CEIL-DIVISION
+        unpinned_index = 0
+        for work_unit in work_units:
+            worker_id = 0
+            if not work_unit.pinned:
+                worker_id = unpinned_index // block_size
+                unpinned_index += 1
+            self.work_queues[worker_id].append(work_unit)
+
+    def add_work_units_longest_first(self, work_units):
+        """Deals the work units by their cost (longest first) to the work
+        queue with the least cost (pinned: to the first work queue).
+        Work queues with the same cost are tie-broken by their number of
+        work units without cost (that are dealt round-robin).
+        """
+        costs = [0.0] * len(self.work_queues)
+        free_counts = [0] * len(self.work_queues)
+        worker_ids = range(len(self.work_queues))
+        for work_unit in sorted(work_units, key=lambda x: (not x.pinned,
+                                                           -x.cost)):
+            worker_id = 0
+            if not work_unit.pinned:
+                worker_id = min(worker_ids, key=lambda index: (
+                    costs[index], free_counts[index]))
+            costs[worker_id] += work_unit.cost
+            if not work_unit.cost:
+                free_counts[worker_id] += 1
+            self.work_queues[worker_id].append(work_unit)
+
+    def can_run(self, work_unit):
+        """Indicates if the required resources of a work unit are available."""
+        if self.resource_pool is None or not work_unit.resources:
+            return True
+        return self.resource_pool.can_lease(work_unit.resources)
+
+    def has_work_units(self, worker_id):
+        """Indicates if any work unit is left that a worker may run
+        (if its required resources become available).
+        """
+        return any(work_queue and (index == worker_id or
+                                   not all(x.pinned for x in work_queue))
+                   for index, work_queue in enumerate(self.work_queues))
+
+    def next_work_unit(self, worker_id, max_size=None):
+        """Provides the next work unit of a worker (or None, if no work
+        unit is left that it may run now). The required resources of the
+        work unit are leased until :meth:`release_work_unit()` is called.
+
+        :param worker_id:   Worker that needs a work unit.
+        :param max_size:    Maximum number of work units that are batched
+                            (or None, if unlimited).
+        """
+        work_unit = self.take_work_unit(worker_id)
+        if work_unit is not None:
+            work_unit = self.take_batch(worker_id, work_unit, max_size)
+        if work_unit is not None and work_unit.resources:
+            lease = self.resource_pool.lease(work_unit.resources)
+            self.leases[work_unit.unit_id] = lease
+            work_unit = work_unit._replace(lease=lease)
+        return work_unit
+
+    def take_batch(self, worker_id, work_unit, max_size=None):
+        """Batches a work unit of scenarios with the next work units of the
+        same feature (from the front of the work queue of the worker), so
+        that the worker runs this feature (and its feature hooks) less often.
+        Work units that require resources are not batched.
+
+        If other workers exist, a batch takes at most the front half of the
+        work queue. The other half remains available for work stealing.
+
+        :return: Work unit of the batch (with the scenario keys of all
+                 its work units).
+        """
+        if work_unit.scenario_keys is None:
+            return work_unit
+
+        batch = [work_unit]
+        work_queue = self.work_queues[worker_id]
+        if len(self.work_queues) > 1:
+            half_size = (len(work_queue) + 2) // 2  # -- CEIL((size + 1) / 2)
+            max_size = min(max_size or half_size, half_size)
+        while work_queue and (max_size is None or len(batch) < max_size):
+            next_unit = work_queue[0]
+            if (next_unit.feature_index != work_unit.feature_index or
+                    next_unit.scenario_keys is None or next_unit.resources):
+                break
+            batch.append(work_queue.popleft())
+        if len(batch) == 1:
+            return work_unit
+
+        self.batches[work_unit.unit_id] = batch
+        costs = [x.cost for x in batch]
+        scenario_keys = tuple(key for x in batch for key in x.scenario_keys)
+        return work_unit._replace(scenario_keys=scenario_keys,
+                                  cost=None if None in costs else sum(costs))
+
+    def select_batch(self, work_unit):
+        """Provides the work units that are run together with a work unit."""
+        return self.batches.get(work_unit.unit_id, [work_unit])
+
+    def release_work_unit(self, unit_id):
+        """Returns the leased resources of a work unit (if any) to the pool."""
+        self.batches.pop(unit_id, None)
+        lease = self.leases.pop(unit_id, None)
+        if lease:
+            self.resource_pool.release(lease)
+
+    def requeue_work_unit(self, work_unit, worker_id=0):
+        """Puts a work unit (with its batch) that was not run back to the front
+        of a work queue (and releases its leased resources).
+        """
+        batch = self.select_batch(work_unit)
+        self.release_work_unit(work_unit.unit_id)
+        for work_unit in reversed(batch):
+            self.work_queues[worker_id].appendleft(
+                work_unit._replace(lease=None))
+
+    def take_work_unit(self, worker_id):
+        work_queue = self.work_queues[worker_id]
+        for index, work_unit in enumerate(work_queue):
+            if self.can_run(work_unit):
+                del work_queue[index]
+                return work_unit
+        return self.steal_work_unit(worker_id)
+
+    def steal_work_unit(self, worker_id):
+        victims = sorted((work_queue for index, work_queue
+                          in enumerate(self.work_queues) if index != worker_id),
+                         key=len, reverse=True)
+        for work_queue in victims:
+            for index in range(len(work_queue) - 1, -1, -1):
+                work_unit = work_queue[index]
+                if not work_unit.pinned and self.can_run(work_unit):
+                    del work_queue[index]
+                    return work_unit
+        return None
+
+    def clear(self):
+        """Removes all remaining work units.
+
+        :return: Removed work units (as list).
+        """
+        work_units = []
+        for work_queue in self.work_queues:
+            work_units.extend(work_queue)
+            work_queue.clear()
+        return work_units
+
+
+class ParallelRunner(object):
+    """Runs the features of a runner in worker processes and drives
+    the formatters and reporters of the runner with the worker results.
+    """
+    poll_timeout = 0.5
+    serial_tag = "serial"
+    parallel_units = ("feature", "scenario")
+
+    def __init__(self, runner, jobs):
+        self.runner = runner
+        self.jobs = jobs
+        self.processes = []
+        self.task_queues = []
+        self.scheduler = None
+        self.running_units = {}
+        self.worker_setup = None
+        self.parallel_unit = getattr(runner.config, "parallel_unit", None)
+        if self.parallel_unit not in self.parallel_units:
+            self.parallel_unit = "feature"
+        self.max_scenarios = runner.select_max_scenarios()
+        self.max_memory = runner.select_max_worker_memory()
+        self.fork_server = (runner.use_fork_server() and
+                            self.select_start_method() == "fork")
+
+    @staticmethod
+    def select_start_method():
+        if sys.platform != "win32" and hasattr(multiprocessing, "get_context"):
+            return "fork"
+        return "spawn"
+
+    def make_runner_spec(self, start_method, features):
+        if start_method == "fork":
+            return InheritedRunner(self.runner, features)
+        command_args = getattr(self.runner.config, "command_args", None)
+        return RunnerFactory(self.runner.__class__, command_args)
+
+    def make_resource_pool(self, work_units):
+        """Provides the resource pool if any work unit requires resources.
+
+        :raises ConfigError: If the pool cannot provide required resources.
+        """
+        requirements = [work_unit.resources for work_unit in work_units
+                        if work_unit.resources]
+        if not requirements:
+            return None
+
+        resource_pool = self.runner.make_resource_pool()
+        for resources in requirements:
+            resource_pool.check(resources)
+        return resource_pool
+
+    def make_work_units(self, features):
+        """Splits the features into work units (features or scenarios).
+        A feature that is tagged as serial is never split.
+        """
+        run_history = self.runner.run_history
+        estimate_cost = lambda scenarios: None
+        if run_history is not None:
+            default_duration = run_history.make_default_duration()
+            estimate_cost = lambda scenarios: \
+                run_history.estimate_duration(scenarios, default_duration)
+
+        work_units = []
+        for feature_index, feature in enumerate(features):
+            feature_pinned = self.serial_tag in feature.tags
+            if self.parallel_unit == "feature" or feature_pinned:
+                scenarios = feature.walk_scenarios()
+                resources = ResourcePool.select_requirements(scenarios)
+                work_units.append(WorkUnit(len(work_units), feature_index,
+                                           None, feature_pinned,
+                                           estimate_cost(scenarios),
+                                           resources))
+                continue
+
+            model_index = ModelIndex(feature)
+            for scenario in feature.walk_scenarios():
+                pinned = self.serial_tag in scenario.effective_tags
+                resources = ResourcePool.select_requirements([scenario])
+                work_units.append(WorkUnit(len(work_units), feature_index,
+                                           (model_index.key_of(scenario),),
+                                           pinned, estimate_cost([scenario]),
+                                           resources))
+        return work_units
+
+    def make_scheduler(self, work_units):
+        scheduler = WorkStealingScheduler(self.jobs,
+                                          self.make_resource_pool(work_units))
+        scheduler.add_work_units(work_units)
+        return scheduler
+
+    def send_work_unit(self, worker_id, work_unit):
+        """Sends the next work unit (or None) to a worker."""
+        self.task_queues[worker_id].put(work_unit)
+
+    def start_workers(self, features):
+        start_method = self.select_start_method()
+        context = multiprocessing
+        if hasattr(multiprocessing, "get_context"):
+            context = multiprocessing.get_context(start_method)
+        result_queue = context.Queue()
+        stop_event = context.Event()
+        runner_spec = self.make_runner_spec(start_method, features)
+        self.worker_setup = (context, runner_spec, result_queue, stop_event)
+        self.processes = []
+        self.task_queues = []
+        for worker_id in range(self.jobs):
+            self.task_queues.append(context.Queue())
+            self.processes.append(None)
+            self.start_worker(worker_id)
+        return result_queue, stop_event
+
+    def start_worker(self, worker_id):
+        """Starts the worker process of a worker (with its task queue)."""
+        context, runner_spec, result_queue, stop_event = self.worker_setup
+        worker = ParallelWorker(worker_id, self.task_queues[worker_id],
+                                result_queue, stop_event, self.max_scenarios,
+                                inherits_hooks=self.fork_server,
+                                max_memory=self.max_memory)
+        # -- ENSURE: Buffered output is not inherited by forked workers.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        process = context.Process(target=run_parallel_worker,
+                                  args=(worker, runner_spec),
+                                  name="behave-worker-%d" % worker_id)
+        process.start()
+        self.processes[worker_id] = process
+
+    def restart_worker(self, worker_id):
+        """Replaces the worker process of a retired worker (options:
+        ``--max-scenarios-per-worker``, ``--max-worker-memory``)
+        with a new one.
+        """
+        self.processes[worker_id].join()
+        self.start_worker(worker_id)
+
+    def iter_messages(self, result_queue, stop_event):
+        """Provides the messages of all workers until they are done.
+        A worker process that died is reported as failed.
+        """
+        running = set(range(len(self.processes)))
+        while running:
+            try:
+                message = result_queue.get(timeout=self.poll_timeout)
+            except Empty:
+                for worker_id in sorted(running):
+                    process = self.processes[worker_id]
+                    if not process.is_alive():
+                        print("PARALLEL-WORKER-ERROR (worker=%s): "
+                              "Died with exitcode=%s" %
+                              (worker_id, process.exitcode))
+                        running.discard(worker_id)
+                        yield ("done", worker_id, None, dict(failed=True))
+                continue
+            except KeyboardInterrupt:
+                # -- WORKERS ARE INTERRUPTED, TOO: Collect their results.
+                self.runner.aborted = True
+                stop_event.set()
+                continue
+
+            if message[0] != "done":
+                yield message
+                continue
+
+            process = self.processes[message[1]]
+            yield message
+            if self.processes[message[1]] is process:
+                # -- NOT RESTARTED: Worker is finished.
+                running.discard(message[1])
+
+        for process in self.processes:
+            process.join()
+
+    def replay_feature(self, feature, results, split_feature=False):
+        """Drives the formatters with the recorded events of a feature
+        after the run-time state is applied to the model.
+
+        :param feature: Feature to report.
+        :param results: Results of its work units (in work unit order).
+        :param split_feature: Indicates if the feature was split into
+                              several work units.
+        """
+        runner = self.runner
+        model_index = ModelIndex(feature)
+        elements = model_index.elements
+        if len(results) == 1:
+            events = results[0]["events"]
+        else:
+            events = merge_events(model_index,
+                                  [result["events"] for result in results])
+
+        states_applied = False
+        for event in events:
+            name = event[0]
+            if name == "eof" and not states_applied:
+                self.apply_states(model_index, results, split_feature)
+                states_applied = True
+
+            args = []
+            if name == "uri":
+                args = [event[1]]
+            elif name == "match":
+                args = [make_match(event[1])]
+            elif name == "result":
+                element = elements[event[1]]
+                apply_state(element, event[2])
+                args = [element]
+            elif len(event) > 1:
+                args = [elements[event[1]]]
+
+            for formatter in runner.formatters:
+                formatter_callback = getattr(formatter, name, None)
+                if formatter_callback:
+                    formatter_callback(*args)
+
+        if not states_applied:
+            self.apply_states(model_index, results, split_feature)
+        for result in results:
+            runner.undefined_steps.extend(elements[key]
+                                          for key in result["undefined_steps"]
+                                          if key is not None)
+
+    @staticmethod
+    def apply_states(model_index, results, split_feature=False):
+        """Applies the run-time states of all work units of a feature.
+        The states of the feature, its rules and scenario outlines
+        are merged if the feature was split into several work units
+        (even if only some of them were run, like with ``--stop``).
+        """
+        for result in results:
+            for key, state in result["states"]:
+                element = model_index.elements[key]
+                if split_feature and isinstance(element, (ScenarioContainer,
+                                                          ScenarioOutline)):
+                    merge_state(element, state)
+                else:
+                    apply_state(element, state)
+
+    def run_model(self, features):
+        # pylint: disable=too-many-branches, too-many-locals
+        # pylint: disable=too-many-statements
+        runner = self.runner
+        if not runner.context:
+            runner.context = Context(runner)
+        features = list(features)
+        work_units = self.make_work_units(features)
+        self.jobs = max(1, min(self.jobs, len(work_units)))
+        scheduler = self.scheduler = self.make_scheduler(work_units)
+        runner.hook_failures = 0
+        undefined_steps_initial_size = len(runner.undefined_steps)
+
+        pending_counts = collections.Counter(work_unit.feature_index
+                                             for work_unit in work_units)
+        unit_counts = collections.Counter(pending_counts)
+        results = collections.defaultdict(list)
+        failed_features = set()
+        next_index = 0
+        workers_failed = False
+        waiting_workers = []
+        max_sizes = {}
+        running_units = self.running_units = {}
+
+        def send_work_unit(worker_id):
+            work_unit = None
+            if not stop_event.is_set():
+                work_unit = scheduler.next_work_unit(worker_id,
+                                                     max_sizes.get(worker_id))
+                if work_unit is None and scheduler.has_work_units(worker_id):
+                    # -- WAIT: Until another worker releases its resources.
+                    waiting_workers.append(worker_id)
+                    return
+            if work_unit is not None:
+                running_units[worker_id] = work_unit.unit_id
+            self.send_work_unit(worker_id, work_unit)
+
+        def release_work_unit(worker_id):
+            unit_id = running_units.pop(worker_id, None)
+            if unit_id is not None:
+                scheduler.release_work_unit(unit_id)
+            for waiting_worker_id in waiting_workers[:]:
+                waiting_workers.remove(waiting_worker_id)
+                send_work_unit(waiting_worker_id)
+
+        def finish_work_unit(work_unit, result=None):
+            pending_counts[work_unit.feature_index] -= 1
+            if result is not None:
+                results[work_unit.feature_index].append((work_unit.unit_id,
+                                                         result))
+                if result["failed"]:
+                    failed_features.add(work_unit.feature_index)
+
+        before_all_failed = False
+        if self.fork_server:
+            # -- FORK-SERVER: Workers inherit the state of before_all().
+            resource_pool = runner.make_resource_pool()
+            if resource_pool.resources:
+                runner.context._set_root_attribute("resource_lease",
+                                                   resource_pool.lease_all())
+            runner.setup_capture()
+            runner.run_hook("before_all", runner.context)
+            # -- HOOK-ERROR: No worker is started (to inherit the failure),
+            #    the features are not run. It is no abort by the user.
+            before_all_failed = runner.hook_failures > 0
+            if before_all_failed:
+                runner.aborted = False
+
+        messages = []
+        if not before_all_failed:
+            result_queue, stop_event = self.start_workers(features)
+            messages = self.iter_messages(result_queue, stop_event)
+        for kind, worker_id, unit_id, data in messages:
+            if kind == "ready":
+                max_sizes[worker_id] = data
+                send_work_unit(worker_id)
+                continue
+            elif kind == "stop":
+                stop_event.set()
+                continue
+            elif kind == "lost":
+                # -- DISCONNECTED WORKER: Its work unit is run by another one.
+                unit_id = running_units.get(worker_id)
+                if unit_id is not None:
+                    scheduler.requeue_work_unit(work_units[unit_id])
+                    del running_units[worker_id]
+                if worker_id in waiting_workers:
+                    waiting_workers.remove(worker_id)
+                release_work_unit(worker_id)
+                continue
+            elif kind == "done":
+                workers_failed = workers_failed or data.get("failed", True)
+                runner.hook_failures += data.get("hook_failures", 0)
+                if data.get("aborted"):
+                    runner.aborted = True
+                # -- DIED WORKER: Releases the resources of its work unit.
+                release_work_unit(worker_id)
+                if (data.get("retired") and not stop_event.is_set() and
+                        not runner.aborted and
+                        scheduler.has_work_units(worker_id)):
+                    # -- RECYCLE WORKER: A new worker process continues.
+                    self.restart_worker(worker_id)
+                continue
+
+            # -- BATCH: Its result contains the results of all its work units.
+            batch = scheduler.select_batch(work_units[unit_id])
+            finish_work_unit(batch[0], data)
+            for work_unit in batch[1:]:
+                finish_work_unit(work_unit)
+            if stop_event.is_set():
+                # -- FAIL-EARLY/ABORTED: Remaining work units are not run.
+                for work_unit in scheduler.clear():
+                    finish_work_unit(work_unit)
+            release_work_unit(worker_id)
+
+            # -- REPORT: Features in the order of a serial run.
+            while (next_index < len(features) and
+                   pending_counts[next_index] == 0):
+                self.report_feature(features[next_index],
+                                    results.pop(next_index, None),
+                                    unit_counts[next_index] > 1)
+                next_index += 1
+
+        # -- FEATURES WITH WORK UNITS OF A DIED WORKER:
+        for index in range(next_index, len(features)):
+            self.report_feature(features[index], results.pop(index, None),
+                                unit_counts[index] > 1)
+
+        cleanups_failed = False
+        if self.fork_server:
+            cleanups_failed = self.teardown_fork_server()
+        if runner.aborted:
+            print("\nABORTED: By user.")
+        for formatter in runner.formatters:
+            formatter.close()
+        for reporter in runner.config.reporters:
+            reporter.end()
+
+        undefined_steps_size = len(runner.undefined_steps)
+        failed = (failed_features or workers_failed or runner.aborted or
+                  (runner.hook_failures > 0) or cleanups_failed or
+                  (undefined_steps_size > undefined_steps_initial_size))
+        return bool(failed)
+
+    def teardown_fork_server(self):
+        """Runs the after_all() hook and the cleanups of the fork-server
+        (after all workers are finished).
+
+        :return: True, if a cleanup failed. False, otherwise.
+        """
+        # pylint: disable=protected-access, broad-except
+        runner = self.runner
+        runner.run_hook("after_all", runner.context)
+        try:
+            runner.context._do_cleanups()
+        except Exception:
+            return True
+        finally:
+            runner.teardown_capture()
+        return False
+
+    def report_feature(self, feature, results, split_feature=False):
+        if results:
+            results = [result for _, result in sorted(results,
+                                                      key=lambda x: x[0])]
+            self.replay_feature(feature, results, split_feature)
+            feature.memory_usage = MemoryUsage.combine(
+                result.get("memory_usage") for result in results)
+        for reporter in self.runner.config.reporters:
+            reporter.feature(feature)
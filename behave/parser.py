@@ -41,6 +41,7 @@ Keyword aliases:
 # pylint: enable=line-too-long
 
 from __future__ import absolute_import, with_statement
+import os.path
 import re
 import sys
 import six
@@ -294,8 +295,11 @@ class Parser(object):
             message = u"Examples must only appear inside scenario outline"
             raise ParserError(message, self.line, self.filename, line)
         name = line[len(keyword) + 1:].strip()
+        tags, data_filename = self.select_examples_data_file(self.tags)
         self.examples = model.Examples(self.filename, self.line,
-                                       keyword, name, tags=self.tags)
+                                       keyword, name, tags=tags)
+        if data_filename:
+            self.examples.table = model.TableFile(data_filename, self.line)
         # pylint: disable=E1103
         #   E1103   Instance of "Background" has no "examples" member
         #           (but some types could not be inferred).
@@ -304,6 +308,34 @@ class Parser(object):
         # -- RESET STATE:
         self.tags = []
 
+    def select_examples_data_file(self, tags):
+        """Select the data file of an Examples section (if any) by using its
+        tag: ``@examples.file=FILENAME``.
+        The data file is resolved relative to the directory of feature file.
+
+        :param tags:  Tags of the Examples section.
+        :return: Tuple (remaining tags, data filename or None).
+        """
+        prefix = model.Examples.data_file_tag_prefix
+        data_filename = None
+        remaining_tags = []
+        for tag in tags:
+            if not tag.startswith(prefix):
+                remaining_tags.append(tag)
+                continue
+            if data_filename:
+                message = u"Examples with more than one data file: @%s" % tag
+                raise ParserError(message, self.line, self.filename)
+            data_filename = tag[len(prefix):]
+            if self.filename:
+                basedir = os.path.dirname(self.filename)
+                data_filename = os.path.join(basedir, data_filename)
+            data_filename = os.path.normpath(data_filename)
+            if not os.path.isfile(data_filename):
+                message = u"Examples data file not found: %s" % data_filename
+                raise ParserError(message, self.line, self.filename)
+        return remaining_tags, data_filename
+
 
     def diagnose_feature_usage_error(self):
         if self.feature:
@@ -623,7 +655,11 @@ class Parser(object):
 
         if not line.startswith("|"):
             if self.examples:
-                self.examples.table = self.table
+                if self.examples.table is None:
+                    self.examples.table = self.table
+                elif self.table is not None:
+                    message = u"Examples with data file may not have a table"
+                    raise ParserError(message, self.table.line, self.filename)
                 self.examples = None
             else:
                 step = self.statement.steps[-1]
@@ -24,7 +24,14 @@ class Reporter(object):
 
     An existing formatter can be reused as reporter by using
     :class:`behave.report.formatter_reporter.FormatterAsReporter`.
+
+    .. attribute:: requires_expanded_outlines
+
+        Indicates that this reporter needs the complete scenarios of a
+        ScenarioOutline after it was run (with steps, captured output, ...).
+        Disables the lazy scenario outline expansion mode if true.
     """
+    requires_expanded_outlines = False
 
     def __init__(self, config):
         self.config = config
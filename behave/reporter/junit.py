@@ -177,6 +177,7 @@ class JUnitReporter(Reporter):
     show_scenarios = True   # Show scenario descriptions.
     show_tags = True
     show_multiline = True
+    requires_expanded_outlines = True
 
     def __init__(self, config):
         super(JUnitReporter, self).__init__(config)
@@ -0,0 +1,57 @@
+# -*- coding: UTF-8 -*-
+"""
+Provides a memory report after each test run (option: ``--memory-report``).
+It shows the memory growth of each feature (largest first) to find
+the features that leak memory.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import sys
+from behave.formatter.base import StreamOpener
+from behave.reporter.base import Reporter
+
+
+def format_size(size):
+    """Formats a memory growth (in bytes) as human readable text."""
+    if size is None:
+        return u"n/a"
+    value = float(size)
+    for unit in (u"B", u"KiB", u"MiB"):
+        if abs(value) < 1024.0:
+            return u"%+.1f %s" % (value, unit)
+        value /= 1024.0
+    return u"%+.1f GiB" % value
+
+
+class MemoryReporter(Reporter):
+    """Shows the memory growth (RSS and traced Python memory blocks)
+    of each feature after the test run.
+    """
+    output_stream_name = "stdout"
+
+    def __init__(self, config):
+        super(MemoryReporter, self).__init__(config)
+        stream = getattr(sys, self.output_stream_name, sys.stderr)
+        self.stream = StreamOpener.ensure_stream_with_encoder(stream)
+        self.memory_usages = []
+
+    def feature(self, feature):
+        memory_usage = getattr(feature, "memory_usage", None)
+        if memory_usage is not None:
+            self.memory_usages.append((feature, memory_usage))
+
+    def end(self):
+        if not self.memory_usages:
+            return
+
+        self.stream.write(u"\nMemory growth per feature (RSS, traced):\n")
+        memory_usages = sorted(self.memory_usages,
+                               key=lambda x: (x[1].rss or 0, x[1].traced or 0),
+                               reverse=True)
+        for feature, memory_usage in memory_usages:
+            self.stream.write(u"  %12s %12s  %s  %s\n" % (
+                format_size(memory_usage.rss),
+                format_size(memory_usage.traced),
+                feature.location, feature.name))
@@ -6,7 +6,7 @@ Provides a summary after each test run.
 from __future__ import absolute_import, division, print_function
 import sys
 from time import time as time_now
-from behave.model import Rule, ScenarioOutline  # MAYBE: Scenario
+from behave.model import Rule, ScenarioOutline, ScenarioResult
 from behave.model_core import Status
 from behave.reporter.base import Reporter
 from behave.formatter.base import StreamOpener
@@ -236,6 +236,12 @@ class SummaryReporter(Reporter):
             self.failed_scenarios.append(scenario)
 
         self.scenario_summary[scenario.status.name] += 1
+        if isinstance(scenario, ScenarioResult):
+            # -- LAZY SCENARIO OUTLINE EXPANSION: Steps were discarded.
+            for step_status in scenario.step_statuses:
+                self.step_summary[step_status.name] += 1
+            return
+
         for step in scenario:
             self.step_summary[step.status.name] += 1
 
@@ -0,0 +1,150 @@
+# -*- coding: UTF-8 -*-
+"""
+Provides a pool of shared test resources (like: instruments) that are
+leased to the scenarios of a parallel test run (option: ``--jobs=N``).
+
+A scenario declares the resources that it needs exclusively with tags
+(on the feature, rule, scenario outline or scenario):
+
+* ``@resource.scope``: Needs one resource of the kind "scope".
+* ``@resource.scope=2``: Needs two resources of the kind "scope".
+
+The resource pool is defined in the configuration file. Each resource kind
+provides a number of resources or a list of resource names:
+
+.. code-block:: ini
+
+    # -- FILE: behave.ini
+    [behave.resources]
+    scope = scope-1, scope-2
+    afg = 1
+
+The scheduler only runs scenarios concurrently if their leased resources
+do not conflict. The leased resource names are provided to the steps and
+hooks as ``context.resource_lease`` (as dict: kind => list of names).
+In a serial run, ``context.resource_lease`` provides all resources of
+the pool. This context attribute is only provided if a resource pool
+is defined.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import collections
+import six
+from behave.exception import ConfigError
+
+
+class ResourcePool(object):
+    """Pool of named resources (per resource kind) that are leased
+    exclusively.
+
+    :param resources:   Resource names per resource kind (as dict).
+    """
+    tag_prefix = "resource."
+
+    def __init__(self, resources=None):
+        self.resources = collections.OrderedDict()
+        self.available = {}
+        for kind, names in sorted(six.iteritems(resources or {})):
+            self.resources[kind] = list(names)
+            self.available[kind] = list(names)
+
+    @classmethod
+    def parse(cls, data):
+        """Creates a resource pool from the configuration file data
+        (section: ``[behave.resources]``).
+
+        :param data:  Number of resources or resource names (as dict of text).
+        :return: ResourcePool object.
+        :raises ConfigError: If a number of resources is invalid.
+        """
+        resources = {}
+        for kind, text in six.iteritems(data or {}):
+            text = six.text_type(text).strip()
+            if text.isdigit():
+                resources[kind] = [u"%s.%d" % (kind, number)
+                                   for number in range(1, int(text) + 1)]
+            else:
+                resources[kind] = [name.strip() for name in text.split(",")
+                                   if name.strip()]
+            if not resources[kind]:
+                raise ConfigError("resource %s: Provides no resources" % kind)
+        return cls(resources)
+
+    @classmethod
+    def parse_tags(cls, tags):
+        """Provides the resources that tags require.
+
+        :param tags:  Tags to use (effective tags of a scenario).
+        :return: Number of required resources per resource kind (as dict).
+        :raises ConfigError: If a resource tag is invalid.
+        """
+        requirements = {}
+        for tag in tags:
+            if not tag.startswith(cls.tag_prefix):
+                continue
+            kind, _, text = tag[len(cls.tag_prefix):].partition("=")
+            if not kind or not (text or "1").isdigit():
+                raise ConfigError("@%s: Invalid resource tag, use: "
+                                  "@resource.KIND=COUNT" % tag)
+            requirements[kind] = max(requirements.get(kind, 0), int(text or 1))
+        return requirements
+
+    @classmethod
+    def select_requirements(cls, scenarios):
+        """Provides the resources that some scenarios require (if they
+        are run one after another).
+        """
+        requirements = {}
+        for scenario in scenarios:
+            for kind, count in six.iteritems(
+                    cls.parse_tags(scenario.effective_tags)):
+                requirements[kind] = max(requirements.get(kind, 0), count)
+        return requirements
+
+    def check(self, requirements):
+        """Ensures that the resource pool can provide the required resources
+        (otherwise the scenarios could never be run).
+
+        :raises ConfigError: If the required resources are not provided.
+        """
+        for kind, count in sorted(six.iteritems(requirements)):
+            if count > len(self.resources.get(kind, [])):
+                raise ConfigError(
+                    "@resource.%s=%d: Needs more resources than the pool "
+                    "provides (%d, see [behave.resources] section)" %
+                    (kind, count, len(self.resources.get(kind, []))))
+
+    def can_lease(self, requirements):
+        return all(len(self.available.get(kind, [])) >= count
+                   for kind, count in six.iteritems(requirements))
+
+    def lease(self, requirements):
+        """Leases the required resources (if they are available).
+
+        :param requirements:  Number of resources per resource kind (as dict).
+        :return: Leased resource names per resource kind (as dict)
+            or None, if the resources are currently not available.
+        """
+        if not self.can_lease(requirements):
+            return None
+
+        lease = {}
+        for kind, count in six.iteritems(requirements):
+            available = self.available[kind]
+            lease[kind] = available[:count]
+            del available[:count]
+        return lease
+
+    def release(self, lease):
+        """Returns the leased resources to the pool."""
+        for kind, names in six.iteritems(lease):
+            self.available[kind].extend(names)
+            # -- KEEP: Configured order of the resources.
+            self.available[kind].sort(key=self.resources[kind].index)
+
+    def lease_all(self):
+        """Provides all resources (for a serial run)."""
+        return dict((kind, list(names))
+                    for kind, names in six.iteritems(self.resources))
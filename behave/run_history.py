@@ -0,0 +1,245 @@
+# -*- coding: UTF-8 -*-
+"""
+Provides a persistent run history with the durations and results
+of the scenarios of the last test runs.
+
+The run history is stored as JSON file (option: ``--run-history=FILE``)
+and updated after each test run. It is used to order the work:
+
+* parallel mode (``--jobs=N``): Longest work units are scheduled first.
+* serial mode: ``--order=fast-first`` runs the quickest scenarios first,
+  ``--order=failed-first`` runs the previously failed scenarios first
+  (to shorten the time to the first failure).
+
+.. code-block:: sh
+
+    behave --run-history=build/behave.history.json --order=failed-first
+
+Like the :mod:`behave.formatter.rerun` formatter, a scenario is identified
+by its feature file and its name (instead of its line number that changes
+when the feature file is edited).
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import io
+import json
+import os.path
+import six
+from behave.model import Rule, ScenarioOutline
+from behave.model_core import Status
+
+
+class RunHistory(object):
+    """Persistent history of scenario durations and results.
+
+    Each scenario entry stores the smoothed duration (exponential moving
+    average of the last runs) and the last result status (passed/failed).
+    Scenarios that were not run (skipped, untested) are not updated.
+    """
+    version = 1
+    smoothing = 0.5
+    orders = ("defined", "fast-first", "failed-first")
+
+    def __init__(self, filename=None, scenarios=None):
+        self.filename = filename
+        self.scenarios = scenarios or {}
+        self.modified = False
+
+    @classmethod
+    def load(cls, filename):
+        """Load the run history from a JSON file.
+        A missing, unreadable or incompatible history file results in an
+        empty run history.
+
+        :param filename:    Filename of the run history.
+        :return: RunHistory object.
+        """
+        scenarios = None
+        if os.path.exists(filename):
+            try:
+                with io.open(filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == cls.version:
+                    scenarios = data.get("scenarios")
+            except (IOError, OSError, ValueError):
+                # -- CORRUPTED/UNREADABLE HISTORY: Start a new one.
+                scenarios = None
+        return cls(filename, scenarios)
+
+    def save(self, filename=None):
+        """Store the run history as JSON file (if it was modified)."""
+        filename = filename or self.filename
+        if not (filename and self.modified):
+            return
+
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        data = json.dumps(dict(version=self.version, scenarios=self.scenarios),
+                          indent=1, sort_keys=True)
+        with io.open(filename, "w", encoding="utf-8") as f:
+            f.write(six.text_type(data))
+        self.modified = False
+
+    @staticmethod
+    def make_key(scenario):
+        return u"%s:%s" % (scenario.filename, scenario.name)
+
+    def add_scenario(self, scenario):
+        """Add the result of a scenario (if it was run)."""
+        status = scenario.status
+        if status not in (Status.passed, Status.failed):
+            return
+
+        key = self.make_key(scenario)
+        duration = scenario.duration
+        entry = self.scenarios.get(key)
+        if entry is not None:
+            duration = (self.smoothing * duration +
+                        (1.0 - self.smoothing) * entry["duration"])
+        self.scenarios[key] = dict(duration=duration, status=status.name)
+        self.modified = True
+
+    def add_features(self, features):
+        """Add the results of all (run) scenarios of the features."""
+        for feature in features:
+            for scenario in feature.walk_scenarios():
+                self.add_scenario(scenario)
+
+    def select_partial(self, features, filename=None):
+        """Provides a run history with the entries of the run scenarios
+        of some features only (for example: of one shard).
+
+        :param features:    Features (with the run scenarios).
+        :param filename:    Filename of the partial run history.
+        :return: RunHistory object.
+        """
+        scenarios = {}
+        for feature in features:
+            for scenario in feature.walk_scenarios():
+                key = self.make_key(scenario)
+                if (scenario.status in (Status.passed, Status.failed) and
+                        key in self.scenarios):
+                    scenarios[key] = self.scenarios[key]
+        run_history = self.__class__(filename, scenarios)
+        run_history.modified = bool(scenarios)
+        return run_history
+
+    @classmethod
+    def merge(cls, filename, filenames):
+        """Merge partial run histories (of the shards) into a run history.
+
+        :param filename:    Filename of the (merged) run history.
+        :param filenames:   Filenames of the partial run histories.
+        :return: RunHistory object (with the merged entries).
+        """
+        run_history = cls.load(filename)
+        for partial_filename in filenames:
+            run_history.scenarios.update(cls.load(partial_filename).scenarios)
+            run_history.modified = True
+        return run_history
+
+    def select_duration(self, scenario, default=None):
+        """Provides the expected duration of a scenario (in seconds)."""
+        entry = self.scenarios.get(self.make_key(scenario))
+        if entry is None:
+            return default
+        return entry["duration"]
+
+    def select_failed(self, scenario):
+        """Indicates if the scenario failed in its last run.
+
+        :return: True/False, if known. None, if scenario is unknown.
+        """
+        entry = self.scenarios.get(self.make_key(scenario))
+        if entry is None:
+            return None
+        return entry["status"] == Status.failed.name
+
+    def make_default_duration(self):
+        """Provides the expected duration of an unknown scenario
+        (as average duration of all known scenarios).
+        """
+        if not self.scenarios:
+            return 0.0
+        total = sum(entry["duration"] for entry in self.scenarios.values())
+        return total / len(self.scenarios)
+
+    def estimate_duration(self, scenarios, default=None):
+        """Provides the expected duration of some scenarios (in seconds).
+        Unknown scenarios use the average duration.
+        """
+        if default is None:
+            default = self.make_default_duration()
+        return sum(self.select_duration(scenario, default)
+                   for scenario in scenarios)
+
+    # -- ORDERING:
+    def make_sort_key(self, order):
+        """Makes the sort key function of a model element for an order.
+        Unknown scenarios (without history) are run first with "fast-first"
+        and directly after the failed scenarios with "failed-first".
+        """
+        def fast_first_key(element):
+            return self.estimate_duration(iter_scenarios(element), default=0.0)
+
+        def failed_first_key(element):
+            failed_states = [self.select_failed(scenario)
+                             for scenario in iter_scenarios(element)]
+            if True in failed_states:
+                return 0
+            elif None in failed_states:
+                return 1
+            return 2
+
+        if order == "fast-first":
+            return fast_first_key
+        elif order == "failed-first":
+            return failed_first_key
+        return None
+
+    def order_features(self, features, order):
+        """Orders the features and their scenarios (rules, outline rows)
+        for the run. The sort is stable (defined order for same keys).
+
+        :param features:    Features to order.
+        :param order:       Order to use (as string).
+        :return: Ordered features (as list).
+        """
+        sort_key = self.make_sort_key(order)
+        features = list(features)
+        if sort_key is None:
+            return features     # -- DEFINED ORDER: As in the feature files.
+
+        for feature in features:
+            order_run_items(feature, sort_key)
+        return sorted(features, key=sort_key)
+
+
+# -----------------------------------------------------------------------------
+# UTILITY FUNCTIONS:
+# -----------------------------------------------------------------------------
+def iter_scenarios(element):
+    """Provides the scenarios of a feature, rule, scenario outline
+    or the scenario itself.
+    """
+    if isinstance(element, ScenarioOutline):
+        return iter(element.scenarios)
+    elif hasattr(element, "walk_scenarios"):
+        return iter(element.walk_scenarios())
+    return iter([element])
+
+
+def order_run_items(scenario_container, sort_key):
+    """Orders the run items of a feature (or rule) and their scenarios."""
+    # pylint: disable=protected-access
+    for run_item in scenario_container.run_items:
+        if isinstance(run_item, Rule):
+            order_run_items(run_item, sort_key)
+        elif isinstance(run_item, ScenarioOutline):
+            run_item._scenarios = sorted(run_item.scenarios, key=sort_key)
+    # -- HINT: Rules stay behind the scenarios of a feature.
+    scenario_container.run_items = sorted(scenario_container.run_items,
+        key=lambda run_item: (isinstance(run_item, Rule), sort_key(run_item)))
@@ -13,13 +13,20 @@ import weakref
 import six
 
 from behave._types import ExceptionUtil
+from behave.async_runtime import AsyncRuntime
 from behave.capture import CaptureController
+from behave.configuration import parse_shard, parse_size
 from behave.exception import ConfigError
 from behave.formatter._registry import make_formatters
+from behave.memory_usage import MemoryTracker
+from behave.model import Rule, ScenarioOutline
 from behave.runner_util import \
     collect_feature_locations, parse_features, \
     exec_file, load_step_modules, PathManager
 from behave.step_registry import registry as the_step_registry
+from behave.resource_pool import ResourcePool
+from behave.run_history import RunHistory
+from behave.tag_index import TagIndex
 
 if six.PY2:
     # -- USE PYTHON3 BACKPORT: With unicode traceback support.
@@ -163,6 +170,7 @@ class Context(object):
             "@layer": "testrun",
         }
         self._stack = [d]
+        self._owners = dict((name, d) for name in d)
         self._record = {}
         self._origin = {}
         self._mode = self.BEHAVE
@@ -245,6 +253,8 @@ class Context(object):
         if layer_name:
             initial_data["@layer"] = layer_name
         self._stack.insert(0, initial_data)
+        for name in initial_data:
+            self._owners[name] = initial_data
 
     def _pop(self):
         """Pop the current layer from the context stack.
@@ -254,7 +264,20 @@ class Context(object):
             self._do_cleanups()
         finally:
             # -- ENSURE: Layer is removed even if cleanup-errors occur.
-            self._stack.pop(0)
+            frame = self._stack.pop(0)
+            for name in frame:
+                self._update_owner(name)
+
+    def _update_owner(self, attr):
+        """Update the lookup table entry for an attribute
+        after the layer that owned it was removed (or the attribute deleted).
+        The topmost layer that provides the attribute becomes its owner.
+        """
+        for frame in self._stack:
+            if attr in frame:
+                self._owners[attr] = frame
+                return
+        self._owners.pop(attr, None)
 
     def _use_with_behave_mode(self):
         """Provides a context manager for using the context in BEHAVE mode."""
@@ -270,24 +293,36 @@ class Context(object):
         return self.use_with_user_mode()
 
     def _set_root_attribute(self, attr, value):
-        for frame in self.__dict__["_stack"]:
-            if frame is self.__dict__["_root"]:
-                continue
-            if attr in frame:
-                record = self.__dict__["_record"][attr]
-                params = {
-                    "attr": attr,
-                    "filename": record[0],
-                    "line": record[1],
-                    "function": record[3],
-                }
-                self._emit_warning(attr, params)
-
-        self.__dict__["_root"][attr] = value
+        root = self.__dict__["_root"]
+        if attr in self._owners:
+            for frame in self.__dict__["_stack"]:
+                if frame is root:
+                    continue
+                if attr in frame:
+                    self._emit_warning(attr)
+
+        root[attr] = value
+        self._owners.setdefault(attr, root)
         if attr not in self._origin:
             self._origin[attr] = self._mode
 
-    def _emit_warning(self, attr, params):
+    def _make_set_location_params(self, attr):
+        """Provides the location where an attribute was set (last time).
+        The location is only resolved when a warning needs it.
+        """
+        code, line = self._record.get(attr, (None, None))
+        if code is None:
+            # -- ROOT ATTRIBUTE OF BEHAVE: Location is not recorded.
+            return {"attr": attr, "filename": "<behave>", "line": 0,
+                    "function": "<runner>"}
+        return {
+            "attr": attr,
+            "filename": code.co_filename,
+            "line": line,
+            "function": code.co_name,
+        }
+
+    def _emit_warning(self, attr):
         msg = ""
         if self._mode is self.BEHAVE and self._origin[attr] is not self.BEHAVE:
             msg = "behave runner is masking context attribute '%(attr)s' " \
@@ -300,7 +335,7 @@ class Context(object):
                 msg = "user code is masking context attribute " \
                     "'%(attr)s'; see the tutorial for what this means"
         if msg:
-            msg = msg % params
+            msg = msg % self._make_set_location_params(attr)
             warnings.warn(msg, ContextMaskWarning, stacklevel=3)
 
     def _dump(self, pretty=False, prefix="  "):
@@ -320,9 +355,9 @@ class Context(object):
             except KeyError:
                 raise AttributeError(attr)
 
-        for frame in self._stack:
-            if attr in frame:
-                return frame[attr]
+        frame = self._owners.get(attr)
+        if frame is not None:
+            return frame[attr]
         msg = "'{0}' object has no attribute '{1}'"
         msg = msg.format(self.__class__.__name__, attr)
         raise AttributeError(msg)
@@ -332,24 +367,17 @@ class Context(object):
             self.__dict__[attr] = value
             return
 
-        for frame in self._stack[1:]:
-            if attr in frame:
-                record = self._record[attr]
-                params = {
-                    "attr": attr,
-                    "filename": record[0],
-                    "line": record[1],
-                    "function": record[3],
-                }
-                self._emit_warning(attr, params)
-
-        stack_limit = 2
-        if six.PY2:
-            stack_limit += 1     # Due to traceback2 usage.
-        stack_frame = traceback.extract_stack(limit=stack_limit)[0]
-        self._record[attr] = stack_frame
+        if attr in self._owners:
+            for frame in self._stack[1:]:
+                if attr in frame:
+                    self._emit_warning(attr)
+
+        # -- RECORD SET-LOCATION: Resolved later (only if needed by a warning).
+        caller = sys._getframe(1)   # pylint: disable=protected-access
+        self._record[attr] = (caller.f_code, caller.f_lineno)
         frame = self._stack[0]
         frame[attr] = value
+        self._owners[attr] = frame
         if attr not in self._origin:
             self._origin[attr] = self._mode
 
@@ -358,6 +386,7 @@ class Context(object):
         if attr in frame:
             del frame[attr]
             del self._record[attr]
+            self._update_owner(attr)
         else:
             msg = "'{0}' object has no attribute '{1}' at the current level"
             msg = msg.format(self.__class__.__name__, attr)
@@ -366,10 +395,7 @@ class Context(object):
     def __contains__(self, attr):
         if attr[0] == "_":
             return attr in self.__dict__
-        for frame in self._stack:
-            if attr in frame:
-                return True
-        return False
+        return attr in self._owners
 
     def execute_steps(self, steps_text):
         """The steps identified in the "steps" text string will be parsed and
@@ -528,6 +554,10 @@ class ModelRunner(object):
         self.context = None
         self.feature = None
         self.hook_failures = 0
+        self.parallel_worker = None
+        self.run_history = None
+        self.memory_tracker = None
+        self.async_runtime = None
 
     # @property
     def _get_aborted(self):
@@ -549,7 +579,10 @@ class ModelRunner(object):
         if not self.config.dry_run and (name in self.hooks):
             try:
                 with context.use_with_user_mode():
-                    self.hooks[name](context, *args)
+                    result = self.hooks[name](context, *args)
+                    if self.async_runtime is not None:
+                        # -- ASYNC-RUNTIME: Run coroutine hook on event loop.
+                        self.async_runtime.complete(result)
             # except KeyboardInterrupt:
             #     self.aborted = True
             #     if name not in ("before_all", "after_all"):
@@ -605,6 +638,213 @@ class ModelRunner(object):
     def teardown_capture(self):
         self.capture_controller.teardown_capture()
 
+    def use_lazy_outline_expansion(self):
+        """Indicates if scenario outlines should be expanded lazily.
+        Any formatter/reporter that needs the complete scenarios of
+        a ScenarioOutline enforces the eager expansion mode.
+
+        :return: True, if lazy expansion mode should be used.
+        """
+        if self.config.scenario_outline_expansion != "lazy":
+            return False
+        for processor in self.formatters + list(self.config.reporters):
+            if getattr(processor, "requires_expanded_outlines", False):
+                return False
+        return True
+
+    @staticmethod
+    def setup_lazy_outline_expansion(scenario_container):
+        """Enable lazy expansion mode for all scenario outlines
+        of a feature (or rule) without building their scenarios.
+        """
+        for run_item in scenario_container.run_items:
+            if isinstance(run_item, ScenarioOutline):
+                run_item.expand_lazily = True
+            elif isinstance(run_item, Rule):
+                ModelRunner.setup_lazy_outline_expansion(run_item)
+
+    def select_jobs(self):
+        """Provides the number of worker processes to run the features
+        (option: ``--jobs``).
+
+        :return: Number of worker processes (or 1, if run serially).
+
+        .. versionadded:: 1.2.7
+        """
+        jobs = getattr(self.config, "jobs", None)
+        if isinstance(jobs, six.string_types):
+            jobs = int(jobs)
+        if isinstance(jobs, six.integer_types) and jobs > 1:
+            return jobs
+        return 1
+
+    def select_max_scenarios(self):
+        """Provides the maximum number of scenarios that a worker process
+        runs before it is replaced (option: ``--max-scenarios-per-worker``).
+
+        :return: Maximum number of scenarios (or None, if unlimited).
+
+        .. versionadded:: 1.2.7
+        """
+        max_scenarios = getattr(self.config, "max_scenarios_per_worker", None)
+        if isinstance(max_scenarios, six.string_types):
+            max_scenarios = int(max_scenarios)
+        if isinstance(max_scenarios, six.integer_types) and max_scenarios > 0:
+            return max_scenarios
+        return None
+
+    def select_max_worker_memory(self):
+        """Provides the RSS growth limit of a worker process in bytes
+        (option: ``--max-worker-memory``).
+
+        :return: RSS growth limit (or None, if unlimited).
+
+        .. versionadded:: 1.2.7
+        """
+        max_memory = getattr(self.config, "max_worker_memory", None)
+        if isinstance(max_memory, six.string_types):
+            max_memory = parse_size(max_memory)
+        if isinstance(max_memory, six.integer_types) and max_memory > 0:
+            return max_memory
+        return None
+
+    def use_worker_processes(self):
+        """Indicates if the features are run in worker processes (options:
+        ``--jobs``, ``--fork-server``, ``--max-scenarios-per-worker``,
+        ``--max-worker-memory``).
+
+        .. versionadded:: 1.2.7
+        """
+        return bool(self.select_jobs() > 1 or self.use_fork_server() or
+                    self.select_max_scenarios() or
+                    self.select_max_worker_memory())
+
+    def make_memory_tracker(self):
+        """Creates the memory tracker of a (serial or worker) test run
+        if the memory growth is needed (options: ``--memory-report``,
+        ``--max-worker-memory``).
+
+        :return: MemoryTracker object (or None).
+
+        .. versionadded:: 1.2.7
+        """
+        memory_report = getattr(self.config, "memory_report", False) is True
+        if not (memory_report or self.select_max_worker_memory()):
+            return None
+        return MemoryTracker(trace=memory_report)
+
+    def start_async_runtime(self):
+        """Starts the event loop of the test run (option: ``--async-runtime``),
+        if it is used. It is provided as ``context.async_runtime``.
+        An async runtime that is already provided (by the runner of
+        ``--async-scenarios``) is used instead.
+
+        :return: True, if the async runtime was started. False, otherwise.
+
+        .. versionadded:: 1.2.7
+        """
+        if self.async_runtime is not None:
+            return False
+        if getattr(self.config, "async_runtime", False) is not True:
+            return False
+        self.async_runtime = AsyncRuntime()
+        self.async_runtime.start()
+        self.context._set_root_attribute("async_runtime", self.async_runtime)
+        return True
+
+    def stop_async_runtime(self):
+        if self.async_runtime is not None:
+            self.async_runtime.stop()
+            self.async_runtime = None
+
+    def select_async_scenarios(self):
+        """Provides the number of scenarios that are run concurrently
+        on one event loop (option: ``--async-scenarios``).
+
+        :return: Number of concurrent scenarios (or None, if not used).
+
+        .. versionadded:: 1.2.7
+        """
+        async_scenarios = getattr(self.config, "async_scenarios", None)
+        if isinstance(async_scenarios, six.string_types):
+            async_scenarios = int(async_scenarios)
+        if (isinstance(async_scenarios, six.integer_types) and
+                async_scenarios > 0):
+            return async_scenarios
+        return None
+
+    def use_fork_server(self):
+        """Indicates if the fork-server mode is used (option:
+        ``--fork-server``, requires ``os.fork()``).
+
+        .. versionadded:: 1.2.7
+        """
+        fork_server = getattr(self.config, "fork_server", False)
+        return fork_server is True and hasattr(os, "fork")
+
+    def select_shard(self, features):
+        """Narrows the features to the scenarios of the shard
+        (option: ``--shard=INDEX/COUNT``), if used.
+
+        :return: Features of the shard (or all features).
+
+        .. versionadded:: 1.2.7
+        """
+        shard_selector = self.make_shard_selector()
+        if shard_selector is None:
+            return features
+        return shard_selector.select_features(features, self.config)
+
+    def make_shard_selector(self):
+        """Creates the selector of the shard (option: ``--shard``).
+
+        :return: ShardSelector object (or None, if no shard is used).
+
+        .. versionadded:: 1.2.7
+        """
+        shard = getattr(self.config, "shard", None)
+        if isinstance(shard, six.string_types):
+            shard = parse_shard(shard)
+        if not isinstance(shard, tuple):
+            return None
+
+        from behave.shard import ShardSelector
+        return ShardSelector(shard[0], shard[1], self.run_history)
+
+    def make_resource_pool(self):
+        """Creates the pool of shared test resources
+        (section: ``[behave.resources]`` in the configuration file).
+
+        .. versionadded:: 1.2.7
+        """
+        resources = getattr(self.config, "resources", None)
+        if not isinstance(resources, dict):
+            resources = {}
+        return ResourcePool.parse(resources)
+
+    def update_run_history(self, features):
+        """Stores the durations and results of the scenarios
+        in the run history (if used).
+
+        .. versionadded:: 1.2.7
+        """
+        if self.run_history is None:
+            return
+
+        self.run_history.add_features(features)
+        shard_selector = self.make_shard_selector()
+        if shard_selector is None:
+            self.run_history.save()
+            return
+
+        # -- SHARD: The run history assigns the scenarios to the shards and
+        #    must be the same on all nodes. Store only the results of this
+        #    shard (merged by: python -m behave.shard -f history ...).
+        filename = self.run_history.filename
+        if filename:
+            filename = shard_selector.make_history_filename(filename)
+            self.run_history.select_partial(features, filename).save()
+
     def run_model(self, features=None):
         # pylint: disable=too-many-branches
         if not self.context:
@@ -613,24 +853,81 @@ class ModelRunner(object):
             self.step_registry = the_step_registry
         if features is None:
             features = self.features
+        worker_address = getattr(self.config, "worker", None)
+        coordinator_address = getattr(self.config, "coordinator", None)
+        if self.parallel_worker is not None:
+            # -- WORKER PROCESS: Runs the features from its task queue.
+            features = self.parallel_worker.setup_runner(self, features)
+        elif isinstance(worker_address, six.string_types):
+            # -- REMOTE WORKER: Runs the work units of a coordinator.
+            from behave.distributed import run_remote_worker
+            return run_remote_worker(self, worker_address, features)
+        elif isinstance(coordinator_address, six.string_types):
+            # -- COORDINATOR: Distributes the features to remote workers.
+            from behave.distributed import DistributedRunner
+            features = list(features)
+            failed = DistributedRunner(self, coordinator_address).run_model(
+                features)
+            self.update_run_history(features)
+            return failed
+        elif self.select_async_scenarios():
+            # -- MAIN PROCESS: Runs scenarios concurrently on one event loop.
+            from behave.async_scenarios import AsyncScenarioRunner
+            features = list(features)
+            failed = AsyncScenarioRunner(self, self.select_async_scenarios()
+                                         ).run_model(features)
+            self.update_run_history(features)
+            return failed
+        elif self.use_worker_processes():
+            # -- MAIN PROCESS: Distributes the features to worker processes.
+            from behave.parallel import ParallelRunner
+            features = list(features)
+            failed = ParallelRunner(self, self.select_jobs()).run_model(features)
+            self.update_run_history(features)
+            return failed
+        elif self.run_history is not None:
+            features = self.run_history.order_features(features,
+                                                       self.config.order)
 
         # -- ENSURE: context.execute_steps() works in weird cases (hooks, ...)
         context = self.context
+        resource_pool = self.make_resource_pool()
+        if self.parallel_worker is None and resource_pool.resources:
+            # -- SERIAL RUN: Scenarios cannot conflict, use all resources.
+            context._set_root_attribute("resource_lease",
+                                        resource_pool.lease_all())
+        # -- FORK-SERVER WORKER: before_all()/after_all() run in main process.
+        run_all_hooks = (self.parallel_worker is None or
+                         not self.parallel_worker.inherits_hooks)
         self.hook_failures = 0
+        async_runtime_started = self.start_async_runtime()
         self.setup_capture()
-        self.run_hook("before_all", context)
+        if run_all_hooks:
+            self.run_hook("before_all", context)
+        # -- LOGGING HANDLER: Is only installed while a scenario runs.
+        self.teardown_capture()
+        # -- MEMORY BASELINE: After the one-time setup of before_all()
+        #    (in the worker process after the fork).
+        self.memory_tracker = memory_tracker = self.make_memory_tracker()
 
         run_feature = not self.aborted
         failed_count = 0
         undefined_steps_initial_size = len(self.undefined_steps)
+        lazy_outline_expansion = self.use_lazy_outline_expansion()
         for feature in features:
             if run_feature:
                 try:
                     self.feature = feature
+                    if lazy_outline_expansion:
+                        self.setup_lazy_outline_expansion(feature)
                     for formatter in self.formatters:
                         formatter.uri(feature.filename)
 
+                    if memory_tracker is not None:
+                        memory_tracker.start_feature()
                     failed = feature.run(self)
+                    if memory_tracker is not None:
+                        feature.memory_usage = memory_tracker.finish_feature()
                     if failed:
                         failed_count += 1
                         if self.config.stop or self.aborted:
@@ -649,11 +946,17 @@ class ModelRunner(object):
         # -- AFTER-ALL:
         # pylint: disable=protected-access, broad-except
         cleanups_failed = False
-        self.run_hook("after_all", self.context)
-        try:
-            self.context._do_cleanups()   # Without dropping the last context layer.
-        except Exception:
-            cleanups_failed = True
+        if run_all_hooks:
+            self.run_hook("after_all", self.context)
+            try:
+                self.context._do_cleanups()   # Without dropping the last context layer.
+            except Exception:
+                cleanups_failed = True
+        self.teardown_capture()
+        if async_runtime_started:
+            self.stop_async_runtime()
+        if memory_tracker is not None:
+            memory_tracker.close()
 
         if self.aborted:
             print("\nABORTED: By user.")
@@ -662,6 +965,9 @@ class ModelRunner(object):
         for reporter in self.config.reporters:
             reporter.end()
 
+        if self.parallel_worker is None:
+            self.update_run_history(features)
+
         # XXX-MAYBE: or context.failed)
         failed = ((failed_count > 0) or self.aborted or (self.hook_failures > 0)
                   or (len(self.undefined_steps) > undefined_steps_initial_size)
@@ -689,6 +995,7 @@ class Runner(ModelRunner):
         super(Runner, self).__init__(config)
         self.path_manager = PathManager()
         self.base_dir = None
+        self.tag_index = None
 
     def setup_paths(self):
         # pylint: disable=too-many-branches, too-many-statements
@@ -1084,11 +1391,35 @@ class Runner(ModelRunner):
         return step_files
 
     def feature_locations(self):
-        return collect_feature_locations(self.config.paths)
+        return collect_feature_locations(self.config.paths,
+                                         tag_expression=self.config.tag_expression,
+                                         tag_index=self.tag_index)
+
+    def load_tag_index(self):
+        """Load the tag index (if enabled) to skip feature files
+        without selected scenarios.
+
+        .. versionadded:: 1.2.7
+        """
+        tag_index_filename = self.config.tag_index
+        if isinstance(tag_index_filename, six.string_types):
+            self.tag_index = TagIndex.load(tag_index_filename)
+
+    def load_run_history(self):
+        """Load the run history (if enabled) to order the scenarios
+        by their durations/results of the last runs.
+
+        .. versionadded:: 1.2.7
+        """
+        run_history_filename = self.config.run_history
+        if isinstance(run_history_filename, six.string_types):
+            self.run_history = RunHistory.load(run_history_filename)
 
     def run(self):
         with self.path_manager:
             self.setup_paths()
+            self.load_tag_index()
+            self.load_run_history()
             return self.run_with_paths()
 
     def run_with_paths(self):
@@ -1103,8 +1434,11 @@ class Runner(ModelRunner):
         # -- STEP: Parse all feature files (by using their file location).
         feature_locations = [filename for filename in self.feature_locations()
                              if not self.config.exclude(filename)]
-        features = parse_features(feature_locations, language=self.config.lang)
-        self.features.extend(features)
+        features = parse_features(feature_locations, language=self.config.lang,
+                                  tag_index=self.tag_index)
+        self.features.extend(self.select_shard(features))
+        if self.tag_index is not None:
+            self.tag_index.save()
 
         # -- STEP: Run all features.
         stream_openers = self.config.outputs
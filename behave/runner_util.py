@@ -461,7 +461,7 @@ class PathManager(object):
 # -----------------------------------------------------------------------------
 # FUNCTIONS:
 # -----------------------------------------------------------------------------
-def parse_features(feature_files, language=None):
+def parse_features(feature_files, language=None, tag_index=None):
     """
     Parse feature files and return list of Feature model objects.
     Handles:
@@ -471,6 +471,7 @@ def parse_features(feature_files, language=None):
 
     :param feature_files: List of feature file names to parse.
     :param language:      Default language to use.
+    :param tag_index:     Optional tag index to update (as TagIndex).
     :return: List of feature objects.
     """
     scenario_collector = FeatureScenarioLocationCollector2()
@@ -493,6 +494,8 @@ def parse_features(feature_files, language=None):
         assert isinstance(location, FileLocation)
         filename = os.path.abspath(location.filename)
         feature = parser.parse_file(filename, language=language)
+        if feature and tag_index is not None:
+            tag_index.add_feature(feature)
         if feature:
             # -- VALID FEATURE:
             # SKIP CORNER-CASE: Feature file without any feature(s).
@@ -505,7 +508,8 @@ def parse_features(feature_files, language=None):
     return features
 
 
-def collect_feature_locations(paths, strict=True):
+def collect_feature_locations(paths, strict=True, tag_expression=None,
+                              tag_index=None):
     """
     Collect feature file names by processing list of paths (from command line).
     A path can be a:
@@ -515,7 +519,12 @@ def collect_feature_locations(paths, strict=True):
       * features configuration filename, ala "@features.txt"
       * directory, to discover and collect all "*.feature" files below.
 
+    If a tag index is provided, feature files are skipped if the tag index
+    knows that none of their scenarios is selected by the tag expression.
+
     :param paths:  Paths to process.
+    :param tag_expression:  Optional tag expression to select feature files.
+    :param tag_index:       Optional tag index to use (as TagIndex).
     :return: Feature file locations to use (as list of FileLocations).
     """
     locations = []
@@ -539,6 +548,12 @@ def collect_feature_locations(paths, strict=True):
                 locations.append(location)
             elif strict:
                 raise FileNotFoundError(path)
+
+    if tag_index is not None and tag_expression is not None:
+        # -- SKIP FEATURE FILES: That are known to have no selected scenario.
+        locations = [location for location in locations
+                     if tag_index.can_select(location.filename,
+                                             tag_expression) is not False]
     return locations
 
 
@@ -0,0 +1,317 @@
+# -*- coding: UTF-8 -*-
+"""
+Splits a test run into shards that run on several (CI) nodes
+(option: ``--shard=INDEX/COUNT``) and merges the reports of the shards.
+
+Each scenario (and each row of a scenario outline) is assigned to exactly
+one shard. The assignment is deterministic, therefore the shards never
+overlap and never miss a scenario (if all nodes use the same feature files,
+tag expression and name selection):
+
+* by a stable hash of its feature file and scenario name (default)
+* by its recorded duration if a run history is used
+  (option: ``--run-history=FILE``): The selected scenarios are dealt
+  longest first to the shard with the least expected duration.
+  All nodes need the same run history file. Therefore, a shard stores its
+  results in its own run history file (``FILE.shard<INDEX>``, like:
+  ``behave.history.shard2.json``) that is merged into the run history
+  after the test run.
+
+Scenarios that are not selected (by tags or name) are assigned by the
+stable hash (and are reported as skipped by one shard only).
+A feature is only run (and reported) by a shard that runs one of its
+scenarios.
+
+.. code-block:: sh
+
+    # -- ON NODE 2 (of 4 nodes):
+    behave --shard=2/4 -f json -o build/shard2.json --junit-directory=build/shard2
+
+    # -- AFTERWARDS: Merge the reports of the shards.
+    python -m behave.shard -f json -o build/behave.json build/shard*.json
+    python -m behave.shard -f junit -o reports build/shard1 build/shard2 ...
+    python -m behave.shard -f history -o build/behave.history.json \
+        build/behave.history.shard*.json
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import io
+import json
+import os.path
+import re
+import sys
+import zlib
+from xml.etree import ElementTree
+import six
+from behave.model_core import Status
+from behave.parallel import narrow_run_items
+from behave.reporter.junit import CDATA, ElementTreeWithCDATA
+from behave.run_history import RunHistory
+
+
+# -----------------------------------------------------------------------------
+# SHARD SELECTION:
+# -----------------------------------------------------------------------------
+class ShardSelector(object):
+    """Selects the scenarios of one shard (of COUNT shards).
+
+    :param index:   Index of the shard (1 <= INDEX <= COUNT).
+    :param count:   Number of shards.
+    :param run_history: Run history with the scenario durations (optional).
+    """
+
+    def __init__(self, index, count, run_history=None):
+        if not 1 <= index <= count:
+            raise ValueError("shard %d/%d: INDEX is out of range" %
+                             (index, count))
+        self.index = index
+        self.count = count
+        self.run_history = run_history
+
+    @staticmethod
+    def make_key(element):
+        if hasattr(element, "walk_scenarios"):
+            return element.filename     # -- FEATURE: Without scenarios.
+        return RunHistory.make_key(element)
+
+    def select_shard_by_hash(self, element):
+        """Provides the shard index of a model element (by stable hash)."""
+        key = self.make_key(element).encode("utf-8")
+        return (zlib.crc32(key) & 0xffffffff) % self.count + 1
+
+    def make_history_filename(self, filename):
+        """Provides the filename of the run history of this shard."""
+        root, extension = os.path.splitext(filename)
+        return "%s.shard%d%s" % (root, self.index, extension)
+
+    def use_durations(self):
+        return self.run_history is not None and bool(self.run_history.scenarios)
+
+    def make_assignment(self, features, config):
+        """Assigns each scenario to its shard.
+
+        :param features:    Features (with all scenarios).
+        :param config:      Configuration (for tags and name selection).
+        :return: Shard index of each scenario (as dict: id(scenario) => index).
+        """
+        assignment = {}
+        selected = []
+        use_durations = self.use_durations()
+        for feature in features:
+            for scenario in feature.walk_scenarios():
+                if use_durations and scenario.should_run(config):
+                    selected.append(scenario)
+                else:
+                    assignment[id(scenario)] = \
+                        self.select_shard_by_hash(scenario)
+
+        if selected:
+            # -- DURATION BALANCED: Longest first, to the least loaded shard.
+            default = self.run_history.make_default_duration()
+            durations = [self.run_history.select_duration(scenario, default)
+                         for scenario in selected]
+            costs = [0.0] * self.count
+            for position in sorted(range(len(selected)),
+                                   key=lambda x: (-durations[x], x)):
+                shard = costs.index(min(costs))
+                costs[shard] += durations[position]
+                assignment[id(selected[position])] = shard + 1
+        return assignment
+
+    def select_features(self, features, config):
+        """Narrows the features to the scenarios of this shard.
+        Features without any scenario of this shard are removed.
+
+        :return: Features of this shard (as list).
+        """
+        features = list(features)
+        assignment = self.make_assignment(features, config)
+        selected_features = []
+        for feature in features:
+            scenarios = feature.walk_scenarios()
+            if not scenarios:
+                if self.select_shard_by_hash(feature) == self.index:
+                    selected_features.append(feature)
+                continue
+
+            selected = set(id(scenario) for scenario in scenarios
+                           if assignment[id(scenario)] == self.index)
+            if narrow_run_items(feature, selected, []):
+                selected_features.append(feature)
+        return selected_features
+
+
+# -----------------------------------------------------------------------------
+# MERGE REPORTS:
+# -----------------------------------------------------------------------------
+STATUS_ORDER = [Status.failed.name, Status.passed.name, Status.skipped.name]
+
+
+def merge_status(statuses):
+    """Provides the overall status of the status of some feature parts."""
+    for status in STATUS_ORDER:
+        if status in statuses:
+            return status
+    return statuses[0]
+
+
+def parse_location(location):
+    """Splits a location into filename and line number (for sorting)."""
+    filename, _, line = location.rpartition(":")
+    if not line.isdigit():
+        return location, 0
+    return filename, int(line)
+
+
+def merge_json_features(features_data):
+    """Merges the JSON data of the parts of a feature (from several shards).
+    The scenarios are ordered by their line number, a background is only
+    kept before its first scenario.
+    """
+    chunks = []
+    for feature_data in features_data:
+        chunk = []
+        for element in feature_data.get("elements", []):
+            chunk.append(element)
+            if element["type"] != "background":
+                chunks.append(chunk)
+                chunk = []
+
+    elements = []
+    used_backgrounds = set()
+    for chunk in sorted(chunks, key=lambda x: parse_location(x[-1]["location"])):
+        for element in chunk:
+            if element["type"] == "background":
+                if element["location"] in used_backgrounds:
+                    continue
+                used_backgrounds.add(element["location"])
+            elements.append(element)
+
+    merged = dict(features_data[0])
+    merged["status"] = merge_status([feature_data["status"]
+                                     for feature_data in features_data])
+    if elements:
+        merged["elements"] = elements
+    return merged
+
+
+def merge_json_reports(filenames):
+    """Merges the JSON reports of several shards
+    (written by the "json" formatter).
+
+    :param filenames:   Filenames of the JSON reports.
+    :return: JSON data of the merged report (as list of features).
+    """
+    features = {}
+    for filename in filenames:
+        with io.open(filename, "r", encoding="utf-8") as f:
+            for feature_data in json.load(f):
+                features.setdefault(feature_data["location"], []).append(
+                    feature_data)
+
+    return [merge_json_features(features[location])
+            for location in sorted(features, key=parse_location)]
+
+
+def restore_cdata(element):
+    """Restores the CDATA sections of the captured output of a testcase
+    (that the XML parser converted into text).
+    """
+    for output in element.iter():
+        if output.tag in ("system-out", "system-err") and output.text:
+            text = re.sub(r"^\n|\n$", "", output.text)
+            output.text = None
+            output.append(CDATA(text))
+
+
+def merge_junit_testsuites(testsuites):
+    """Merges the JUnit testsuites of a feature (from several shards)."""
+    merged = testsuites[0]
+    for testsuite in testsuites[1:]:
+        for name in ("tests", "errors", "failures", "skipped"):
+            value = int(merged.get(name, 0)) + int(testsuite.get(name, 0))
+            merged.set(name, six.text_type(value))
+        duration = float(merged.get("time", 0)) + float(testsuite.get("time", 0))
+        merged.set("time", six.text_type(round(duration, 6)))
+        for testcase in testsuite:
+            merged.append(testcase)
+    return merged
+
+
+def select_junit_files(paths):
+    """Provides the JUnit report files (as dict: basename => filenames)."""
+    files = {}
+    for path in paths:
+        filenames = [path]
+        if os.path.isdir(path):
+            filenames = [os.path.join(path, name)
+                         for name in sorted(os.listdir(path))
+                         if name.endswith(".xml")]
+        for filename in filenames:
+            files.setdefault(os.path.basename(filename), []).append(filename)
+    return files
+
+
+def merge_junit_reports(paths, directory):
+    """Merges the JUnit reports of several shards
+    (a report file per feature, with the same basename in each shard).
+
+    :param paths:       Report directories (or files) of the shards.
+    :param directory:   Directory for the merged report files.
+    :return: Filenames of the merged report files.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    merged_filenames = []
+    for basename, filenames in sorted(select_junit_files(paths).items()):
+        testsuites = [ElementTree.parse(filename).getroot()
+                      for filename in filenames]
+        testsuite = merge_junit_testsuites(testsuites)
+        restore_cdata(testsuite)
+        merged_filename = os.path.join(directory, basename)
+        with open(merged_filename, "wb") as f:
+            ElementTreeWithCDATA(testsuite).write(f, "UTF-8")
+        merged_filenames.append(merged_filename)
+    return merged_filenames
+
+
+def main(args=None):
+    """Merge the JSON/JUnit reports (or run histories) of several shards
+    into one report (or run history)."""
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(prog="python -m behave.shard",
+                                     description=main.__doc__)
+    parser.add_argument("-f", "--format", choices=["json", "junit", "history"],
+                        default="json", help="Report format (default: json).")
+    parser.add_argument("-o", "--output", required=True,
+                        help="""Merged JSON file (or directory of the merged
+                                JUnit reports, or run history file).""")
+    parser.add_argument("reports", nargs="+",
+                        help="""JSON files (or JUnit report directories,
+                                or run history files) of the shards.""")
+    options = parser.parse_args(args)
+
+    if options.format == "json":
+        data = merge_json_reports(options.reports)
+        with io.open(options.output, "w", encoding="utf-8") as f:
+            f.write(six.text_type(json.dumps(data, indent=2)))
+        print("MERGED: %d features into %s" % (len(data), options.output))
+    elif options.format == "junit":
+        filenames = merge_junit_reports(options.reports, options.output)
+        print("MERGED: %d reports into %s" % (len(filenames), options.output))
+    else:
+        run_history = RunHistory.merge(options.output, options.reports)
+        run_history.save()
+        print("MERGED: %d scenarios into %s" % (len(run_history.scenarios),
+                                                options.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
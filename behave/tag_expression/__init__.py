@@ -25,12 +25,26 @@ from .v1 import TagExpression
 # -----------------------------------------------------------------------------
 def make_tag_expression(tag_expression_text):
     """Build a TagExpression object by parsing the tag-expression (as text).
+    Parsed tag-expressions are cached (per tag-expression text).
 
     :param tag_expression_text:     Tag expression text to parse (as string).
     :return: TagExpression object to use.
     """
-    parse_tag_expression = select_tag_expression_parser(tag_expression_text)
-    return parse_tag_expression(tag_expression_text)
+    key = tag_expression_text
+    if not isinstance(key, six.string_types):
+        key = tuple(key)
+    tag_expression = _tag_expression_cache.get(key)
+    if tag_expression is None:
+        parse_tag_expression = select_tag_expression_parser(tag_expression_text)
+        tag_expression = parse_tag_expression(tag_expression_text)
+        if len(_tag_expression_cache) >= TAG_EXPRESSION_CACHE_MAXSIZE:
+            _tag_expression_cache.clear()
+        _tag_expression_cache[key] = tag_expression
+    return tag_expression
+
+
+TAG_EXPRESSION_CACHE_MAXSIZE = 64
+_tag_expression_cache = {}
 
 
 def parse_tag_expression_v1(tag_expression_parts):
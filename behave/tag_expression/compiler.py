@@ -0,0 +1,189 @@
+# -*- coding: UTF-8 -*-
+"""
+Compiles a parsed tag-expression into a bitset test.
+
+Each distinct tag (or tag-matcher) of the tag-expression is interned
+to a bit index. The boolean expression tree is compiled once into a flat
+Python function that evaluates a bitmask with a few integer operations
+(instead of interpreting the expression tree recursively).
+
+The bitmask of a tag is computed once per distinct tag
+(including any wildcard matching):
+
+.. code-block:: python
+
+    # -- Expression := (a or b.*) and not c
+    tag_expression = TagExpressionParser.parse("(a or b.*) and not c")
+    compiled = CompiledTagExpression(tag_expression)
+    # -- COMPILED AS: (mask & 3) and not (mask & 4)
+    assert True  == compiled(["a", "other"])
+    assert True  == compiled(["b.x"])
+    assert False == compiled(["a", "c"])
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+from cucumber_tag_expressions.model import Literal, And, Or, Not, True_
+from .model_ext import Matcher
+from .v1 import TagExpression as TagExpressionV1
+
+
+class CompiledTagExpression(object):
+    """Tag-expression that is compiled into a bitset test (as function).
+
+    :param expression:  Parsed tag-expression (v1 or v2) to compile.
+    """
+    tag_masks_maxsize = 4096
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.literal_bits = {}
+        self.matcher_bits = []
+        self._tag_masks = {}
+        self.source = self.compile(expression)
+        self._test = eval("lambda mask: bool(%s)" % self.source, {})
+
+    def __call__(self, tags):
+        """Evaluates the compiled tag-expression.
+
+        :param tags:  Tags of a model element (as list/set of strings).
+        :return: True, if tag-expression matches the tags. False, otherwise.
+        """
+        return self._test(self.make_mask(tags))
+
+    # -- INTERN TAGS: As bit index.
+    def intern_literal(self, name):
+        bit = self.literal_bits.get(name)
+        if bit is None:
+            bit = self.literal_bits[name] = self._make_next_bit()
+        return bit
+
+    def intern_matcher(self, pattern):
+        for matcher, bit in self.matcher_bits:
+            if matcher.pattern == pattern:
+                return bit
+        bit = self._make_next_bit()
+        self.matcher_bits.append((Matcher(pattern), bit))
+        return bit
+
+    def _make_next_bit(self):
+        return 1 << (len(self.literal_bits) + len(self.matcher_bits))
+
+    def make_tag_mask(self, tag):
+        """Provides the bitmask of a tag (computed once per distinct tag)."""
+        mask = self._tag_masks.get(tag)
+        if mask is None:
+            mask = self.literal_bits.get(tag, 0)
+            for matcher, bit in self.matcher_bits:
+                if matcher.evaluate([tag]):
+                    mask |= bit
+            if len(self._tag_masks) >= self.tag_masks_maxsize:
+                self._tag_masks.clear()
+            self._tag_masks[tag] = mask
+        return mask
+
+    def make_mask(self, tags):
+        """Provides the bitmask of the tags of a model element."""
+        mask = 0
+        for tag in tags:
+            mask |= self.make_tag_mask(tag)
+        return mask
+
+    # -- COMPILER:
+    def compile(self, expression):
+        """Compiles a (sub-)expression into Python source code
+        that evaluates the variable ``mask``.
+
+        :param expression:  Expression (or sub-expression) to compile.
+        :return: Python expression (as string).
+        :raises TypeError: If the expression type is not supported.
+        """
+        if isinstance(expression, TagExpressionV1):
+            return self.compile_v1(expression)
+        elif isinstance(expression, True_):
+            return "True"
+        elif isinstance(expression, Not):
+            return "not %s" % self.compile(expression.term)
+        elif isinstance(expression, (And, Or)):
+            return self.compile_operation(expression)
+        bit = self.select_operand_bit(expression)
+        if bit is None:
+            raise TypeError("UNSUPPORTED: %r" % expression)
+        return "(mask & %d)" % bit
+
+    def select_operand_bit(self, expression):
+        if isinstance(expression, Matcher):
+            return self.intern_matcher(expression.pattern)
+        elif isinstance(expression, Literal):
+            return self.intern_literal(expression.name)
+        return None
+
+    def compile_operation(self, expression):
+        # -- FLATTEN: a and (b and c) => and(a, b, c)
+        operation = type(expression)
+        terms = list(self.iter_flattened_terms(expression, operation))
+        bits = [self.select_operand_bit(term) for term in terms]
+        if terms and None not in bits:
+            # -- CASE: Only tags as operands => Single bitmask test.
+            bitmask = sum(set(bits))
+            if operation is And:
+                return "((mask & %d) == %d)" % (bitmask, bitmask)
+            return "(mask & %d)" % bitmask
+
+        keyword = " and " if operation is And else " or "
+        parts = [self.compile(term) for term in terms]
+        if not parts:
+            return "True" if operation is And else "False"
+        return "(%s)" % keyword.join(parts)
+
+    @classmethod
+    def iter_flattened_terms(cls, expression, operation):
+        for term in expression.terms:
+            if type(term) is operation:
+                for sub_term in cls.iter_flattened_terms(term, operation):
+                    yield sub_term
+            else:
+                yield term
+
+    def compile_v1(self, expression):
+        """Compiles an old-style tag-expression:
+        (or_expr1) and (or_expr2) and ...
+        with or_exprN := [not] tag1 or [not] tag2 or ...
+        """
+        and_parts = []
+        for ors in expression.ands:
+            bitmask = 0
+            negated_bitmask = 0
+            for xtag in ors:
+                if xtag.startswith("-"):
+                    negated_bitmask |= self.intern_literal(xtag[1:])
+                else:
+                    bitmask |= self.intern_literal(xtag)
+            or_parts = []
+            if bitmask:
+                or_parts.append("(mask & %d)" % bitmask)
+            if negated_bitmask:
+                or_parts.append("((mask & %d) != %d)" % (negated_bitmask,
+                                                         negated_bitmask))
+            and_parts.append("(%s)" % " or ".join(or_parts or ["False"]))
+        if not and_parts:
+            return "True"
+        return " and ".join(and_parts)
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS:
+# -----------------------------------------------------------------------------
+def compile_tag_expression(expression):
+    """Compiles a parsed tag-expression into a function that
+    evaluates the tags of a model element.
+
+    :param expression:  Parsed tag-expression (v1 or v2).
+    :return: Compiled tag-expression (as callable).
+    """
+    try:
+        return CompiledTagExpression(expression)
+    except TypeError:
+        # -- UNKNOWN EXPRESSION TYPE (user-defined): Use interpreter.
+        return expression.evaluate
@@ -10,11 +10,31 @@ def _Expression_check(self, tags):
     """Checks if tags match this tag-expression.
     NOTE: Backward-compatible to tag-expressions v1.
 
+    The verdict is cached per distinct tag set
+    (many model elements share the same tags). The expression is
+    compiled into a bitset test on first use.
+
     :param tags:  Tags (as list of strings)
     :return: True, if tag-expression matches tags.
     :return: False, otherwise.
     """
-    return self.evaluate(tags)
+    tags = frozenset(tags)
+    verdicts = self.__dict__.get("_verdicts")
+    if verdicts is None:
+        verdicts = self._verdicts = {}
+    verdict = verdicts.get(tags)
+    if verdict is None:
+        if len(verdicts) >= VERDICT_CACHE_MAXSIZE:
+            verdicts.clear()
+        evaluate = self.__dict__.get("_compiled")
+        if evaluate is None:
+            from .compiler import compile_tag_expression
+            evaluate = self._compiled = compile_tag_expression(self)
+        verdict = verdicts[tags] = bool(evaluate(tags))
+    return verdict
+
+
+VERDICT_CACHE_MAXSIZE = 4096
 
 
 Expression.check = _Expression_check
@@ -11,9 +11,13 @@ class TagExpression(object):
     with or_exprN := [not] tag1 or [not] tag2 or ...
     """
 
+    verdict_cache_maxsize = 4096
+
     def __init__(self, tag_expressions):
         self.ands = []
         self.limits = {}
+        self._verdicts = {}
+        self._compiled = None
 
         for expr in tag_expressions:
             self.store_and_extract_limits(self.normalized_tags_from_or(expr))
@@ -85,8 +89,24 @@ class TagExpression(object):
         if not self.ands:
             return True
 
-        element_tags = set(tags)
-
+        # -- CACHED: Verdict per distinct tag set.
+        element_tags = frozenset(tags)
+        verdict = self._verdicts.get(element_tags)
+        if verdict is None:
+            if len(self._verdicts) >= self.verdict_cache_maxsize:
+                self._verdicts.clear()
+            verdict = self._evaluate(element_tags)
+            self._verdicts[element_tags] = verdict
+        return verdict
+
+    def _evaluate(self, element_tags):
+        if self._compiled is None:
+            from .compiler import compile_tag_expression
+            self._compiled = compile_tag_expression(self)
+        return self._compiled(element_tags)
+
+    def _interpret(self, element_tags):
+        # -- UNCOMPILED: Interprets the tag expression (reference semantics).
         def test_tag(xtag):
             if xtag.startswith('-'): # -- or xtag.startswith('~'):
                 return xtag[1:] not in element_tags
@@ -0,0 +1,216 @@
+# -*- coding: UTF-8 -*-
+"""
+Provides a persistent tag index for feature files.
+
+The tag index maps each tag to the feature files and scenario line numbers
+where it is used (including inherited tags). It is built as a side product
+of parsing the feature files and stored as JSON file. An index entry
+of a feature file is invalidated when the file or one of its examples
+data files (tag: ``@examples.file=FILENAME``) is modified (mtime, size).
+
+The tag index allows to skip feature files whose tags cannot satisfy
+the tag expression (without parsing them).
+
+.. code-block:: python
+
+    tag_index = TagIndex.load("build/behave.tag_index.json")
+    tag_expression = make_tag_expression("@smoke")
+    if tag_index.can_select("features/alice.feature", tag_expression) is False:
+        pass    # -- SKIP: Feature file contains no "@smoke" scenario.
+
+.. versionadded:: 1.2.7
+"""
+
+from __future__ import absolute_import
+import io
+import json
+import os.path
+import six
+from behave.model import \
+    Rule, ScenarioOutline, ScenarioOutlineBuilder, TableFile
+
+
+class TagIndex(object):
+    """Persistent index of the tags used in feature files.
+
+    Each feature file entry stores the effective tag sets of its feature and
+    scenarios (with line numbers) together with the file modification time
+    and size of the feature file and its examples data files
+    (to detect outdated entries).
+    """
+    version = 2
+
+    def __init__(self, filename=None, files=None):
+        self.filename = filename
+        self.files = files or {}
+        self.modified = False
+        self._tag_locations = None
+
+    @classmethod
+    def load(cls, filename):
+        """Load the tag index from a JSON file.
+        A missing, unreadable or incompatible index file results in an
+        empty tag index.
+
+        :param filename:    Filename of the tag index.
+        :return: TagIndex object.
+        """
+        files = None
+        if os.path.exists(filename):
+            try:
+                with io.open(filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == cls.version:
+                    files = data.get("files")
+            except (IOError, OSError, ValueError):
+                # -- CORRUPTED/UNREADABLE INDEX: Rebuild it.
+                files = None
+        return cls(filename, files)
+
+    def save(self, filename=None):
+        """Store the tag index as JSON file (if it was modified).
+        Entries of feature files that no longer exist are removed.
+        """
+        filename = filename or self.filename
+        if not (filename and self.modified):
+            return
+
+        files = dict((name, entry) for name, entry in self.files.items()
+                     if os.path.exists(name))
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        data = json.dumps(dict(version=self.version, files=files),
+                          indent=1, sort_keys=True)
+        with io.open(filename, "w", encoding="utf-8") as f:
+            f.write(six.text_type(data))
+        self.modified = False
+
+    @staticmethod
+    def make_key(filename):
+        return os.path.abspath(filename)
+
+    @staticmethod
+    def make_file_stamp(filename):
+        stat = os.stat(filename)
+        return [stat.st_mtime, stat.st_size]
+
+    def add_feature(self, feature):
+        """Add (or replace) the index entry for a parsed feature.
+
+        :param feature: Feature object (with its feature file).
+        """
+        filename = feature.location.abspath()
+        if not os.path.isfile(filename):
+            return      # -- FEATURE WITHOUT FILE: Nothing to index.
+
+        tag_sets = [[entity.line, sorted(entity.effective_tags)]
+                    for entity in iter_tagged_entities(feature)]
+        # -- EXAMPLES DATA FILES: Provide the rows of scenario outlines.
+        data_files = dict((data_filename,
+                           self.make_file_stamp(data_filename))
+                          for data_filename in iter_data_files(feature))
+        self.files[self.make_key(filename)] = dict(
+            stamp=self.make_file_stamp(filename), tags=tag_sets,
+            data_files=data_files)
+        self.modified = True
+        self._tag_locations = None
+
+    def select_entry(self, filename):
+        """Select the index entry of a feature file (if it is up-to-date).
+
+        :param filename:    Feature file to use.
+        :return: Index entry (as dict) or None (if unknown or outdated).
+        """
+        entry = self.files.get(self.make_key(filename))
+        if entry is None:
+            return None
+        try:
+            if entry.get("stamp") != self.make_file_stamp(filename):
+                return None     # -- OUTDATED: Feature file was modified.
+            for data_filename, stamp in entry.get("data_files", {}).items():
+                if stamp != self.make_file_stamp(data_filename):
+                    return None     # -- OUTDATED: Examples data changed.
+        except OSError:
+            return None
+        return entry
+
+    def select_lines(self, filename, tag_expression):
+        """Select the line numbers of feature and scenarios that are selected
+        by the tag expression.
+
+        :param filename:        Feature file to use.
+        :param tag_expression:  Tag expression to use.
+        :return: List of line numbers (or None, if entry is not up-to-date).
+        """
+        entry = self.select_entry(filename)
+        if entry is None:
+            return None
+        return [line for line, tags in entry["tags"]
+                if tag_expression.check(tags)]
+
+    def can_select(self, filename, tag_expression):
+        """Indicates if any scenario in the feature file can be selected
+        by the tag expression.
+
+        :param filename:        Feature file to use.
+        :param tag_expression:  Tag expression to use.
+        :return: True/False, if known. None, if entry is not up-to-date.
+        """
+        entry = self.select_entry(filename)
+        if entry is None:
+            return None
+        return any(tag_expression.check(tags) for _, tags in entry["tags"])
+
+    @property
+    def tag_locations(self):
+        """Inverted index: Maps each tag to its feature files
+        and the line numbers of the feature/scenarios that use it.
+
+        :return: Dictionary with: tag => {filename: [line, ...]}
+        """
+        if self._tag_locations is None:
+            tag_locations = {}
+            for filename, entry in self.files.items():
+                for line, tags in entry["tags"]:
+                    for tag in tags:
+                        lines = tag_locations.setdefault(tag, {})\
+                            .setdefault(filename, [])
+                        lines.append(line)
+            self._tag_locations = tag_locations
+        return self._tag_locations
+
+
+# -----------------------------------------------------------------------------
+# UTILITY FUNCTIONS:
+# -----------------------------------------------------------------------------
+def iter_tagged_entities(scenario_container):
+    """Provides the feature/rule and all its (effective) scenarios.
+    A scenario outline provides its scenarios (without storing them).
+    """
+    yield scenario_container
+    for run_item in scenario_container.run_items:
+        if isinstance(run_item, Rule):
+            for entity in iter_tagged_entities(run_item):
+                yield entity
+        elif isinstance(run_item, ScenarioOutline):
+            yield run_item
+            builder = ScenarioOutlineBuilder(run_item.annotation_schema)
+            for scenario in builder.iter_scenarios(run_item):
+                yield scenario
+        else:
+            yield run_item
+
+
+def iter_data_files(scenario_container):
+    """Provides the examples data files (as absolute paths) that are used
+    by the scenario outlines of a feature/rule.
+    """
+    for run_item in scenario_container.run_items:
+        if isinstance(run_item, Rule):
+            for data_filename in iter_data_files(run_item):
+                yield data_filename
+        elif isinstance(run_item, ScenarioOutline):
+            for examples in run_item.examples:
+                if isinstance(examples.table, TableFile):
+                    yield os.path.abspath(examples.table.filename)
@@ -114,12 +114,21 @@ class ActiveTagMatcher(TagMatcher):
             if active_tag_matcher.should_exclude_with(scenario.effective_tags):
                 exclude_reason = active_tag_matcher.exclude_reason
                 scenario.skip(exclude_reason)   #< LATE-EXCLUDE from run-set.
+
+    CACHING:
+    --------
+
+    The active-tag groups are cached per tags (tuple) and the exclude verdict
+    per tags and category values. The category values are retrieved once
+    from the value provider. Call :meth:`invalidate_cache()` when the value
+    provider changes after the active tag matcher was used (mid-run).
     """
     value_separator = "="
     tag_prefixes = ["active", "not_active", "use", "not", "only"]
     tag_schema = r"^(?P<prefix>%s)\.with_(?P<category>\w+(\.\w+)*)%s(?P<value>.*)$"
     ignore_unknown_categories = True
     use_exclude_reason = False
+    cache_maxsize = 4096
 
     def __init__(self, value_provider, tag_prefixes=None,
                  value_separator=None, ignore_unknown_categories=None):
@@ -136,6 +145,29 @@ class ActiveTagMatcher(TagMatcher):
         self.tag_prefixes = tag_prefixes
         self.ignore_unknown_categories = ignore_unknown_categories
         self.exclude_reason = None
+        self._tag_groups = {}
+        self._category_values = {}
+        self._verdicts = {}
+
+    def invalidate_cache(self):
+        """Discard the cached category values and exclude verdicts.
+        Needed if the value provider changes after its values were used.
+        """
+        self._category_values.clear()
+        self._verdicts.clear()
+
+    def get_category_value(self, category):
+        """Provides the current value of a category (cached).
+
+        :param category:    Category name (as string).
+        :return: Category value or None (if category is unknown).
+        """
+        try:
+            return self._category_values[category]
+        except KeyError:
+            value = self.value_provider.get(category, None)
+            self._category_values[category] = value
+            return value
 
     @classmethod
     def make_tag_pattern(cls, tag_prefixes, value_separator=None):
@@ -186,7 +218,7 @@ class ActiveTagMatcher(TagMatcher):
             # -- CASE: Empty group is always enabled (CORNER-CASE).
             return True
 
-        current_value = self.value_provider.get(group_category, None)
+        current_value = self.get_category_value(group_category)
         if current_value is None and self.ignore_unknown_categories:
             # -- CASE: Unknown category, ignore it.
             return True
@@ -207,17 +239,45 @@ class ActiveTagMatcher(TagMatcher):
         return any(tags_enabled)    # -- PROVIDES: LOGICAL-OR expression
 
     def should_exclude_with(self, tags):
-        group_categories = self.group_active_tags_by_category(tags)
-        for group_category, category_tag_pairs in group_categories:
+        tags = tuple(tags)
+        verdict = self._verdicts.get(tags)
+        if verdict is None:
+            if len(self._verdicts) >= self.cache_maxsize:
+                self._verdicts.clear()
+            verdict = self._verdicts[tags] = self._evaluate_exclude_with(tags)
+        should_exclude, reason = verdict
+        if should_exclude and self.use_exclude_reason:
+            self.exclude_reason = reason
+        return should_exclude
+
+    def _evaluate_exclude_with(self, tags):
+        """Evaluates if tags should be excluded (without verdict cache).
+
+        :param tags: Tags (as tuple of strings).
+        :return: Tuple (should_exclude, exclude_reason).
+        """
+        for group_category, category_tag_pairs in self.select_tag_groups(tags):
             if not self.is_tag_group_enabled(group_category, category_tag_pairs):
                 # -- LOGICAL-AND SHORTCUT: Any false => Makes everything false
-                if self.use_exclude_reason:
-                    current_value = self.value_provider.get(group_category, None)
-                    reason = "%s (but: %s)" % (group_category, current_value)
-                    self.exclude_reason = reason
-                return True     # SHOULD-EXCLUDE: not enabled = not False
+                current_value = self.get_category_value(group_category)
+                reason = "%s (but: %s)" % (group_category, current_value)
+                return (True, reason)   # SHOULD-EXCLUDE: not enabled
         # -- LOGICAL-AND: All parts are True
-        return False    # SHOULD-EXCLUDE: not enabled = not True
+        return (False, None)    # SHOULD-EXCLUDE: not enabled = not True
+
+    def select_tag_groups(self, tags):
+        """Provides the active-tag groups of the tags (cached per tags).
+
+        :param tags: Tags (as tuple of strings).
+        :return: List of (category, category_tag_pairs) tuples.
+        """
+        tag_groups = self._tag_groups.get(tags)
+        if tag_groups is None:
+            if len(self._tag_groups) >= self.cache_maxsize:
+                self._tag_groups.clear()
+            tag_groups = list(self.group_active_tags_by_category(tags))
+            self._tag_groups[tags] = tag_groups
+        return tag_groups
 
     def select_active_tags(self, tags):
         """Select all active tags that match the tag schema pattern.
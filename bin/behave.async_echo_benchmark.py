@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark for concurrent async scenarios (--async-scenarios=K).
+
+Starts a local TCP echo server (that answers each request after a delay,
+like a slow instrument) in the before_all() hook. Each scenario connects
+to the echo server and awaits the answers of some requests.
+The scenarios are run with K = 1, 2, 4, ... concurrent scenarios and
+the throughput (scenarios per second) is reported for each K.
+
+USAGE:
+    python bin/behave.async_echo_benchmark.py [--scenarios=N] [--requests=N]
+                                              [--delay=SECONDS] [--max-k=K]
+
+REQUIRES: Python >= 3.7
+LICENSE:  BSD
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import asyncio
+import sys
+import time
+from behave.configuration import Configuration
+from behave.parser import parse_feature
+from behave.runner import ModelRunner
+from behave.step_registry import StepRegistry
+
+
+# ----------------------------------------------------------------------------
+# ECHO SERVER AND STEPS:
+# ----------------------------------------------------------------------------
+def make_feature_text(scenarios, requests):
+    lines = [u"Feature: Echo benchmark"]
+    for index in range(scenarios):
+        lines.extend([
+            u"",
+            u"  Scenario: Echo %d" % index,
+            u"    Given I connect to the echo server",
+            u"    When I send %d requests" % requests,
+            u"    Then I receive %d answers" % requests,
+        ])
+    return u"\n".join(lines) + u"\n"
+
+
+async def before_all(context):
+    delay = context.config.userdata.getfloat("delay")
+
+    async def handle_echo(reader, writer):
+        while True:
+            data = await reader.readline()
+            if not data:
+                break
+            await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    context.echo_server = await asyncio.start_server(handle_echo,
+                                                     "127.0.0.1", 0)
+    context.echo_address = context.echo_server.sockets[0].getsockname()[:2]
+
+
+async def after_all(context):
+    context.echo_server.close()
+    await context.echo_server.wait_closed()
+
+
+async def step_connect(context):
+    context.connection = await asyncio.open_connection(*context.echo_address)
+    context.add_cleanup(context.connection[1].close)
+
+
+async def step_send_requests(context, count):
+    reader, writer = context.connection
+    context.answers = []
+    for index in range(count):
+        writer.write(b"request %d\n" % index)
+        await writer.drain()
+        context.answers.append(await reader.readline())
+
+
+def step_receive_answers(context, count):
+    assert len(context.answers) == count, "ANSWERS: %r" % context.answers
+
+
+def make_runner(text, concurrency, delay):
+    config = Configuration(["--async-scenarios=%d" % concurrency,
+                            "-D", "delay=%f" % delay,
+                            "--format=null", "--no-summary"],
+                           load_config=False)
+    step_registry = StepRegistry()
+    step_registry.add_step_definition("given",
+                                      "I connect to the echo server",
+                                      step_connect)
+    step_registry.add_step_definition("when", "I send {count:d} requests",
+                                      step_send_requests)
+    step_registry.add_step_definition("then", "I receive {count:d} answers",
+                                      step_receive_answers)
+    features = [parse_feature(text, filename="features/echo.feature")]
+    runner = ModelRunner(config, features, step_registry=step_registry)
+    runner.hooks["before_all"] = before_all
+    runner.hooks["after_all"] = after_all
+    return runner
+
+
+def measure_throughput(text, scenarios, concurrency, delay):
+    runner = make_runner(text, concurrency, delay)
+    start_time = time.time()
+    failed = runner.run_model()
+    duration = time.time() - start_time
+    if failed:
+        raise RuntimeError("FAILED: With --async-scenarios=%d" % concurrency)
+    return scenarios / duration, duration
+
+
+# ----------------------------------------------------------------------------
+# MAIN FUNCTION:
+# ----------------------------------------------------------------------------
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    parser = argparse.ArgumentParser(prog="behave.async_echo_benchmark",
+                                     description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=64,
+                        help="Number of scenarios (default: %(default)s).")
+    parser.add_argument("--requests", type=int, default=5,
+                        help="Number of requests per scenario "
+                             "(default: %(default)s).")
+    parser.add_argument("--delay", type=float, default=0.01,
+                        help="Delay of each answer in seconds "
+                             "(default: %(default)s).")
+    parser.add_argument("--max-k", type=int, default=32, dest="max_k",
+                        help="Largest number of concurrent scenarios "
+                             "(default: %(default)s).")
+    options = parser.parse_args(args)
+
+    text = make_feature_text(options.scenarios, options.requests)
+    print("K     duration  scenarios/s  speedup")
+    baseline = None
+    concurrency = 1
+    while concurrency <= options.max_k:
+        throughput, duration = measure_throughput(text, options.scenarios,
+                                                  concurrency, options.delay)
+        baseline = baseline or throughput
+        print("%-4d %8.2fs %12.1f %7.1fx" % (concurrency, duration, throughput,
+                                            throughput / baseline))
+        concurrency *= 2
+    return 0
+
+
+# ----------------------------------------------------------------------------
+# AUTO-MAIN:
+# ----------------------------------------------------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
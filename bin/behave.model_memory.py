@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Memory benchmark for the behave model: Reports the bytes per step.
+
+Generates a feature with a background and a scenario outline with many
+example rows, parses it and expands all scenarios. The memory that is
+allocated for the model is measured with :mod:`tracemalloc`.
+
+USAGE:
+    python bin/behave.model_memory.py [--rows=N] [--steps=N]
+
+REQUIRES: Python >= 3.4 (tracemalloc module)
+LICENSE:  BSD
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import gc
+import sys
+import tracemalloc
+from behave.parser import parse_feature
+
+
+# ----------------------------------------------------------------------------
+# FUNCTIONS:
+# ----------------------------------------------------------------------------
+def make_feature_text(rows, steps):
+    lines = [
+        u"Feature: Memory benchmark",
+        u"  Background:",
+        u"    Given a configured instrument",
+        u"",
+        u"  @sweep @channel.<channel>",
+        u"  Scenario Outline: Sweep <channel> at <freq>",
+    ]
+    for index in range(steps):
+        lines.append(u"    When I measure <freq> on <channel> (step %d)" % index)
+    lines.extend([u"", u"    Examples:", u"      | channel | freq |"])
+    for index in range(rows):
+        lines.append(u"      | CH%d     | %d |" % (index % 4 + 1, index))
+    return u"\n".join(lines) + u"\n"
+
+
+def build_model(text):
+    feature = parse_feature(text, filename="features/memory.feature")
+    scenarios = list(feature.walk_scenarios())
+    steps = [step for scenario in scenarios for step in scenario.all_steps]
+    return feature, scenarios, steps
+
+
+def measure_model(text):
+    gc.collect()
+    tracemalloc.start()
+    snapshot1 = tracemalloc.take_snapshot()
+    feature, scenarios, steps = build_model(text)
+    gc.collect()
+    snapshot2 = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = snapshot2.compare_to(snapshot1, "lineno")
+    allocated = sum(stat.size_diff for stat in statistics)
+    return feature, len(scenarios), len(steps), allocated
+
+
+# ----------------------------------------------------------------------------
+# MAIN FUNCTION:
+# ----------------------------------------------------------------------------
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    parser = argparse.ArgumentParser(prog="behave.model_memory",
+                                     description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000,
+                        help="Number of example rows (default: %(default)s).")
+    parser.add_argument("--steps", type=int, default=10,
+                        help="Number of steps per scenario "
+                             "(default: %(default)s).")
+    options = parser.parse_args(args)
+
+    text = make_feature_text(options.rows, options.steps)
+    _, scenarios, steps, allocated = measure_model(text)
+    print("scenarios:      %d" % scenarios)
+    print("steps:          %d (including background steps)" % steps)
+    print("model memory:   %.1f KiB" % (allocated / 1024.0))
+    print("bytes per step: %.1f" % (float(allocated) / steps))
+    return 0
+
+
+# ----------------------------------------------------------------------------
+# AUTO-MAIN:
+# ----------------------------------------------------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
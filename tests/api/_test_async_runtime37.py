@@ -0,0 +1,127 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.async_runtime` for Python 3.7 (or newer).
+"""
+
+# -- IMPORTS:
+from __future__ import absolute_import, print_function
+import asyncio
+import sys
+import time
+from behave.api.async_step import async_run_until_complete
+from behave.async_runtime import AsyncRuntime
+import pytest
+from .. import testing_support_runner
+from ..testing_support_runner import make_features
+
+
+# -----------------------------------------------------------------------------
+# TEST MARKERS:
+# -----------------------------------------------------------------------------
+py37_or_newer = pytest.mark.skipif(sys.version_info < (3, 7),
+                                   reason="Needs Python >= 3.7")
+
+# -----------------------------------------------------------------------------
+# SUPPORT:
+# -----------------------------------------------------------------------------
+FEATURE_TEXT = u"""
+Feature: Instrument stream
+  Scenario: Samples are read in the background
+    Given the instrument stream is started
+    When a blocking step is run
+    Then the stream provides at least 3 samples
+    And the stream provides at least 6 samples
+"""
+
+
+async def read_samples(samples):
+    while True:
+        samples.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.001)
+
+
+async def step_start_stream(context):
+    context.samples = []
+    context.async_runtime.loop.create_task(read_samples(context.samples))
+
+
+def step_blocking(context):
+    time.sleep(0.01)
+
+
+async def step_wait_for_samples(context, count):
+    while len(context.samples) < count:
+        await asyncio.sleep(0.001)
+
+
+@async_run_until_complete(timeout=1.0)
+async def decorated_step_wait_for_samples(context, count):
+    await step_wait_for_samples(context, count)
+
+
+def make_runner(tmpdir, args):
+    steps = [
+        ("given", "the instrument stream is started", step_start_stream),
+        ("when", "a blocking step is run", step_blocking),
+        ("then", "the stream provides at least 3 samples",
+         lambda context: step_wait_for_samples(context, 3)),
+        ("then", "the stream provides at least 6 samples",
+         lambda context: decorated_step_wait_for_samples(context, 6)),
+    ]
+    features = make_features(1, FEATURE_TEXT, filename="stream.feature")
+    return testing_support_runner.make_runner(tmpdir, args, features, steps)
+
+
+# -----------------------------------------------------------------------------
+# TESTSUITE:
+# -----------------------------------------------------------------------------
+@py37_or_newer
+class TestAsyncRuntime(object):
+
+    def test_run__with_timeout_raises_assertion_error(self):
+        async_runtime = AsyncRuntime()
+        async_runtime.start()
+        try:
+            assert async_runtime.run(asyncio.sleep(0, result=42)) == 42
+            with pytest.raises(AssertionError):
+                async_runtime.run(asyncio.sleep(1.0), timeout=0.01)
+        finally:
+            async_runtime.stop()
+
+    def test_stop__cancels_background_tasks(self):
+        async_runtime = AsyncRuntime()
+        async_runtime.start()
+        loop = async_runtime.loop
+        task = loop.create_task(asyncio.sleep(10))
+        async_runtime.run_pending()
+        async_runtime.stop()
+        assert task.cancelled()
+        assert loop.is_closed()
+        assert async_runtime.loop is None
+
+
+@py37_or_newer
+class TestAsyncRuntimeRun(object):
+
+    def test_run__background_tasks_keep_running_across_steps(self, tmpdir):
+        runner, outfile = make_runner(tmpdir, ["--async-runtime"])
+        hook_loops = []
+        samples = []
+
+        async def before_all(context):
+            hook_loops.append(asyncio.get_running_loop())
+
+        async def after_scenario(context, scenario):
+            hook_loops.append(asyncio.get_running_loop())
+            samples.extend(context.samples)
+
+        runner.hooks["before_all"] = before_all
+        runner.hooks["after_scenario"] = after_scenario
+        failed, output = testing_support_runner.run_model(runner, outfile)
+        assert failed is False, output
+        assert runner.features[0].status.name == "passed"
+        assert len(hook_loops) == 2
+        # -- SAME EVENT LOOP: In hooks and in the background task.
+        assert len(samples) >= 6
+        assert set(samples) == set(hook_loops[:1])
+        assert runner.async_runtime is None
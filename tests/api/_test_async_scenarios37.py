@@ -0,0 +1,277 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.async_scenarios` for Python 3.7 (or newer).
+"""
+
+# -- IMPORTS:
+from __future__ import absolute_import, print_function
+import asyncio
+import copy
+import logging
+import sys
+import threading
+import time
+import types
+from behave.api.async_step import (
+    async_run_until_complete, use_or_create_async_context
+)
+from behave import async_scenarios
+from behave.async_scenarios import AsyncScenarioRunner, ContextCaptureStream
+from behave.async_runtime import ThreadedAsyncRuntime
+from behave.parser import parse_feature
+import pytest
+from .. import testing_support_runner
+from ..testing_support_runner import make_features
+
+
+# -----------------------------------------------------------------------------
+# TEST MARKERS:
+# -----------------------------------------------------------------------------
+py37_or_newer = pytest.mark.skipif(sys.version_info < (3, 7),
+                                   reason="Needs Python >= 3.7")
+
+# -----------------------------------------------------------------------------
+# SUPPORT:
+# -----------------------------------------------------------------------------
+SCENARIO_TEXT = u"""
+  Scenario: S{index}
+    Given an async step waits for the instrument
+    When a decorated async step waits for the instrument
+    Then a step checks "S{index}"
+"""
+
+
+def make_feature_text(count, fail_index=None):
+    text = u"Feature: Instruments\n"
+    for index in range(count):
+        text += SCENARIO_TEXT.format(index=index)
+        if index == fail_index:
+            text += u'    And a step checks "fail"\n'
+    return text
+
+
+async def step_wait(context):
+    print("ASYNC: %s" % context.scenario.name)
+    logging.getLogger("instrument").warning("LOG: %s", context.scenario.name)
+    await asyncio.sleep(context.config.userdata.getfloat("delay"))
+
+
+@async_run_until_complete
+async def decorated_step_wait(context):
+    await asyncio.sleep(context.config.userdata.getfloat("delay"))
+
+
+def step_check(context, name):
+    print("CHECK: %s" % name)
+    context.threads.add(threading.current_thread().name)
+    assert name != "fail", "FAILED: %s" % context.scenario.name
+
+
+ASYNC_CONTEXT_SCENARIO_TEXT = u"""
+  Scenario: S{index}
+    When an async call is dispatched with "S{index}"
+    And a decorated async step uses the async context
+    Then the async calls provide "S{index}"
+"""
+
+
+def step_dispatch_async_call(context, name):
+    async_context = use_or_create_async_context(context, "async_context")
+    task = async_context.loop.create_task(asyncio.sleep(0.1, result=name))
+    async_context.tasks.append(task)
+
+
+@async_run_until_complete(async_context="async_context", timeout=1.0)
+async def decorated_step_use_async_context(context):
+    context.async_context.tasks.append(asyncio.ensure_future(
+        asyncio.sleep(0.05, result=context.scenario.name)))
+
+
+def step_collect_async_calls(context, name):
+    async_context = context.async_context
+    done, pending = async_context.loop.run_until_complete(
+        asyncio.wait(async_context.tasks, timeout=1.0))
+    assert not pending
+    assert sorted(task.result() for task in done) == [name, name]
+
+
+def make_runner(tmpdir, args, features_text):
+    steps = [
+        ("given", "an async step waits for the instrument", step_wait),
+        ("when", "a decorated async step waits for the instrument",
+         decorated_step_wait),
+        ("then", 'a step checks "{name}"', step_check),
+    ]
+    features = make_features(1, features_text, filename="f.feature")
+    return testing_support_runner.make_runner(
+        tmpdir, ["-D", "delay=0.2"] + args, features, steps)
+
+
+def run_model(tmpdir, args, features_text):
+    calls = []
+
+    def before_all(context):
+        calls.append("before_all")
+        context.threads = set()
+
+    async def after_all(context):
+        await asyncio.sleep(0)
+        calls.append("after_all")
+        calls.extend(sorted(context.threads))
+
+    runner, outfile = make_runner(tmpdir, args, features_text)
+    runner.hooks["before_all"] = before_all
+    runner.hooks["after_all"] = after_all
+    start_time = time.time()
+    failed, output = testing_support_runner.run_model(runner, outfile)
+    duration = time.time() - start_time
+    return failed, output, duration, runner, calls
+
+
+# -----------------------------------------------------------------------------
+# TESTSUITE:
+# -----------------------------------------------------------------------------
+@py37_or_newer
+class TestThreadedAsyncRuntime(object):
+
+    def test_run__awaits_coroutine_on_event_loop_thread(self):
+        async_runtime = ThreadedAsyncRuntime()
+        async_runtime.start()
+
+        async def select_thread_name():
+            return threading.current_thread().name
+        try:
+            assert async_runtime.run(select_thread_name()) == \
+                   "behave-event-loop"
+            with pytest.raises(AssertionError):
+                async_runtime.run(asyncio.sleep(1.0), timeout=0.01)
+        finally:
+            async_runtime.stop()
+
+    def test_stop__cancels_background_tasks(self):
+        async_runtime = ThreadedAsyncRuntime()
+        async_runtime.start()
+        loop = async_runtime.loop
+        task = asyncio.run_coroutine_threadsafe(asyncio.sleep(10), loop)
+        async_runtime.stop()
+        assert task.cancelled()
+        assert loop.is_closed()
+        assert async_runtime.loop is None
+
+
+@py37_or_newer
+class TestAsyncScenarioRunner(object):
+
+    def test_run__scenarios_run_concurrently(self, tmpdir):
+        text = make_feature_text(8)
+        serial_dir = tmpdir.mkdir("serial")
+        failed1, output1, _, _, _ = run_model(serial_dir, ["--async-runtime"],
+                                              text)
+        failed2, output2, duration, runner, calls = run_model(
+            tmpdir, ["--async-scenarios=4"], text)
+
+        assert failed1 is False
+        assert failed2 is False
+        assert output2 == output1
+        # -- SERIAL DURATION: 8 scenarios * 2 async steps * 0.2s = 3.2s
+        assert duration < 1.6
+        assert runner.features[0].status.name == "passed"
+        # -- HOOKS: Run once, scenario threads share the root attributes.
+        assert calls[:2] == ["before_all", "after_all"]
+        assert len(calls[2:]) == 4
+        assert runner.async_runtime is None
+
+    def test_run__captures_output_per_scenario(self, tmpdir):
+        text = make_feature_text(6, fail_index=2)
+        failed, output, _, runner, _ = run_model(
+            tmpdir, ["--async-scenarios=3"], text)
+
+        assert failed is True
+        assert output.count(u"Captured stdout:") == 1
+        assert u"ASYNC: S2\nCHECK: S2\nCHECK: fail\n" in output
+        assert u"WARNING:instrument:LOG: S2\n" in output
+        for index in (0, 1, 3, 4, 5):
+            assert u"ASYNC: S%d" % index not in output
+            assert u"LOG: S%d" % index not in output
+        scenarios = runner.features[0].scenarios
+        assert [scenario.status.name for scenario in scenarios] == \
+               ["passed", "passed", "failed", "passed", "passed", "passed"]
+
+    def test_run__copies_only_feature_of_work_unit(self, tmpdir, monkeypatch):
+        copied = []
+
+        def deepcopy(value):
+            copied.append(value.name)
+            return copy.deepcopy(value)
+
+        monkeypatch.setattr(async_scenarios, "copy",
+                            types.SimpleNamespace(copy=copy.copy,
+                                                  deepcopy=deepcopy))
+        runner, _ = make_runner(tmpdir, ["--async-scenarios=4",
+                                         "--parallel-unit=feature",
+                                         "-D", "delay=0.01"],
+                                make_feature_text(2))
+        runner.features[:] = [parse_feature(make_feature_text(2).replace(
+                                  u"Instruments", u"F%d" % index),
+                                            filename="f%d.feature" % index)
+                              for index in range(6)]
+        runner.hooks["before_all"] = lambda context: setattr(context,
+                                                             "threads", set())
+        failed = runner.run_model()
+
+        assert failed is False
+        # -- ONE COPY PER WORK UNIT: Instead of all features per thread.
+        assert sorted(copied) == [u"F%d" % index for index in range(6)]
+
+    def test_run__restores_streams(self, tmpdir, monkeypatch):
+        streams = (sys.stdout, sys.stderr)
+        stream_types = set()
+
+        def step_check_streams(context, name):
+            stream_types.add(type(sys.stdout))
+            context.threads.add(threading.current_thread().name)
+
+        _, _, _, _, _ = run_model(tmpdir, ["--async-scenarios=2"],
+                                  make_feature_text(2))
+        assert (sys.stdout, sys.stderr) == streams
+
+        runner, _ = make_runner(tmpdir, ["--async-scenarios=2",
+                                         "--no-capture", "--no-capture-stderr"],
+                                make_feature_text(2))
+        runner.step_registry.steps["then"][0].func = step_check_streams
+        runner.hooks["before_all"] = lambda context: setattr(context,
+                                                             "threads", set())
+        assert runner.run_model() is False
+        assert ContextCaptureStream not in stream_types
+        assert (sys.stdout, sys.stderr) == streams
+
+        def start_worker(self, worker_id):
+            raise RuntimeError("OOPS: start_worker")
+
+        monkeypatch.setattr(AsyncScenarioRunner, "start_worker", start_worker)
+        runner, _ = make_runner(tmpdir, ["--async-scenarios=2"],
+                                make_feature_text(2))
+        with pytest.raises(RuntimeError):
+            runner.run_model()
+        assert (sys.stdout, sys.stderr) == streams
+
+    def test_run__with_async_context_uses_shared_event_loop(self, tmpdir):
+        text = u"Feature: Async contexts\n"
+        text += u"".join(ASYNC_CONTEXT_SCENARIO_TEXT.format(index=index)
+                         for index in range(4))
+        steps = [
+            ("when", 'an async call is dispatched with "{name}"',
+             step_dispatch_async_call),
+            ("when", "a decorated async step uses the async context",
+             decorated_step_use_async_context),
+            ("then", 'the async calls provide "{name}"',
+             step_collect_async_calls),
+        ]
+        runner, outfile = testing_support_runner.make_runner(
+            tmpdir, ["--async-scenarios=2"], make_features(1, text), steps)
+        failed, output = testing_support_runner.run_model(runner, outfile)
+
+        assert failed is False, output
+        assert [scenario.status.name
+                for scenario in runner.features[0].scenarios] == \
+               ["passed"] * 4
@@ -0,0 +1,18 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit test facade to protect pytest runner from Python 3.7 grammar changes.
+
+.. note::
+
+    Import/inject python-version specific test suites here
+    to avoid python-grammar problems in python versions that do not support it.
+"""
+
+from __future__ import absolute_import
+import sys
+
+_python_version = sys.version_info[:2]
+if _python_version >= (3, 7):
+    # -- PROTECTED-IMPORT:
+    # Older Python version have problems with grammer extensions (async/await).
+    from ._test_async_runtime37 import *
@@ -0,0 +1,119 @@
+# -*- coding: UTF-8 -*-
+"""
+Test support functionality to run parsed features with a model runner
+(without feature files and step modules).
+"""
+
+from __future__ import absolute_import
+import io
+from behave.configuration import Configuration
+from behave.formatter._registry import make_formatters
+from behave.parser import parse_feature
+from behave.runner import ModelRunner
+from behave.step_registry import StepRegistry
+
+
+# -----------------------------------------------------------------------------
+# TEST SUPPORT:
+# -----------------------------------------------------------------------------
+FEATURE_TEXT = u"""
+Feature: F{index}
+  Background:
+    Given a background step
+
+  Scenario Outline: S <x>
+    Given a step with "<x>"
+
+    Examples:
+      | x   |
+      | 1   |
+      | {x} |
+
+  Scenario: plain
+    Given a step with "plain"
+"""
+
+
+FEATURE_WITH_RULES_TEXT = u"""
+Feature: R{index}
+  Background:
+    Given a background step
+
+  Scenario: S1
+    Given a step with "S1"
+
+  Rule: R1
+    Scenario Outline: R1.S <x>
+      Given a step with "<x>"
+
+      Examples:
+        | x    |
+        | R1.1 |
+        | {x}  |
+
+  Rule: R2
+    Background: R2.Background
+      Given a step with "R2.background"
+
+    @serial
+    Scenario: R2.S1
+      Given a step with "R2.S1"
+
+    Scenario: R2.S2
+      Given a step with "R2.S2"
+"""
+
+
+def make_features(count=4, feature_text=FEATURE_TEXT,
+                  filename="f{index}.feature", fail_index=None,
+                  undefined_index=None):
+    """Parses the feature text COUNT times (with the placeholders:
+    ``{index}`` and ``{x}``, that is "fail" for the feature at fail_index).
+    The feature at undefined_index gets an undefined step.
+    """
+    features = []
+    for index in range(count):
+        x = "2"
+        if index == fail_index:
+            x = "fail"
+        text = feature_text.format(index=index, x=x)
+        if index == undefined_index:
+            text += u"    And an undefined step\n"
+        features.append(parse_feature(text,
+                                      filename=filename.format(index=index)))
+    return features
+
+
+def make_runner(tmpdir, args, features=None, steps=(), formatter="plain"):
+    """Creates a model runner for the features.
+
+    :param tmpdir:      Directory for the formatter output.
+    :param args:        Command-line args.
+    :param features:    Features to run (as list).
+    :param steps:       Step definitions (as tuples: step_type, pattern, func).
+    :param formatter:   Formatter (or None, if args select the formatters).
+    :return: Tuple (runner, outfile) with the formatter output file.
+    """
+    outfile = None
+    if formatter:
+        outfile = str(tmpdir.join("output.txt"))
+        args = args + ["-f", formatter, "-o", outfile, "-T",
+                       "--no-summary", "--no-color"]
+    config = Configuration(args, load_config=False)
+    step_registry = StepRegistry()
+    for step_type, pattern, func in steps:
+        step_registry.add_step_definition(step_type, pattern, func)
+    runner = ModelRunner(config, features, step_registry=step_registry)
+    runner.formatters = make_formatters(config, config.outputs)
+    return runner, outfile
+
+
+def run_model(runner, outfile):
+    """Runs the model runner.
+
+    :return: Tuple (failed, output) with the formatter output.
+    """
+    failed = runner.run_model()
+    with io.open(outfile, encoding="utf-8") as f:
+        output = f.read()
+    return failed, output
@@ -48,3 +48,23 @@ def test_select_tag_expression_parser__with_v1(text):
 def test_select_tag_expression_parser__with_v2(text):
     parser = select_tag_expression_parser(text)
     assert parser is parse_tag_expression_v2, "tag_expression: %s" % text
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE FOR: TagExpression.check() with cached verdicts
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("text", [
+    "@foo -@bar",
+    "@foo and not @bar",
+])
+def test_check__caches_verdict_per_tag_set(text):
+    tag_expression = make_tag_expression(text)
+    assert tag_expression.check(["foo"]) is True
+    assert tag_expression.check(["foo", "bar"]) is False
+    # pylint: disable=protected-access
+    assert len(tag_expression._verdicts) == 2
+
+    # -- SAME TAG SET: Uses cached verdict (without evaluation).
+    assert tag_expression.check(("foo",)) is True
+    assert tag_expression.check(["bar", "foo"]) is False
+    assert len(tag_expression._verdicts) == 2
@@ -0,0 +1,104 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.tag_expression.compiler` module.
+"""
+
+from __future__ import absolute_import
+import itertools
+from behave.tag_expression import (
+    make_tag_expression, parse_tag_expression_v1, parse_tag_expression_v2
+)
+from behave.tag_expression.compiler import (
+    CompiledTagExpression, compile_tag_expression
+)
+from behave.tag_expression.model import Expression
+import pytest
+
+
+TAGS = ["a", "b", "c", "foo.x"]
+TAG_SETS = [frozenset(tags) for size in range(len(TAGS) + 1)
+            for tags in itertools.combinations(TAGS, size)]
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestCompiledTagExpression(object):
+
+    @pytest.mark.parametrize("text", [
+        "a",
+        "not a",
+        "a and b",
+        "a or b",
+        "a and b and c",
+        "(a or b) and not c",
+        "not (a and b) or c",
+        "a or (b and (c or not a))",
+        "foo.*",
+        "foo.* and not a",
+        "*.x or b",
+        "",
+    ])
+    def test_evaluate__with_v2_is_same_as_interpreted(self, text):
+        expression = parse_tag_expression_v2(text)
+        compiled = CompiledTagExpression(expression)
+        for tags in TAG_SETS:
+            expected = bool(expression.evaluate(tags))
+            assert compiled(tags) is expected, "%s: %r" % (text, sorted(tags))
+
+    @pytest.mark.parametrize("text", [
+        "a",
+        "-a",
+        "a,b",
+        "a,-b",
+        "-a,-b",
+        "a b",
+        "a,b -c",
+        "a:2 -b",
+    ])
+    def test_evaluate__with_v1_is_same_as_interpreted(self, text):
+        expression = parse_tag_expression_v1(text)
+        compiled = CompiledTagExpression(expression)
+        for tags in TAG_SETS:
+            # pylint: disable=protected-access
+            expected = expression._interpret(tags)
+            assert compiled(tags) is expected, "%s: %r" % (text, sorted(tags))
+
+    def test_compile__interns_each_tag_once(self):
+        expression = parse_tag_expression_v2("(a and b) or (a and not b)")
+        compiled = CompiledTagExpression(expression)
+        assert compiled.literal_bits == {"a": 1, "b": 2}
+
+    def test_compile__with_flat_operation_uses_single_bitmask_test(self):
+        compiled = CompiledTagExpression(parse_tag_expression_v2("a and b and c"))
+        assert compiled.source == "((mask & 7) == 7)"
+        compiled = CompiledTagExpression(parse_tag_expression_v2("a or b or c"))
+        assert compiled.source == "(mask & 7)"
+
+    def test_make_tag_mask__matches_wildcards_once_per_tag(self):
+        compiled = CompiledTagExpression(parse_tag_expression_v2("foo.* or a"))
+        assert compiled(["foo.bar"]) is True
+        # pylint: disable=protected-access
+        compiled._tag_masks["foo.bar"] = 0
+        assert compiled(["foo.bar"]) is False
+
+    def test_compile_tag_expression__with_unknown_expression_uses_evaluate(self):
+        class UserExpression(Expression):
+            def evaluate(self, values):
+                return "magic" in values
+
+        expression = UserExpression()
+        evaluate = compile_tag_expression(expression)
+        assert evaluate(["magic"]) is True
+        assert expression.check(["other"]) is False
+
+
+class TestMakeTagExpression(object):
+
+    def test_make_tag_expression__reuses_parsed_expression(self):
+        expression1 = make_tag_expression("@compiled and not @cached")
+        expression2 = make_tag_expression("@compiled and not @cached")
+        expression3 = make_tag_expression(["@compiled", "-@cached"])
+        assert expression1 is expression2
+        assert expression3 is make_tag_expression(("@compiled", "-@cached"))
+        assert expression3 is not expression1
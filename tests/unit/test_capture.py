@@ -4,8 +4,11 @@ Unittests for :mod:`behave.capture` module.
 """
 
 from __future__ import absolute_import, print_function
+import logging
+import os
 import sys
-from behave.capture import Captured, CaptureController
+from behave.capture import \
+    Captured, CaptureController, BoundedCaptureStream, CapturedTextFile
 from mock import Mock
 import pytest
 
@@ -191,6 +194,98 @@ zzz"""
         assert captured3.make_report() == expected
 
 
+    @pytest.mark.parametrize("stdout, stderr, log_output", [
+        (u"xxx\n\n", u"yyy  \n", u"zzz\n"),
+        (u"  \n", u"yyy", u""),
+        (u"", u"", u"zzz \n \n"),
+    ])
+    def test_make_report__with_spilled_output_is_same_as_with_text(self,
+                                        stdout, stderr, log_output):
+        def make_spilled_text(text):
+            stream = BoundedCaptureStream(1, overflow="spill")
+            stream.write(text)
+            return stream.snapshot()
+
+        captured1 = Captured(stdout, stderr, log_output)
+        captured2 = Captured(make_spilled_text(stdout),
+                             make_spilled_text(stderr),
+                             make_spilled_text(log_output))
+        assert captured2.make_report() == captured1.make_report()
+        assert captured2.output == captured1.output
+
+
+class TestBoundedCaptureStream(object):
+
+    def test_write__below_limit_keeps_output_in_memory(self):
+        stream = BoundedCaptureStream(10)
+        stream.write(u"Hello")
+        stream.write(u"Alice")
+        assert not stream.spilled
+        assert stream.getvalue() == u"HelloAlice"
+        assert stream.snapshot() == u"HelloAlice"
+
+    def test_write__with_spill_mode_keeps_complete_output(self):
+        stream = BoundedCaptureStream(10, overflow="spill")
+        stream.write(u"Hello Alice\n")
+        stream.write(u"Hello Bob \u20ac\n")
+        assert stream.spilled
+        assert stream.getvalue() == u"Hello Alice\nHello Bob \u20ac\n"
+        snapshot = stream.snapshot()
+        assert isinstance(snapshot, CapturedTextFile)
+        assert u"%s" % snapshot == stream.getvalue()
+
+    def test_write__with_head_tail_mode_keeps_head_and_tail(self):
+        stream = BoundedCaptureStream(10, overflow="head_tail")
+        for index in range(10):
+            stream.write(u"%d" % index * 3)
+        assert stream.size == 30
+        assert stream.omitted_size == 20
+        assert stream.getvalue() == \
+            u"00011\n... [20 characters omitted] ...\n88999"
+
+    def test_reset__keeps_snapshot_of_spilled_output(self):
+        stream = BoundedCaptureStream(4, overflow="spill")
+        stream.write(u"Hello Alice")
+        snapshot = stream.snapshot()
+        stream.write(u" and Bob")
+        stream.reset()
+        stream.write(u"Charly")
+        assert snapshot.getvalue() == u"Hello Alice"
+        assert stream.getvalue() == u"Charly"
+
+    @pytest.mark.skipif(not os.path.isdir("/proc/self/fd"),
+                        reason="REQUIRES: /proc/self/fd")
+    def test_reset__releases_file_descriptors_of_spilled_output(self):
+        fd_count = len(os.listdir("/proc/self/fd"))
+        stream = BoundedCaptureStream(4, overflow="spill")
+        snapshots = []
+        for index in range(50):
+            stream.write(u"Hello Alice %d" % index)
+            snapshots.append(stream.snapshot())
+            stream.reset()
+        assert len(os.listdir("/proc/self/fd")) == fd_count
+        assert snapshots[7].getvalue() == u"Hello Alice 7"
+        assert len(os.listdir("/proc/self/fd")) == fd_count
+
+        # -- LAST VIEW IS DROPPED: Spill file is removed.
+        path = snapshots[0].spill_file.path
+        assert os.path.exists(path)
+        del snapshots[:]
+        assert not os.path.exists(path)
+
+    def test_capture_controller__with_capture_limit(self):
+        capture_controller = create_capture_controller()
+        capture_controller.config.capture_limit = 8
+        capture_controller.config.capture_overflow = "head_tail"
+        capture_controller.config.log_capture = False
+        setup_capture_controller(capture_controller)
+        capture_controller.start_capture()
+        sys.stdout.write("Hello Alice and Bob")
+        capture_controller.stop_capture()
+        assert capture_controller.captured.stdout == \
+            u"Hell\n... [11 characters omitted] ...\n Bob"
+
+
 class Theory4ActiveCaptureController(object):
     @staticmethod
     def check_invariants(controller):
@@ -280,3 +375,90 @@ HELLO
 Captured stderr:
 Alice"""
         assert report == expected
+
+    def test_setup_capture__reuses_truncated_capture_sinks(self):
+        capture_controller = create_capture_controller()
+        capture_controller.config.logging_level = logging.INFO
+        setup_capture_controller(capture_controller)
+        stdout_capture = capture_controller.stdout_capture
+        log_capture = capture_controller.log_capture
+        capture_controller.start_capture()
+        print("HELLO")
+        logging.getLogger("test").warning("Alice")
+        capture_controller.stop_capture()
+        assert capture_controller.captured.stdout == "HELLO\n"
+
+        # -- NEXT SCENARIO: Same sinks without previous captured output.
+        setup_capture_controller(capture_controller)
+        assert capture_controller.stdout_capture is stdout_capture
+        assert capture_controller.log_capture is log_capture
+        assert not capture_controller.captured
+        assert log_capture.installed
+        capture_controller.teardown_capture()
+        assert not log_capture.installed
+
+    def test_setup_capture__reinstalls_removed_logging_handler(self):
+        capture_controller = create_capture_controller()
+        capture_controller.config.logging_level = logging.INFO
+        setup_capture_controller(capture_controller)
+        log_capture = capture_controller.log_capture
+        logging.getLogger().removeHandler(log_capture)
+        assert not log_capture.installed
+
+        setup_capture_controller(capture_controller)
+        assert log_capture.installed
+        logging.getLogger("test").warning("Bob")
+        assert capture_controller.captured.log_output == "WARNING:test:Bob"
+        capture_controller.teardown_capture()
+
+
+class TestCaptureInTestRun(object):
+    FEATURE_TEXT = u"""
+Feature: F{index}
+  Scenario: S{index}
+    Given a logging step
+"""
+
+    def test_feature_hook_logging_reaches_original_handlers(self):
+        from behave.configuration import Configuration
+        from behave.parser import parse_feature
+        from behave.runner import ModelRunner
+        from behave.step_registry import StepRegistry
+
+        class RecordingHandler(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.messages = []
+
+            def emit(self, record):
+                self.messages.append(record.getMessage())
+
+        def log_hook(name):
+            def hook(context, entity):
+                root_levels.append(logging.getLogger().level)
+                logging.getLogger("hook").warning("%s %s", name, entity.name)
+            return hook
+
+        config = Configuration(["--logging-clear-handlers", "-f", "null",
+                                "--no-summary"], load_config=False)
+        step_registry = StepRegistry()
+        step_registry.add_step_definition("given", "a logging step",
+            lambda context: logging.getLogger("step").warning("STEP"))
+        features = [parse_feature(self.FEATURE_TEXT.format(index=index))
+                    for index in range(2)]
+        runner = ModelRunner(config, features, step_registry=step_registry)
+        for name in ("before_feature", "after_feature"):
+            runner.hooks[name] = log_hook(name)
+        root_levels = []
+        root_logger = logging.getLogger()
+        handler = RecordingHandler()
+        root_logger.addHandler(handler)
+        try:
+            assert runner.run_model() is False
+        finally:
+            root_logger.removeHandler(handler)
+
+        assert handler.messages == [
+            "before_feature F0", "after_feature F0",
+            "before_feature F1", "after_feature F1"]
+        assert set(root_levels) == set([root_logger.level])
@@ -0,0 +1,213 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.distributed` module.
+"""
+
+from __future__ import absolute_import
+import io
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from behave.distributed import (
+    Connection, SharedQueueScheduler, make_features_signature, parse_address,
+    select_authkey
+)
+from behave.exception import ConfigError
+from behave.parallel import WorkUnit
+import pytest
+from ..testing_support_runner import FEATURE_WITH_RULES_TEXT, make_features
+from .test_parallel import make_runner, requires_fork
+
+
+def select_free_port():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("localhost", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    return port
+
+
+def step_crash_once(context):
+    crash_file = context.config.userdata["crash_file"]
+    if not os.path.exists(crash_file):
+        with open(crash_file, "w") as f:
+            f.write("CRASHED: %d\n" % os.getpid())
+        os._exit(1)     # -- WORKER DIES: Without sending any results.
+
+
+def make_crash_runner(tmpdir, args, features):
+    runner, outfile = make_runner(tmpdir, args, features)
+    runner.step_registry.add_step_definition("given", "a crashing step",
+                                             step_crash_once)
+    return runner, outfile
+
+
+def run_worker(tmpdir, port, args, features_text):
+    runner, _ = make_crash_runner(tmpdir, ["--worker=localhost:%d" % port] +
+                                  args,
+                                  make_features(count=3,
+                                                feature_text=features_text))
+    os._exit(int(runner.run_model()))
+
+
+def start_workers(tmpdir, port, args, features_text, count=2):
+    context = multiprocessing.get_context("fork")
+    processes = []
+    for index in range(count):
+        worker_dir = tmpdir.mkdir("worker%d" % index)
+        process = context.Process(target=run_worker,
+                                  args=(worker_dir, port, args, features_text))
+        process.start()
+        processes.append(process)
+    return processes
+
+
+class WriteFileOnUnpickle(object):
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __reduce__(self):
+        return (io.open, (self.filename, "w"))
+
+
+def make_connections():
+    socket1, socket2 = socket.socketpair()
+    return Connection(socket1), Connection(socket2)
+
+
+def run_model(tmpdir, args, features_text, workers=0):
+    port = select_free_port()
+    processes = start_workers(tmpdir, port, args, features_text, workers)
+    if workers:
+        args = args + ["--coordinator=localhost:%d" % port]
+    features = make_features(count=3, feature_text=features_text)
+    runner, outfile = make_crash_runner(tmpdir, args, features)
+    failed = runner.run_model()
+    for process in processes:
+        process.join(10)
+    with io.open(outfile, encoding="utf-8") as f:
+        output = f.read()
+    return failed, output, features
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestParseAddress(object):
+
+    def test_parse_address__with_port_uses_localhost(self):
+        assert parse_address("7700") == ("127.0.0.1", 7700)
+        assert parse_address("0.0.0.0:7700") == ("0.0.0.0", 7700)
+
+    def test_parse_address__with_invalid_port_raises_error(self):
+        with pytest.raises(ConfigError):
+            parse_address("localhost:http")
+
+
+class TestAuthentication(object):
+
+    def test_select_authkey__uses_environment_variable(self):
+        assert select_authkey({"BEHAVE_AUTHKEY": u"secret"}) == b"secret"
+        with pytest.raises(ConfigError):
+            select_authkey({})
+
+    def test_authenticate__with_same_authkey_allows_messages(self):
+        coordinator, worker = make_connections()
+        thread = threading.Thread(target=worker.authenticate,
+                                  args=(b"secret",))
+        thread.start()
+        coordinator.authenticate(b"secret", coordinator=True)
+        thread.join()
+        worker.send(("ready", 0, None, None))
+        assert coordinator.receive() == ("ready", 0, None, None)
+
+    def test_authenticate__with_pickled_message_never_unpickles_it(self,
+                                                                   tmpdir):
+        filename = str(tmpdir.join("attack.txt"))
+        coordinator, attacker = make_connections()
+        attacker.send(WriteFileOnUnpickle(filename))
+        with pytest.raises(AuthenticationError):
+            coordinator.authenticate(b"secret", coordinator=True)
+        assert not os.path.exists(filename)
+        pickle.loads(pickle.dumps(WriteFileOnUnpickle(filename)))
+        assert os.path.exists(filename)
+
+    def test_authenticate__with_other_authkey_fails(self):
+        coordinator, worker = make_connections()
+        errors = []
+
+        def authenticate_worker():
+            try:
+                worker.authenticate(b"other")
+            except AuthenticationError as e:
+                errors.append(e)
+        thread = threading.Thread(target=authenticate_worker)
+        thread.start()
+        with pytest.raises(AuthenticationError):
+            coordinator.authenticate(b"secret", coordinator=True)
+        thread.join()
+        assert errors
+
+
+class TestSharedQueueScheduler(object):
+
+    def test_next_work_unit__runs_pinned_work_units_one_after_another(self):
+        scheduler = SharedQueueScheduler()
+        scheduler.add_work_units([WorkUnit(index, index, None, pinned, None)
+                                  for index, pinned in enumerate([True, True,
+                                                                  False])])
+        assert scheduler.next_work_unit(3).unit_id == 0
+        assert scheduler.next_work_unit(7).unit_id == 2
+        assert scheduler.next_work_unit(7) is None
+        assert scheduler.has_work_units(7)
+
+        scheduler.release_work_unit(0)
+        assert scheduler.next_work_unit(7).unit_id == 1
+
+    def test_requeue_work_unit__provides_work_unit_again(self):
+        scheduler = SharedQueueScheduler()
+        scheduler.add_work_units([WorkUnit(index, index, None, True, None)
+                                  for index in range(2)])
+        work_unit = scheduler.next_work_unit(1)
+        scheduler.requeue_work_unit(work_unit)
+        assert scheduler.next_work_unit(2).unit_id == work_unit.unit_id
+
+
+@requires_fork
+class TestDistributedRun(object):
+
+    @pytest.fixture(autouse=True)
+    def authkey(self, monkeypatch):
+        monkeypatch.setenv("BEHAVE_AUTHKEY", "secret")
+
+    def test_run__output_is_same_as_serial_run(self, tmpdir):
+        args = ["--parallel-unit=scenario"]
+        serial_dir = tmpdir.mkdir("serial")
+        failed1, output1, _ = run_model(serial_dir, args,
+                                        FEATURE_WITH_RULES_TEXT)
+        failed2, output2, features = run_model(tmpdir, args,
+                                               FEATURE_WITH_RULES_TEXT,
+                                               workers=2)
+        assert failed1 is False
+        assert failed2 is False
+        assert output2 == output1
+        assert u"R2.S2" in output2
+        assert make_features_signature(features) == \
+               make_features_signature(make_features(
+                   count=3, feature_text=FEATURE_WITH_RULES_TEXT))
+
+    def test_run__requeues_work_unit_of_disconnected_worker(self, tmpdir):
+        crash_file = str(tmpdir.join("crash.txt"))
+        text = FEATURE_WITH_RULES_TEXT.replace(
+            u'Given a step with "R2.S2"', u"Given a crashing step")
+        failed, output, features = run_model(tmpdir, [
+            "--parallel-unit=scenario", "-D", "crash_file=%s" % crash_file
+        ], text, workers=2)
+        assert os.path.exists(crash_file)
+        assert failed is False
+        assert output.count(u"Given a crashing step") == 3
+        assert all(scenario.status.name == "passed" for feature in features
+                   for scenario in feature.walk_scenarios())
@@ -1,6 +1,7 @@
 # -*- coding: UTF-8 -*-
 
 from __future__ import absolute_import
+import json
 import struct
 import sys
 import tempfile
@@ -11,7 +12,7 @@ from mock import Mock, patch
 from behave.formatter._registry import make_formatters
 from behave.formatter import pretty
 from behave.formatter.base import StreamOpener
-from behave.model import Tag, Feature, Scenario, Step
+from behave.model import Tag, Feature, Background, Scenario, Step
 from behave.model_core import Status
 from behave.matchers import Match
 
@@ -191,6 +192,30 @@ class TestPlain(FormatterTests):
 class TestJson(FormatterTests):
     formatter_name = "json"
 
+    def test_scenario_status_is_not_stored_in_next_background(self):
+        file_object = tempfile.TemporaryFile(mode="w+")
+        p = self._formatter(file_object, self.config)
+        step = self._step()
+        scenario = self._scenario(steps=[step])
+        background = Background("<string>", self.line, u"Background", u"")
+        f = self._feature(scenarios=[scenario])
+        p.feature(f)
+        p.scenario(scenario)
+        p.step(step)
+        p.match(self._match([]))
+        step.status = Status.passed
+        p.result(step)
+        p.background(background)
+        p.eof()
+        p.close()
+
+        file_object.seek(0)
+        elements = json.load(file_object)[0]["elements"]
+        assert [element["type"] for element in elements] == \
+               ["scenario", "background"]
+        assert elements[0]["status"] == "passed"
+        assert "status" not in elements[1]
+
 
 class TestTagsCount(FormatterTests):
     formatter_name = "tags"
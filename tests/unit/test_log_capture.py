@@ -1,6 +1,8 @@
 from __future__ import absolute_import, with_statement
+import logging
 import pytest
 from mock import patch
+from behave.capture import BoundedCaptureStream
 from behave.log_capture import LoggingCapture
 from six.moves import range
 
@@ -26,3 +28,120 @@ class TestLogCapture(object):
 
             calls = [args[0][0] for args in format.call_args_list]
             assert calls == fake_records
+
+    @staticmethod
+    def make_logging_capture():
+        class FakeConfig(object):
+            logging_filter = None
+            logging_format = None
+            logging_datefmt = None
+            logging_level = None
+
+        handler = LoggingCapture(FakeConfig())
+        logger = logging.getLogger("test.cached")
+        logger.setLevel(logging.INFO)
+        return handler, logger
+
+    def test_inveigle__with_clear_handlers_searches_only_new_loggers(self):
+        handler, _ = self.make_logging_capture()
+        handler.config.logging_clear_handlers = True
+        logger = logging.getLogger("test.cleared")
+        old_handler = logging.NullHandler()
+        logger.addHandler(old_handler)
+        try:
+            for _ in range(2):
+                handler.inveigle()
+                assert old_handler not in logger.handlers
+                handler.abandon()
+                assert old_handler in logger.handlers
+            cleared_loggers = handler.select_cleared_loggers()
+            assert logger in cleared_loggers
+            assert handler.select_cleared_loggers() is cleared_loggers
+
+            new_logger = logging.getLogger("test.cleared.new")
+            new_handler = logging.NullHandler()
+            new_logger.addHandler(new_handler)
+            handler.inveigle()
+            assert new_handler not in new_logger.handlers
+            handler.abandon()
+            assert new_handler in new_logger.handlers
+            new_logger.removeHandler(new_handler)
+        finally:
+            logger.removeHandler(old_handler)
+
+    def test_getvalue__formats_each_record_once(self):
+        handler, logger = self.make_logging_capture()
+        logger.addHandler(handler)
+        try:
+            with patch.object(handler.formatter, "format") as format:
+                format.side_effect = lambda record: record.getMessage()
+                logger.warning("Alice")
+                assert handler.getvalue() == "Alice"
+                logger.warning("Bob")
+                assert handler.getvalue() == "Alice\nBob"
+                assert handler.getvalue() == "Alice\nBob"
+                assert format.call_count == 2
+        finally:
+            logger.removeHandler(handler)
+
+        handler.truncate()
+        assert handler.getvalue() == ""
+
+    def test_select_records__uses_level_index(self):
+        handler, logger = self.make_logging_capture()
+        logger.addHandler(handler)
+        try:
+            logger.info("Alice")
+            assert not handler.any_errors()
+            logger.error("Bob")
+            logger.critical("Charly")
+        finally:
+            logger.removeHandler(handler)
+
+        assert handler.any_errors()
+        assert handler.count_records("INFO") == 1
+        assert [r.getMessage() for r in handler.select_records("ERROR")] \
+               == ["Bob"]
+        assert handler.select_records("DEBUG") == []
+
+    def test_find_event__searches_only_new_messages(self):
+        handler, logger = self.make_logging_capture()
+        logger.addHandler(handler)
+        try:
+            logger.info("Hello Alice")
+            assert handler.find_event("Alice")
+            assert not handler.find_event("Bob")
+            logger.info("Hello Bob")
+            with patch.object(handler.buffer[0], "getMessage") as get_message:
+                assert handler.find_event("Bob")
+                assert get_message.call_count == 0
+        finally:
+            logger.removeHandler(handler)
+
+    def test_sink__stores_formatted_records(self):
+        class FakeConfig(object):
+            logging_filter = None
+            logging_format = None
+            logging_datefmt = None
+            logging_level = None
+
+        handler = LoggingCapture(FakeConfig())
+        handler.sink = BoundedCaptureStream(10, overflow="spill")
+        logger = logging.getLogger("test.sink")
+        logger.addHandler(handler)
+        try:
+            logger.warning("Hello Alice")
+            assert not handler.any_errors()
+            logger.error("Hello Bob")
+        finally:
+            logger.removeHandler(handler)
+
+        assert handler.buffer == []
+        assert handler.getvalue() == \
+            "WARNING:test.sink:Hello Alice\nERROR:test.sink:Hello Bob"
+        assert handler.any_errors()
+        assert handler.find_event("Bob")
+        assert not handler.find_event("Charly")
+        handler.truncate()
+        assert not handler
+        assert not handler.any_errors()
@@ -0,0 +1,104 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.memory_usage` module.
+"""
+
+from __future__ import absolute_import
+import argparse
+from behave.configuration import Configuration, parse_size
+from behave.memory_usage import MemoryTracker, MemoryUsage, get_rss, tracemalloc
+from behave.parser import parse_feature
+from behave.reporter.memory import MemoryReporter, format_size
+import pytest
+
+
+requires_tracemalloc = pytest.mark.skipif(tracemalloc is None,
+                                          reason="REQUIRES: tracemalloc")
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestParseSize(object):
+
+    @pytest.mark.parametrize("text, expected", [
+        ("100", 100),
+        ("2k", 2048),
+        ("500M", 500 * 1024 ** 2),
+        (" 1 GB ", 1024 ** 3),
+    ])
+    def test_parse_size__with_valid_text(self, text, expected):
+        assert parse_size(text) == expected
+
+    @pytest.mark.parametrize("text", ["", "M", "1.5M", "-1", "10T"])
+    def test_parse_size__with_invalid_text_raises_error(self, text):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_size(text)
+
+
+class TestMemoryUsage(object):
+
+    def test_combine__adds_known_values(self):
+        memory_usage = MemoryUsage.combine([MemoryUsage(10, None), None,
+                                            MemoryUsage(5, None)])
+        assert memory_usage == MemoryUsage(15, None)
+
+    def test_combine__without_memory_usages_returns_none(self):
+        assert MemoryUsage.combine([None, None]) is None
+
+
+class TestMemoryTracker(object):
+
+    def test_get_rss__provides_size(self):
+        assert get_rss() > 0
+
+    @requires_tracemalloc
+    def test_finish_feature__provides_growth_of_leaked_memory(self):
+        leaked = []
+        memory_tracker = MemoryTracker(trace=True)
+        try:
+            memory_tracker.start_feature()
+            leaked.append(b"x" * (4 * 1024 * 1024))
+            memory_usage = memory_tracker.finish_feature()
+        finally:
+            memory_tracker.close()
+        assert memory_usage.traced >= 4 * 1024 * 1024
+        assert not tracemalloc.is_tracing()
+
+    def test_finish_feature__without_trace_provides_only_rss(self):
+        memory_tracker = MemoryTracker()
+        memory_tracker.start_feature()
+        memory_usage = memory_tracker.finish_feature()
+        assert memory_usage.traced is None
+        assert memory_usage.rss is not None
+
+
+class TestMemoryReporter(object):
+
+    def test_end__shows_features_with_largest_growth_first(self, capsys):
+        config = Configuration(["--memory-report"], load_config=False)
+        assert any(isinstance(reporter, MemoryReporter)
+                   for reporter in config.reporters)
+        reporter = MemoryReporter(config)
+        for index, rss in enumerate([1024, 5 * 1024 ** 2, None]):
+            feature = parse_feature(u"Feature: F%d\n" % index,
+                                    filename="f%d.feature" % index)
+            feature.memory_usage = MemoryUsage(rss, None)
+            reporter.feature(feature)
+        reporter.feature(parse_feature(u"Feature: F3\n"))
+        reporter.end()
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[1] == u"Memory growth per feature (RSS, traced):"
+        assert [line.split()[-1] for line in lines[2:]] == \
+               [u"F1", u"F0", u"F2"]
+        assert format_size(5 * 1024 ** 2) in lines[2]
+
+    @pytest.mark.parametrize("size, expected", [
+        (None, u"n/a"),
+        (512, u"+512.0 B"),
+        (-2048, u"-2.0 KiB"),
+        (3 * 1024 ** 3, u"+3.0 GiB"),
+    ])
+    def test_format_size(self, size, expected):
+        assert format_size(size) == expected
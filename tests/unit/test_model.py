@@ -10,7 +10,7 @@ from six.moves import range     # pylint: disable=redefined-builtin
 from six.moves import zip       # pylint: disable=redefined-builtin
 from behave.model_core import Status
 from behave.model import Feature, Scenario, ScenarioOutline, Step
-from behave.model import Table, Row
+from behave.model import Table, Row, Tag
 from behave.matchers import NoMatch
 from behave.runner import Context
 from behave.capture import CaptureController
@@ -442,6 +442,345 @@ class TestScenarioOutline(unittest.TestCase):
         assert resultFailed is True
 
 
+class TestScenarioOutlineLazyExpansion(object):
+    FEATURE_TEXT = u"""
+Feature:
+  Scenario Outline: Sweep <freq>
+    Given a signal with frequency <freq>
+    Then the amplitude is <amplitude>
+
+    Examples:
+      | freq | amplitude |
+      | 1.0  | 10        |
+      | 2.0  | 20        |
+      | 3.0  | 30        |
+"""
+
+    @staticmethod
+    def make_outline():
+        from behave.parser import parse_feature
+        feature = parse_feature(TestScenarioOutlineLazyExpansion.FEATURE_TEXT)
+        outline = feature.run_items[0]
+        assert isinstance(outline, ScenarioOutline)
+        outline.expand_lazily = True
+        return outline
+
+    @staticmethod
+    def make_runner(stop=False):
+        runner = Mock()
+        runner.context = Mock()
+        runner.config = Mock()
+        runner.config.stop = stop
+        runner.aborted = False
+        return runner
+
+    @staticmethod
+    def make_scenario_run(failed_names=None):
+        failed_names = failed_names or []
+        scenarios_run = []
+        def scenario_run(scenario, runner):
+            # pylint: disable=unused-argument
+            failed = scenario.name in failed_names
+            for step in scenario.all_steps:
+                step.status = Status.passed
+            if failed:
+                step.status = Status.failed
+                step.error_message = u"OOPS"
+            scenarios_run.append(scenario)
+            return failed
+        return scenario_run, scenarios_run
+
+    def test_run_builds_scenarios_on_demand_and_keeps_results(self):
+        from behave.model import ScenarioResult
+        outline = self.make_outline()
+        scenario_run, scenarios_run = self.make_scenario_run()
+        with patch.object(Scenario, "run", scenario_run):
+            failed = outline.run(self.make_runner())
+
+        assert not failed
+        assert len(scenarios_run) == 3
+        assert [s.name for s in scenarios_run] == [
+            u"Sweep 1.0 -- @1.1 ", u"Sweep 2.0 -- @1.2 ", u"Sweep 3.0 -- @1.3 "]
+        # pylint: disable=protected-access
+        assert all(isinstance(s, ScenarioResult) for s in outline._scenarios)
+        assert [s.name for s in outline.scenarios] == \
+               [s.name for s in scenarios_run]
+        assert outline.scenarios[0].step_statuses == \
+               (Status.passed, Status.passed)
+        assert outline.status == Status.passed
+
+    def test_run_keeps_failed_result(self):
+        outline = self.make_outline()
+        scenario_run, _ = self.make_scenario_run([u"Sweep 2.0 -- @1.2 "])
+        with patch.object(Scenario, "run", scenario_run):
+            failed = outline.run(self.make_runner())
+
+        assert failed
+        assert outline.status == Status.failed
+        assert outline.scenarios[1].status == Status.failed
+        assert outline.scenarios[1].error_message == u"OOPS"
+
+    def test_run_stops_on_first_failure_if_requested(self):
+        outline = self.make_outline()
+        scenario_run, scenarios_run = \
+            self.make_scenario_run([u"Sweep 2.0 -- @1.2 "])
+        with patch.object(Scenario, "run", scenario_run):
+            outline.run(self.make_runner(stop=True))
+        assert len(scenarios_run) == 2
+
+    def test_skip_does_not_build_scenarios(self):
+        outline = self.make_outline()
+        outline.mark_skipped()
+        # pylint: disable=protected-access
+        assert outline._scenarios == []
+        assert outline.status == Status.skipped
+
+    def test_reset_discards_results(self):
+        outline = self.make_outline()
+        scenario_run, _ = self.make_scenario_run()
+        with patch.object(Scenario, "run", scenario_run):
+            outline.run(self.make_runner())
+        outline.reset()
+        # pylint: disable=protected-access
+        assert outline._scenarios == []
+
+
+class TestRunResultsAggregation(object):
+    FEATURE_TEXT = u"""
+Feature:
+  Scenario: One
+    Given a step passes
+    When another step passes
+
+  Scenario Outline: Two <index>
+    Given a step passes
+    Examples:
+      | index |
+      | 1     |
+      | 2     |
+"""
+
+    @staticmethod
+    def make_feature():
+        from behave.parser import parse_feature
+        return parse_feature(TestRunResultsAggregation.FEATURE_TEXT)
+
+    @staticmethod
+    def make_runner():
+        runner = Mock()
+        runner.aborted = False
+        runner.config.dry_run = False
+        runner.config.name = None
+        runner.config.stop = False
+        runner.config.tag_expression.check.return_value = True
+        runner.config.show_skipped = False
+        runner.formatters = []
+        return runner
+
+    @staticmethod
+    def make_step_run(failed_names=None, duration=0.5):
+        failed_names = failed_names or []
+        def step_run(step, runner, quiet=False, capture=True):
+            # pylint: disable=unused-argument
+            step.duration = duration
+            step.status = Status.passed
+            if step.name in failed_names:
+                step.status = Status.failed
+            return step.status == Status.passed
+        return step_run
+
+    def test_scenario_uses_pushed_step_results(self):
+        scenario = self.make_feature().scenarios[0]
+        with patch.object(Step, "run", self.make_step_run()):
+            failed = scenario.run(self.make_runner())
+
+        assert not failed
+        # pylint: disable=protected-access
+        assert scenario._run_results.completed
+        assert scenario._run_results.count == 2
+        with patch.object(Scenario, "iter_steps") as iter_steps:
+            assert scenario.status == Status.passed
+            assert scenario.duration == 1.0
+            assert not iter_steps.called
+
+    def test_scenario_status_is_decided_by_first_failed_step(self):
+        scenario = self.make_feature().scenarios[0]
+        step_run = self.make_step_run([u"a step passes"])
+        with patch.object(Step, "run", step_run):
+            failed = scenario.run(self.make_runner())
+        assert failed
+        assert scenario.status == Status.failed
+        assert [step.status for step in scenario.steps] == \
+            [Status.failed, Status.skipped]
+
+    def test_feature_uses_pushed_run_item_results(self):
+        feature = self.make_feature()
+        with patch.object(Step, "run", self.make_step_run()):
+            failed = feature.run(self.make_runner())
+
+        assert not failed
+        assert feature.status == Status.passed
+        with patch.object(Scenario, "iter_steps") as iter_steps:
+            assert feature.duration == 2.0
+            assert feature.scenarios[1].duration == 1.0
+            assert not iter_steps.called
+
+    def test_reset_discards_pushed_results(self):
+        scenario = self.make_feature().scenarios[0]
+        with patch.object(Step, "run", self.make_step_run()):
+            scenario.run(self.make_runner())
+        scenario.reset()
+        assert scenario.status == Status.untested
+        assert scenario.duration == 0
+
+
+class TestEffectiveTags(object):
+    FEATURE_TEXT = u"""
+@feature_tag
+Feature:
+  @scenario_tag
+  Scenario: One
+    Given a step passes
+
+  @rule_tag
+  Rule: R1
+    @outline_tag
+    Scenario Outline: Two <index>
+      Given a step passes
+
+      @examples_tag
+      Examples:
+        | index |
+        | 1     |
+"""
+
+    @staticmethod
+    def make_feature():
+        from behave.parser import parse_feature
+        return parse_feature(TestEffectiveTags.FEATURE_TEXT,
+                             language="en")
+
+    def test_scenario_inherits_feature_tags(self):
+        scenario = self.make_feature().scenarios[0]
+        assert scenario.effective_tags == \
+            frozenset([u"feature_tag", u"scenario_tag"])
+
+    def test_rule_and_outline_tags_are_inherited(self):
+        feature = self.make_feature()
+        rule = feature.rules[0]
+        outline = rule.scenarios[0]
+        scenario = outline.scenarios[0]
+        assert rule.effective_tags == frozenset([u"feature_tag", u"rule_tag"])
+        assert outline.effective_tags == \
+            frozenset([u"feature_tag", u"rule_tag", u"outline_tag"])
+        assert scenario.effective_tags == frozenset([
+            u"feature_tag", u"rule_tag", u"outline_tag", u"examples_tag"])
+
+    def test_effective_tags_are_computed_once(self):
+        scenario = self.make_feature().scenarios[0]
+        assert scenario.effective_tags is scenario.effective_tags
+
+    def test_effective_tags_are_updated_when_tags_are_changed(self):
+        feature = self.make_feature()
+        rule = feature.rules[0]
+        scenario = rule.scenarios[0].scenarios[0]
+        assert u"added_tag" not in scenario.effective_tags
+
+        # -- LIKE: A before_feature() hook that adds tags.
+        feature.tags.append(Tag(u"added_tag", 1))
+        assert u"added_tag" in rule.effective_tags
+        assert u"added_tag" in scenario.effective_tags
+        scenario.tags = [Tag(u"other_tag", 1)]
+        assert scenario.effective_tags == frozenset([
+            u"feature_tag", u"added_tag", u"rule_tag", u"outline_tag",
+            u"other_tag"])
+
+
+class TestBackgroundStep(object):
+    FEATURE_TEXT = u"""
+Feature:
+  Background:
+    Given a device with channels:
+      | channel | range |
+      | CH1     | 1.0   |
+    And a signal generator
+
+  Scenario: One
+    When I measure
+
+  Scenario: Two
+    When I measure again
+"""
+
+    @staticmethod
+    def make_feature():
+        from behave.parser import parse_feature
+        return parse_feature(TestBackgroundStep.FEATURE_TEXT)
+
+    def test_scenarios_share_static_background_step_data(self):
+        feature = self.make_feature()
+        scenario1, scenario2 = feature.scenarios
+        background_step = feature.background.steps[0]
+        step1 = scenario1.background_steps[0]
+        step2 = scenario2.background_steps[0]
+        assert step1 is not step2
+        assert step1.step is background_step
+        assert step2.step is background_step
+        assert step1.table is background_step.table
+        assert step1.location is background_step.location
+        assert (step1.keyword, step1.name, step1.step_type) == \
+               (u"Given", u"a device with channels", "given")
+        assert scenario1.background_steps == feature.background.steps
+
+    def test_run_time_data_is_specific_to_scenario(self):
+        feature = self.make_feature()
+        scenario1, scenario2 = feature.scenarios
+        step1 = scenario1.background_steps[0]
+        step1.status = Status.failed
+        step1.error_message = u"OOPS"
+        step1.captured.stdout = u"output"
+        step1.duration = 1.5
+
+        step2 = scenario2.background_steps[0]
+        background_step = feature.background.steps[0]
+        for step in (step2, background_step):
+            assert step.status == Status.untested
+            assert step.error_message is None
+            assert not step.captured
+            assert step.duration == 0
+
+    def test_assigned_attribute_does_not_modify_shared_step(self):
+        feature = self.make_feature()
+        step1 = feature.scenarios[0].background_steps[0]
+        step1.name = u"another name"
+        step1.custom_marker = 42
+        background_step = feature.background.steps[0]
+        assert step1.name == u"another name"
+        assert background_step.name == u"a device with channels"
+        assert not hasattr(background_step, "custom_marker")
+
+    def test_reset_clears_run_time_data(self):
+        feature = self.make_feature()
+        step1 = feature.scenarios[0].background_steps[0]
+        step1.status = Status.failed
+        step1.hook_failed = True
+        step1.captured.stdout = u"output"
+        step1.reset()
+        assert step1.status == Status.untested
+        assert step1.hook_failed is False
+        assert not step1.captured
+
+    def test_can_be_copied(self):
+        import copy
+        feature = self.make_feature()
+        step1 = feature.scenarios[0].background_steps[0]
+        step1.status = Status.passed
+        step2 = copy.copy(step1)
+        assert step2.status == Status.passed
+        assert step2.step is step1.step
+        assert step2.name == step1.name
+
+
 def raiser(exception):
     def func(*args, **kwargs):    # pylint: disable=unused-argument
         raise exception
@@ -706,6 +1045,94 @@ class TestTableModel(unittest.TestCase):
     def test_table_row_items(self):
         assert list(self.table[0].items()) == list(zip(self.HEAD, self.DATA[0]))
 
+    def test_table_rows_share_heading_index(self):
+        # pylint: disable=protected-access
+        heading_index = self.table._heading_index
+        assert heading_index == {u"type of stuff": 0, u"awesomeness": 1,
+                                 u"ridiculousness": 2}
+        for row in self.table:
+            assert row._heading_index is heading_index
+            assert row.headings is self.table.headings
+
+    def test_table_row_name__after_add_column(self):
+        self.table = Table(list(self.HEAD), 0, self.DATA)
+        self.table.add_column(u"color", [u"white", u"grey", u"green"])
+        assert self.table[1]["color"] == u"grey"
+        assert self.table.get_column_index(u"color") == 3
+
+    def test_table_row_name__after_remove_column(self):
+        self.table = Table(list(self.HEAD), 0, self.DATA)
+        self.table.remove_column(u"awesomeness")
+        assert self.table[1]["ridiculousness"] == u"high"
+        with pytest.raises(KeyError):
+            self.table[1]["awesomeness"]    # pylint: disable=pointless-statement
+
+    def test_table_row_name__after_headings_were_modified(self):
+        self.table = Table(list(self.HEAD), 0, self.DATA)
+        self.table.headings[1] = u"coolness"
+        assert self.table[1]["coolness"] == u"low"
+        assert self.table[1].get("awesomeness") is None
+
+    def test_table_row_has_no_instance_dict(self):
+        row = self.table[0]
+        assert not hasattr(row, "__dict__")
+
+
+class TestTableColumnAccess(object):
+    HEAD = [u"freq", u"amplitude", u"name"]
+    DATA = [
+        [u"1.5", u"10", u"alice"],
+        [u"2.5", u"20", u"bob"],
+    ]
+
+    def make_table(self):
+        return Table(list(self.HEAD), 0, [list(row) for row in self.DATA])
+
+    def test_column__without_type(self):
+        table = self.make_table()
+        assert table.column("name") == (u"alice", u"bob")
+
+    def test_column__with_type(self):
+        table = self.make_table()
+        assert table.column("freq", type=float) == (1.5, 2.5)
+        assert table.column("amplitude", type=int) == (10, 20)
+
+    def test_column__with_index(self):
+        table = self.make_table()
+        assert table.column(1, type=int) == (10, 20)
+
+    def test_column__with_unknown_column_raises_error(self):
+        table = self.make_table()
+        with pytest.raises(KeyError):
+            table.column("__UNKNOWN__")
+
+    def test_column__is_cached(self):
+        table = self.make_table()
+        values1 = table.column("freq", type=float)
+        values2 = table.column("freq", type=float)
+        assert values1 is values2
+
+    def test_column__cache_is_cleared_on_add_row(self):
+        table = self.make_table()
+        assert table.column("freq", type=float) == (1.5, 2.5)
+        table.add_row([u"3.5", u"30", u"charly"])
+        assert table.column("freq", type=float) == (1.5, 2.5, 3.5)
+
+    def test_column__cache_is_cleared_on_remove_column(self):
+        table = self.make_table()
+        assert table.column(2) == (u"alice", u"bob")
+        table.remove_column("freq")
+        assert table.column(1) == (u"alice", u"bob")
+
+    def test_as_array(self):
+        numpy = pytest.importorskip("numpy")
+        table = self.make_table()
+        array = table.as_array(columns=["freq", "amplitude"])
+        assert array.shape == (2, 2)
+        assert numpy.allclose(array, [[1.5, 10.0], [2.5, 20.0]])
+        assert table.as_array(columns=["freq", "amplitude"]) is array
+        assert not array.flags.writeable
+
 
 class TestModelRow(unittest.TestCase):
     # pylint: disable=invalid-name, bad-whitespace
@@ -5,7 +5,8 @@
 
 from __future__ import print_function
 import six
-from behave.model_core import Status, FileLocation
+from behave.model_core import Status, FileLocation, BasicStatement, \
+    intern_text, make_bounded_intern_text
 import pytest
 
 
@@ -168,3 +169,65 @@ class TestFileLocation(object):
                        (location.filename, location.line)
             actual = repr(location)
             assert actual == expected, "FAILED: %s == %s" % (actual, expected)
+
+
+class TestBasicStatement(object):
+
+    def test_uses_slots_and_creates_extension_dict_on_demand(self):
+        from behave.model import Step
+        step = Step(u"foo.feature", 3, u"Given", u"given", u"a step")
+        assert not hasattr(FileLocation(u"foo.feature"), "__dict__")
+        assert vars(step) == {}
+
+        step.custom_data = 42
+        assert step.custom_data == 42
+        assert vars(step) == {"custom_data": 42}
+
+    def test_extension_attribute_may_override_method(self):
+        from behave.model import Scenario
+        scenario = Scenario(u"foo.feature", 3, u"Scenario", u"Alice")
+        scenario.run = lambda runner: "OVERRIDDEN"
+        assert scenario.run(None) == "OVERRIDDEN"
+
+    def test_subclass_without_slots_is_supported(self):
+        class MyStatement(BasicStatement):
+            def __init__(self, name):
+                super(MyStatement, self).__init__(u"foo.feature", 1,
+                                                  u"Keyword", name)
+                self.more_data = u"MORE"
+
+        statement = MyStatement(u"Alice")
+        assert statement.name == u"Alice"
+        assert statement.more_data == u"MORE"
+
+    def test_captured_is_created_on_demand(self):
+        statement = BasicStatement(u"foo.feature", 1, u"Keyword", u"Alice")
+        assert statement._captured is None    # pylint: disable=protected-access
+        assert not statement.captured
+        statement.captured.stdout = u"HELLO"
+        statement.reset()
+        assert not statement.captured
+
+    def test_keywords_and_filenames_are_interned(self):
+        keyword1 = u"".join([u"Giv", u"en"])
+        keyword2 = u"".join([u"Gi", u"ven"])
+        assert keyword1 is not keyword2
+        statement1 = BasicStatement(u"foo.feature", 1, keyword1, u"Alice")
+        statement2 = BasicStatement(u"foo.feature", 2, keyword2, u"Bob")
+        assert statement1.keyword is statement2.keyword
+        assert statement1.filename is statement2.filename
+
+    def test_intern_text_returns_equal_text(self):
+        text = u"".join([u"@ta", u"g1"])
+        assert intern_text(text) == text
+        assert intern_text(text) is intern_text(u"@tag1")
+
+    def test_bounded_intern_text_stores_at_most_max_size_texts(self):
+        bounded_intern_text = make_bounded_intern_text(max_size=2)
+        texts = [u"".join([u"tag", six.text_type(i)]) for i in range(3)]
+        for text in texts:
+            assert bounded_intern_text(text) is text
+        assert bounded_intern_text(u"tag1") is texts[1]
+        # -- LIMIT REACHED: Third text is not stored (and not shared).
+        assert bounded_intern_text(u"tag2") is not texts[2]
+        assert bounded_intern_text(u"tag2") == texts[2]
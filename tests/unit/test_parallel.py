@@ -0,0 +1,582 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.parallel` module.
+"""
+
+from __future__ import absolute_import
+import io
+import os
+import pickle
+import time
+from behave.exception import ConfigError
+from behave.model_core import Status
+from behave.parallel import (
+    ModelIndex, ParallelRunner, RemoteError, WorkStealingScheduler, WorkUnit,
+    make_match, make_match_data, make_transferable_exception, select_scenarios
+)
+from behave.resource_pool import ResourcePool
+from behave.run_history import RunHistory
+import pytest
+from .. import testing_support_runner
+from ..testing_support_runner import (
+    FEATURE_WITH_RULES_TEXT, make_features
+)
+
+
+requires_fork = pytest.mark.skipif(not hasattr(os, "fork"),
+                                   reason="REQUIRES: os.fork()")
+
+
+class UnpicklableError(Exception):
+    def __init__(self, value, other):
+        super(UnpicklableError, self).__init__("%s-%s" % (value, other))
+
+
+def record_pid(context, name):
+    filename = context.config.userdata.get("pid_file")
+    if filename:
+        with open(filename, "a") as f:
+            f.write("%s %d\n" % (name, os.getpid()))
+
+
+def step_with(context, x=None):
+    print("STDOUT: %s" % context.scenario.name)
+    record_pid(context, "step")
+    if x == "fail":
+        assert False, "FAILED: %s" % context.scenario.name
+    time.sleep(context.config.userdata.getfloat("delay", 0.0))
+
+
+def step_with_resource(context, name):
+    scope = context.resource_lease["scope"][0]
+    with open(context.config.userdata["resource_file"], "a") as f:
+        f.write("%s %s %f\n" % (scope, name, time.time()))
+    time.sleep(0.05)
+    with open(context.config.userdata["resource_file"], "a") as f:
+        f.write("%s %s %f\n" % (scope, name, time.time()))
+
+
+LEAKED = []
+
+
+def step_leak_memory(context):
+    record_pid(context, "step")
+    LEAKED.append(b"x" * (4 * 1024 * 1024))
+
+
+STEPS = [
+    ("given", "a background step", lambda context: None),
+    ("given", 'a step with "{x}"', step_with),
+    ("given", 'a step with scope "{name}"', step_with_resource),
+    ("given", "a leaking step", step_leak_memory),
+]
+
+
+def make_runner(tmpdir, args, features):
+    runner, outfile = testing_support_runner.make_runner(
+        tmpdir, args, features, STEPS)
+    runner.hooks["before_feature"] = \
+        lambda context, feature: record_pid(context, "before_feature")
+    return runner, outfile
+
+
+def run_model(tmpdir, args, features):
+    runner, outfile = make_runner(tmpdir, args, features)
+    failed, output = testing_support_runner.run_model(runner, outfile)
+    return failed, output, runner
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestModelIndex(object):
+
+    def test_key_of__can_be_resolved_with_same_feature(self):
+        feature1 = make_features(count=1)[0]
+        feature2 = make_features(count=1)[0]
+        model_index1 = ModelIndex(feature1)
+        model_index2 = ModelIndex(feature2)
+        step1 = list(feature1.scenarios[0].scenarios[1].all_steps)[1]
+        key = model_index1.key_of(step1)
+        step2 = model_index2.elements[key]
+        assert step2 is not step1
+        assert (step2.name, step2.line) == (step1.name, step1.line)
+
+    def test_key_of__with_unknown_element_returns_none(self):
+        feature, other = make_features(count=2)
+        model_index = ModelIndex(feature)
+        assert model_index.key_of(other) is None
+
+
+class TestSelectScenarios(object):
+
+    def test_select_scenarios__narrows_feature_temporarily(self):
+        feature = make_features(count=1,
+                                feature_text=FEATURE_WITH_RULES_TEXT)[0]
+        all_scenarios = feature.walk_scenarios()
+        selected = [all_scenarios[2], all_scenarios[4]]
+        with select_scenarios(feature, selected):
+            assert feature.walk_scenarios() == selected
+            assert [run_item.name for run_item in feature.run_items] == \
+                   [u"R1", u"R2"]
+        assert feature.walk_scenarios() == all_scenarios
+        assert len(feature.run_items[1].run_items[0].scenarios) == 2
+
+
+class TestWorkStealingScheduler(object):
+
+    @staticmethod
+    def make_work_units(count, pinned=()):
+        return [WorkUnit(index, index, None, index in pinned, None)
+                for index in range(count)]
+
+    def test_next_work_unit__uses_own_work_queue_first(self):
+        scheduler = WorkStealingScheduler(2)
+        scheduler.add_work_units(self.make_work_units(6))
+        assert scheduler.next_work_unit(0).unit_id == 0
+        assert scheduler.next_work_unit(1).unit_id == 3
+        assert scheduler.next_work_unit(1).unit_id == 4
+        assert len(scheduler) == 3
+
+    def test_next_work_unit__steals_last_work_unit_of_longest_queue(self):
+        scheduler = WorkStealingScheduler(3)
+        scheduler.add_work_units(self.make_work_units(7))
+        assert [len(work_queue) for work_queue in scheduler.work_queues] == \
+               [3, 3, 1]
+        scheduler.next_work_unit(2)
+        scheduler.next_work_unit(0)
+        assert scheduler.next_work_unit(2).unit_id == 5
+        assert scheduler.next_work_unit(2).unit_id == 2
+
+    def test_next_work_unit__never_steals_pinned_work_units(self):
+        scheduler = WorkStealingScheduler(2)
+        scheduler.add_work_units(self.make_work_units(4, pinned=(1, 3)))
+        assert [work_unit.unit_id for work_unit in scheduler.work_queues[0]] \
+               == [0, 1, 3]
+        assert scheduler.next_work_unit(1).unit_id == 2
+        assert scheduler.next_work_unit(1).unit_id == 0
+        assert scheduler.next_work_unit(1) is None
+        assert scheduler.next_work_unit(0).unit_id == 1
+
+    def test_add_work_units__with_costs_deals_longest_first(self):
+        costs = [1.0, 5.0, 2.0, 4.0, 3.0, 1.0]
+        work_units = [WorkUnit(index, index, None, index == 5, cost)
+                      for index, cost in enumerate(costs)]
+        scheduler = WorkStealingScheduler(2)
+        scheduler.add_work_units(work_units)
+        assert [[work_unit.unit_id for work_unit in work_queue]
+                for work_queue in scheduler.work_queues] == \
+               [[5, 3, 4], [1, 2, 0]]
+
+    def test_add_work_units__with_zero_costs_deals_contiguous_blocks(self):
+        work_units = [WorkUnit(index, index, None, False, 0.0)
+                      for index in range(6)]
+        scheduler = WorkStealingScheduler(3)
+        scheduler.add_work_units(work_units)
+        assert [[work_unit.unit_id for work_unit in work_queue]
+                for work_queue in scheduler.work_queues] == \
+               [[0, 1], [2, 3], [4, 5]]
+
+    def test_add_work_units__with_some_zero_costs_deals_round_robin(self):
+        costs = [4.0, 0.0, 0.0, 0.0, 0.0]
+        work_units = [WorkUnit(index, index, None, False, cost)
+                      for index, cost in enumerate(costs)]
+        scheduler = WorkStealingScheduler(2)
+        scheduler.add_work_units_longest_first(work_units)
+        assert [[work_unit.unit_id for work_unit in work_queue]
+                for work_queue in scheduler.work_queues] == \
+               [[0], [1, 2, 3, 4]]
+
+        scheduler = WorkStealingScheduler(3)
+        scheduler.add_work_units_longest_first(work_units)
+        assert [len(work_queue) for work_queue in scheduler.work_queues] == \
+               [1, 2, 2]
+
+    def test_next_work_unit__passes_over_work_units_without_resources(self):
+        resource_pool = ResourcePool.parse({"scope": "1"})
+        work_units = [WorkUnit(index, index, None, False, None, resources)
+                      for index, resources in enumerate([{"scope": 1},
+                                                         {"scope": 1}, {}])]
+        scheduler = WorkStealingScheduler(1, resource_pool)
+        scheduler.add_work_units(work_units)
+        work_unit0 = scheduler.next_work_unit(0)
+        assert work_unit0.lease == {"scope": ["scope.1"]}
+        assert scheduler.next_work_unit(0).unit_id == 2
+        assert scheduler.next_work_unit(0) is None
+        assert scheduler.has_work_units(0)
+
+        scheduler.release_work_unit(work_unit0.unit_id)
+        assert scheduler.next_work_unit(0).unit_id == 1
+        assert not scheduler.has_work_units(0)
+
+    def test_next_work_unit__batches_work_units_of_same_feature(self):
+        work_units = [WorkUnit(index, feature_index, (index,), False, 1.0,
+                               resources)
+                      for index, (feature_index, resources) in enumerate([
+                          (0, None), (0, None), (0, {"scope": 1}), (0, None),
+                          (1, None), (1, None), (1, None)])]
+        scheduler = WorkStealingScheduler(1, ResourcePool.parse({"scope": "1"}))
+        scheduler.add_work_units(work_units)
+        work_unit0 = scheduler.next_work_unit(0)
+        assert work_unit0.scenario_keys == (0, 1)
+        assert work_unit0.cost == 2.0
+        assert scheduler.select_batch(work_units[0]) == work_units[:2]
+        assert scheduler.next_work_unit(0).scenario_keys == (2, 3)
+        assert scheduler.next_work_unit(0, max_size=2).scenario_keys == (4, 5)
+        assert scheduler.next_work_unit(0).scenario_keys == (6,)
+
+        scheduler.requeue_work_unit(work_units[0])
+        assert [work_unit.unit_id for work_unit in scheduler.work_queues[0]] \
+               == [0, 1]
+
+    def test_next_work_unit__steals_from_batched_feature(self):
+        work_units = [WorkUnit(index, 0, (index,), False, None)
+                      for index in range(12)]
+        scheduler = WorkStealingScheduler(3)
+        scheduler.add_work_units(work_units)
+        assert scheduler.next_work_unit(0).scenario_keys == (0, 1)
+        assert scheduler.next_work_unit(1).scenario_keys == (4, 5)
+        assert scheduler.next_work_unit(2).scenario_keys == (8, 9)
+        assert scheduler.next_work_unit(2).scenario_keys == (10,)
+        assert scheduler.next_work_unit(2).scenario_keys == (11,)
+        # -- IDLE WORKER: Steals the tail of a batched feature.
+        assert scheduler.next_work_unit(2).scenario_keys == (3,)
+        assert scheduler.next_work_unit(2).scenario_keys == (7,)
+        assert [[work_unit.unit_id for work_unit in work_queue]
+                for work_queue in scheduler.work_queues] == [[2], [6], []]
+
+    def test_make_work_units__with_scenario_unit_and_serial_tags(self, tmpdir):
+        features = make_features(count=2, feature_text=FEATURE_WITH_RULES_TEXT)
+        features[1].tags.append(u"serial")
+        runner, _ = make_runner(tmpdir, ["--parallel-unit=scenario"], features)
+        work_units = ParallelRunner(runner, 2).make_work_units(features)
+        assert len(work_units) == 6
+        assert [work_unit.pinned for work_unit in work_units] == \
+               [False, False, False, True, False, True]
+        assert work_units[-1].scenario_keys is None
+
+    def test_make_scheduler__with_empty_run_history_uses_all_workers(self,
+                                                                     tmpdir):
+        features = make_features(count=6)
+        runner, _ = make_runner(tmpdir, [], features)
+        runner.run_history = RunHistory()
+        parallel_runner = ParallelRunner(runner, 3)
+        work_units = parallel_runner.make_work_units(features)
+        scheduler = parallel_runner.make_scheduler(work_units)
+        assert [work_unit.cost for work_unit in work_units] == [0.0] * 6
+        assert [[work_unit.unit_id for work_unit in work_queue]
+                for work_queue in scheduler.work_queues] == \
+               [[0, 1], [2, 3], [4, 5]]
+
+
+class TestTransfer(object):
+
+    def test_make_transferable_exception__with_picklable_exception(self):
+        exception = AssertionError("OOPS")
+        assert make_transferable_exception(exception) is exception
+
+    def test_make_transferable_exception__with_unpicklable_exception(self):
+        exception = make_transferable_exception(UnpicklableError(1, 2))
+        assert isinstance(exception, RemoteError)
+        assert str(exception) == "UnpicklableError: 1-2"
+        pickle.loads(pickle.dumps(exception))
+
+    def test_make_match__restores_location_and_arguments(self, tmpdir):
+        runner, _ = make_runner(tmpdir, [], [])
+        step = make_features(count=1)[0].scenarios[1].steps[0]
+        match = runner.step_registry.find_match(step)
+        match_data = pickle.loads(pickle.dumps(make_match_data(match)))
+        match2 = make_match(match_data)
+        assert match2.location == match.location
+        assert [(arg.name, arg.value) for arg in match2.arguments] == \
+               [("x", "plain")]
+
+
+@requires_fork
+class TestParallelRun(object):
+
+    def test_run__output_is_same_as_serial_run(self, tmpdir):
+        failed1, output1, _ = run_model(tmpdir, [],
+                                        make_features(fail_index=2))
+        failed2, output2, _ = run_model(tmpdir, ["--jobs=3"],
+                                        make_features(fail_index=2))
+        assert failed1 is True
+        assert failed2 is True
+        assert output2 == output1
+        assert u"FAILED: S fail" in output2
+
+    def test_run__applies_worker_results_to_model(self, tmpdir):
+        features = make_features(fail_index=1, undefined_index=3)
+        failed, _, runner = run_model(tmpdir, ["--jobs=2"], features)
+        statuses = [feature.status for feature in features]
+        assert failed is True
+        assert statuses == [Status.passed, Status.failed,
+                            Status.passed, Status.failed]
+        failed_scenario = features[1].scenarios[0].scenarios[1]
+        assert isinstance(failed_scenario.steps[0].exception, AssertionError)
+        assert u"STDOUT: S fail" in failed_scenario.captured.stdout
+        assert [step.name for step in runner.undefined_steps] == \
+               [u"an undefined step"]
+
+    def test_run__with_stop_does_not_start_more_features(self, tmpdir):
+        features = make_features(fail_index=0, count=8)
+        failed, _, _ = run_model(tmpdir, ["--jobs=2", "--stop",
+                                          "-D", "delay=0.1"], features)
+        statuses = [scenario.status for feature in features
+                    for scenario in feature.walk_scenarios()]
+        assert failed is True
+        assert features[0].status == Status.failed
+        assert Status.untested in statuses
+
+    def test_run__with_scenario_unit_is_same_as_serial_run(self, tmpdir):
+        features1 = make_features(fail_index=0, count=2,
+                                  feature_text=FEATURE_WITH_RULES_TEXT)
+        features2 = make_features(fail_index=0, count=2,
+                                  feature_text=FEATURE_WITH_RULES_TEXT)
+        failed1, output1, _ = run_model(tmpdir, [], features1)
+        failed2, output2, _ = run_model(tmpdir, ["--jobs=3",
+            "--parallel-unit=scenario"], features2)
+        assert failed1 is True
+        assert failed2 is True
+        assert output2 == output1
+        statuses1 = [scenario.status for feature in features1
+                     for scenario in feature.walk_scenarios(with_outlines=True)]
+        statuses2 = [scenario.status for feature in features2
+                     for scenario in feature.walk_scenarios(with_outlines=True)]
+        assert statuses2 == statuses1
+        assert [feature.status for feature in features2] == \
+               [Status.failed, Status.passed]
+
+    def test_run__with_scenario_unit_runs_before_feature_in_worker(self, tmpdir):
+        pid_file = str(tmpdir.join("pids.txt"))
+        features = make_features(count=2, feature_text=FEATURE_WITH_RULES_TEXT)
+        failed, _, _ = run_model(tmpdir, ["--jobs=2", "--parallel-unit=scenario",
+                                          "-D", "pid_file=%s" % pid_file],
+                                 features)
+        with open(pid_file) as f:
+            records = [line.split() for line in f]
+        feature_pids = set(pid for name, pid in records
+                           if name == "before_feature")
+        step_pids = set(pid for name, pid in records if name == "step")
+        assert failed is False
+        assert str(os.getpid()) not in feature_pids
+        assert step_pids and step_pids <= feature_pids
+
+    def test_run__with_scenario_unit_runs_feature_hooks_once_per_worker(
+            self, tmpdir):
+        pid_file = str(tmpdir.join("pids.txt"))
+        features = make_features(count=2, feature_text=FEATURE_WITH_RULES_TEXT)
+        runner, _ = make_runner(tmpdir, ["--jobs=1", "--parallel-unit=scenario",
+                                         "-D", "pid_file=%s" % pid_file],
+                                features)
+        runner.hooks["after_feature"] = \
+            lambda context, feature: record_pid(context, "after_feature")
+        failed = runner.run_model()
+
+        with open(pid_file) as f:
+            records = [line.split() for line in f]
+        assert failed is False
+        assert len([name for name, _ in records if name == "step"]) == 14
+        # -- 5 WORK UNITS PER FEATURE: Feature hooks are run once per feature.
+        assert [name for name, _ in records if name.endswith("_feature")] == \
+               ["before_feature", "after_feature"] * 2
+        assert len(set(pid for _, pid in records)) == 1
+
+    def test_run__with_scenario_unit_and_stop_computes_feature_status(
+            self, tmpdir):
+        text = u"Feature: F{index}\n"
+        for number in range(8):
+            text += (u"  Scenario: S{index}.%d\n"
+                     u'    Given a step with "%s"\n' %
+                     (number, u"{x}" if number == 0 else u"ok"))
+        features = make_features(fail_index=0, count=2, feature_text=text)
+        failed, _, _ = run_model(tmpdir, ["--jobs=2", "--parallel-unit=scenario",
+                                          "--stop", "-D", "delay=0.05"],
+                                 features)
+
+        assert failed is True
+        for feature in features:
+            statuses = [scenario.status
+                        for scenario in feature.walk_scenarios()]
+            assert Status.untested in statuses
+            # -- PARTLY RUN: Is not passed (like an aborted serial run).
+            assert feature.status != Status.passed
+
+    def test_run__with_resources_never_uses_resource_concurrently(self, tmpdir):
+        resource_file = str(tmpdir.join("resources.txt"))
+        text = u"Feature: F{index}\n"
+        for number in range(3):
+            text += (u"  @resource.scope=1\n  Scenario: S{index}.%d\n"
+                     u'    Given a step with scope "S{index}.%d"\n' %
+                     (number, number))
+        features = make_features(count=2, feature_text=text)
+        runner, _ = make_runner(tmpdir, ["--jobs=3", "--parallel-unit=scenario",
+                                         "-D", "resource_file=%s" % resource_file],
+                                features)
+        runner.config.resources = {"scope": "scope-a, scope-b"}
+        failed = runner.run_model()
+
+        with open(resource_file) as f:
+            records = [line.split() for line in f]
+        assert failed is False
+        assert len(records) == 12
+        for scope in ("scope-a", "scope-b"):
+            # -- EXCLUSIVE LEASE: Start/end records of a scenario are adjacent.
+            records.sort(key=lambda x: float(x[2]))
+            names = [name for scope2, name, _ in records if scope2 == scope]
+            assert names[0::2] == names[1::2]
+        assert set(scope for scope, _, _ in records) == \
+               set(["scope-a", "scope-b"])
+
+    @pytest.mark.parametrize("args", [[], ["--jobs=2"]])
+    @pytest.mark.parametrize("resources", [None, {"scope": "1"}])
+    def test_run__step_may_use_context_resources_attribute(self, tmpdir, args,
+                                                           resources):
+        def step_assign_resources(context):
+            context.resources = ["my-resource"]
+            assert context.resources == ["my-resource"]
+
+        text = (u"Feature: F{index}\n  Scenario: S\n"
+                u"    Given a step assigns resources\n")
+        runner, _ = make_runner(tmpdir, args,
+                                make_features(count=2, feature_text=text))
+        runner.step_registry.add_step_definition("given",
+                                                 "a step assigns resources",
+                                                 step_assign_resources)
+        runner.config.resources = resources
+        assert runner.run_model() is False
+        assert ("resource_lease" in runner.context) == bool(resources and
+                                                             not args)
+
+    def test_run__with_unknown_resource_raises_config_error(self, tmpdir):
+        text = u"Feature: F{index}\n  @resource.awg\n  Scenario: S\n"
+        runner, _ = make_runner(tmpdir, ["--jobs=2"],
+                                make_features(count=2, feature_text=text))
+        runner.config.resources = {"scope": "1"}
+        with pytest.raises(ConfigError):
+            runner.run_model()
+
+    def test_run__with_fork_server_runs_all_hooks_in_main_process(self, tmpdir):
+        pid_file = str(tmpdir.join("pids.txt"))
+
+        def before_all(context):
+            context.calibration = os.getpid()
+            record_pid(context, "before_all")
+
+        args = ["-D", "pid_file=%s" % pid_file]
+        failed1, output1, _ = run_model(tmpdir, [],
+                                        make_features(fail_index=2))
+        runner, outfile = make_runner(tmpdir, args + ["--fork-server",
+                                                      "--jobs=2"],
+                                      make_features(fail_index=2))
+        runner.hooks["before_all"] = before_all
+        runner.hooks["after_all"] = \
+            lambda context: record_pid(context, "after_all")
+        runner.hooks["before_scenario"] = lambda context, scenario: \
+            record_pid(context, "calibration=%d" % context.calibration)
+        failed2 = runner.run_model()
+        with io.open(outfile, encoding="utf-8") as f:
+            output2 = f.read()
+
+        with open(pid_file) as f:
+            records = [line.split() for line in f]
+        main_pid = str(os.getpid())
+        assert failed1 is True
+        assert failed2 is True
+        assert output2 == output1
+        assert [record for record in records if record[0].endswith("_all")] \
+               == [["before_all", main_pid], ["after_all", main_pid]]
+        assert set(name for name, _ in records
+                   if name.startswith("calibration")) == \
+               set(["calibration=%s" % main_pid])
+        assert main_pid not in set(pid for name, pid in records
+                                   if name == "step")
+
+    def test_run__with_fork_server_and_failing_before_all_starts_no_worker(
+            self, tmpdir, capfd):
+        pid_file = str(tmpdir.join("pids.txt"))
+
+        def before_all(context):
+            raise RuntimeError("OOPS: before_all")
+
+        runner, _ = make_runner(tmpdir, ["--fork-server", "--jobs=2",
+                                         "-D", "pid_file=%s" % pid_file],
+                                make_features())
+        runner.hooks["before_all"] = before_all
+        runner.hooks["after_all"] = \
+            lambda context: record_pid(context, "after_all")
+        failed = runner.run_model()
+        captured = capfd.readouterr()
+
+        with open(pid_file) as f:
+            records = [line.split() for line in f]
+        assert failed is True
+        assert captured.out.count(u"HOOK-ERROR in before_all") == 1
+        assert u"ABORTED" not in captured.out
+        assert records == [["after_all", str(os.getpid())]]
+        assert [feature.status for feature in runner.features] == \
+               [Status.untested] * 4
+
+    @pytest.mark.parametrize("fork_server", [False, True])
+    def test_run__with_max_scenarios_per_worker_recycles_worker(self, tmpdir,
+                                                                fork_server):
+        pid_file = str(tmpdir.join("pids.txt"))
+        args = ["--jobs=1", "--parallel-unit=scenario",
+                "--max-scenarios-per-worker=2", "-D", "pid_file=%s" % pid_file]
+        if fork_server:
+            args.append("--fork-server")
+        failed1, output1, _ = run_model(tmpdir, [],
+                                        make_features(fail_index=2))
+        failed2, output2, _ = run_model(tmpdir, args,
+                                        make_features(fail_index=2))
+
+        with open(pid_file) as f:
+            step_pids = [pid for name, pid in (line.split() for line in f)
+                         if name == "step"]
+        assert failed1 is True
+        assert failed2 is True
+        assert output2 == output1
+        # -- 12 SCENARIOS: Run by 6 worker processes (2 scenarios each).
+        assert len(step_pids) == 12
+        assert len(set(step_pids)) == 6
+        assert step_pids[0::2] == step_pids[1::2]
+
+    def test_run__with_max_worker_memory_recycles_leaking_worker(self, tmpdir):
+        pid_file = str(tmpdir.join("pids.txt"))
+        text = u"Feature: F{index}\n  Scenario: S\n    Given a leaking step\n"
+        features = make_features(count=4, feature_text=text)
+        failed, output, _ = run_model(tmpdir, [
+            "--max-worker-memory=6M", "--memory-report",
+            "-D", "pid_file=%s" % pid_file], features)
+
+        with open(pid_file) as f:
+            step_pids = [pid for name, pid in (line.split() for line in f)]
+        assert failed is False
+        assert output.count(u"Given a leaking step") == 4
+        # -- RECYCLED: After the second feature (RSS growth: 8 MiB).
+        assert len(set(step_pids)) == 2
+        assert str(os.getpid()) not in step_pids
+        assert all(feature.memory_usage.rss > 0 for feature in features)
+
+    @pytest.mark.parametrize("fork_server", [False, True])
+    def test_run__with_max_worker_memory_ignores_memory_of_before_all(
+            self, tmpdir, fork_server):
+        pid_file = str(tmpdir.join("pids.txt"))
+        args = ["--max-worker-memory=6M", "-D", "pid_file=%s" % pid_file]
+        if fork_server:
+            args.append("--fork-server")
+
+        def before_all(context):
+            context.calibration = b"x" * (16 * 1024 * 1024)
+
+        runner, _ = make_runner(tmpdir, args, make_features())
+        runner.hooks["before_all"] = before_all
+        failed = runner.run_model()
+
+        with open(pid_file) as f:
+            step_pids = [pid for name, pid in (line.split() for line in f)
+                         if name == "step"]
+        assert failed is False
+        assert len(step_pids) == 12
+        # -- NOT RECYCLED: Only the memory growth of the features counts.
+        assert len(set(step_pids)) == 1
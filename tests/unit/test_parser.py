@@ -1016,6 +1016,83 @@ Feature: Stuff
             parser.parse_feature(text)
 
 
+class TestParser4ExamplesDataFile(object):
+    FEATURE_TEXT = u'''
+Feature: Sweep
+
+  @foo
+  Scenario Outline: Measure <freq>
+    Given a signal with frequency <freq>
+    Then the amplitude is <amplitude>
+
+    @bar @examples.file=data/sweep.csv
+    Examples: Frequency sweep
+
+  Scenario: Another
+    Given another step
+'''.lstrip()
+
+    @staticmethod
+    def make_data_file(tmpdir, filename, text):
+        data_file = tmpdir.join(filename)
+        data_file.dirpath().ensure(dir=True)
+        data_file.write_text(text, encoding="utf-8")
+        return data_file
+
+    def test_parses_examples_with_csv_data_file(self, tmpdir):
+        self.make_data_file(tmpdir, "data/sweep.csv",
+                            u"freq,amplitude\n1.5, 10\n\n2.5,20\n")
+        filename = str(tmpdir.join("sweep.feature"))
+        feature = parser.parse_feature(self.FEATURE_TEXT, filename=filename)
+
+        assert len(feature.scenarios) == 2
+        scenario_outline = feature.scenarios[0]
+        examples = scenario_outline.examples[0]
+        assert examples.tags == [model.Tag(u"bar", 1)]
+        assert isinstance(examples.table, model.TableFile)
+        assert examples.table.headings == [u"freq", u"amplitude"]
+        assert [row.cells for row in examples.table] == [
+            [u"1.5", u"10"], [u"2.5", u"20"]
+        ]
+
+        scenarios = scenario_outline.scenarios
+        assert [s.name for s in scenarios] == [
+            u"Measure 1.5 -- @1.1 Frequency sweep",
+            u"Measure 2.5 -- @1.2 Frequency sweep",
+        ]
+        assert scenarios[1].steps[1].name == u"the amplitude is 20"
+        assert scenarios[1].line == examples.line
+        assert set(scenarios[0].tags) == set([u"foo", u"bar"])
+
+    def test_parses_examples_with_tsv_data_file(self, tmpdir):
+        self.make_data_file(tmpdir, "data/sweep.tsv",
+                            u"freq\tamplitude\n1,5\t10\n")
+        text = self.FEATURE_TEXT.replace(u"sweep.csv", u"sweep.tsv")
+        filename = str(tmpdir.join("sweep.feature"))
+        feature = parser.parse_feature(text, filename=filename)
+        examples = feature.scenarios[0].examples[0]
+        assert [row.as_dict() for row in examples.table] == [
+            {u"freq": u"1,5", u"amplitude": u"10"}
+        ]
+
+    def test_fails_to_parse_when_data_file_is_missing(self, tmpdir):
+        filename = str(tmpdir.join("sweep.feature"))
+        with pytest.raises(parser.ParserError) as exc_info:
+            parser.parse_feature(self.FEATURE_TEXT, filename=filename)
+        assert "Examples data file not found" in str(exc_info.value)
+
+    def test_fails_to_parse_when_data_file_and_table_are_used(self, tmpdir):
+        self.make_data_file(tmpdir, "data/sweep.csv", u"freq,amplitude\n")
+        text = self.FEATURE_TEXT.replace(u"Examples: Frequency sweep\n", u"""\
+Examples: Frequency sweep
+      | freq | amplitude |
+      | 1.0  | 10        |
+""")
+        filename = str(tmpdir.join("sweep.feature"))
+        with pytest.raises(parser.ParserError):
+            parser.parse_feature(text, filename=filename)
+
+
 class TestForeign(object):
     # pylint: disable=no-self-use
 
@@ -0,0 +1,61 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.resource_pool` module.
+"""
+
+from __future__ import absolute_import
+from behave.exception import ConfigError
+from behave.resource_pool import ResourcePool
+import pytest
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestResourcePool(object):
+
+    def test_parse__with_count_and_names(self):
+        resource_pool = ResourcePool.parse({"afg": "2",
+                                            "scope": "scope-a, scope-b"})
+        assert resource_pool.resources == {
+            "afg": ["afg.1", "afg.2"],
+            "scope": ["scope-a", "scope-b"],
+        }
+
+    def test_parse__without_resources_raises_error(self):
+        with pytest.raises(ConfigError):
+            ResourcePool.parse({"scope": " , "})
+
+    @pytest.mark.parametrize("tags, expected", [
+        (["resource.scope=2", "smoke"], {"scope": 2}),
+        (["resource.scope", "resource.afg=1"], {"scope": 1, "afg": 1}),
+        (["resource.scope=1", "resource.scope=3"], {"scope": 3}),
+        ([], {}),
+    ])
+    def test_parse_tags(self, tags, expected):
+        assert ResourcePool.parse_tags(tags) == expected
+
+    @pytest.mark.parametrize("tag", ["resource.scope=x", "resource.=1"])
+    def test_parse_tags__with_invalid_tag_raises_error(self, tag):
+        with pytest.raises(ConfigError):
+            ResourcePool.parse_tags([tag])
+
+    def test_check__with_too_many_or_unknown_resources_raises_error(self):
+        resource_pool = ResourcePool.parse({"scope": "2"})
+        resource_pool.check({"scope": 2})
+        with pytest.raises(ConfigError):
+            resource_pool.check({"scope": 3})
+        with pytest.raises(ConfigError):
+            resource_pool.check({"awg": 1})
+
+    def test_lease__with_conflicting_requirements_waits_for_release(self):
+        resource_pool = ResourcePool.parse({"scope": "2", "afg": "1"})
+        lease1 = resource_pool.lease({"scope": 1, "afg": 1})
+        lease2 = resource_pool.lease({"scope": 1})
+        assert lease1 == {"scope": ["scope.1"], "afg": ["afg.1"]}
+        assert lease2 == {"scope": ["scope.2"]}
+        assert resource_pool.lease({"afg": 1}) is None
+        assert resource_pool.lease({"scope": 1}) is None
+
+        resource_pool.release(lease1)
+        assert resource_pool.lease({"scope": 1, "afg": 1}) == lease1
@@ -0,0 +1,139 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.run_history` module.
+"""
+
+from __future__ import absolute_import
+from behave.model_core import Status
+from behave.run_history import RunHistory
+from .. import testing_support_runner
+
+
+FEATURE_TEXT = u"""
+Feature: F{index}
+  Scenario: A
+    Given a step
+
+  Scenario Outline: B <x>
+    Given a step
+
+    Examples:
+      | x |
+      | 1 |
+      | 2 |
+
+  Rule: R
+    Scenario: C
+      Given a step
+"""
+
+
+def make_features(count=2):
+    return testing_support_runner.make_features(count, FEATURE_TEXT)
+
+
+def make_run_history(durations, failed=()):
+    scenarios = {}
+    for key, duration in durations.items():
+        status = Status.failed if key in failed else Status.passed
+        scenarios[key] = dict(duration=duration, status=status.name)
+    return RunHistory(scenarios=scenarios)
+
+
+def scenario_names(features):
+    return [u"%s:%s" % (feature.name, scenario.name)
+            for feature in features for scenario in feature.walk_scenarios()]
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestRunHistory(object):
+
+    def test_save_and_load__roundtrip(self, tmpdir):
+        filename = str(tmpdir.join("history", "behave.history.json"))
+        feature = make_features(1)[0]
+        for scenario in feature.walk_scenarios():
+            scenario.set_status(Status.passed)
+        run_history = RunHistory.load(filename)
+        run_history.add_features([feature])
+        run_history.save()
+
+        run_history2 = RunHistory.load(filename)
+        assert run_history2.scenarios == run_history.scenarios
+        assert len(run_history2.scenarios) == 4
+
+    def test_load__with_corrupted_file_returns_empty_history(self, tmpdir):
+        filename = tmpdir.join("behave.history.json")
+        filename.write("{ CORRUPTED")
+        run_history = RunHistory.load(str(filename))
+        assert run_history.scenarios == {}
+
+    def test_add_scenario__smoothes_duration_and_ignores_skipped(self):
+        scenario1, scenario2 = make_features(1)[0].walk_scenarios()[:2]
+        run_history = make_run_history({"f0.feature:A": 4.0})
+        scenario1.set_status(Status.failed)
+        scenario1.steps[0].duration = 2.0
+        run_history.add_scenario(scenario1)
+        run_history.add_scenario(scenario2)
+        assert run_history.scenarios == {
+            "f0.feature:A": dict(duration=3.0, status="failed"),
+        }
+
+    def test_order_features__with_fast_first(self):
+        features = make_features(2)
+        run_history = make_run_history({
+            "f0.feature:A": 5.0, "f0.feature:C": 0.1,
+            "f0.feature:B 1 -- @1.1 ": 1.0, "f0.feature:B 2 -- @1.2 ": 0.5,
+            "f1.feature:A": 0.2,
+        })
+        features = run_history.order_features(features, "fast-first")
+        assert scenario_names(features) == [
+            u"F1:B 1 -- @1.1 ", u"F1:B 2 -- @1.2 ", u"F1:A", u"F1:C",
+            u"F0:B 2 -- @1.2 ", u"F0:B 1 -- @1.1 ", u"F0:A", u"F0:C",
+        ]
+
+    def test_order_features__with_failed_first(self):
+        features = make_features(2)
+        run_history = make_run_history({
+            "f0.feature:A": 1.0, "f0.feature:B 1 -- @1.1 ": 1.0,
+            "f0.feature:B 2 -- @1.2 ": 1.0, "f0.feature:C": 1.0,
+            "f1.feature:A": 1.0, "f1.feature:C": 1.0,
+        }, failed=["f1.feature:C"])
+        features = run_history.order_features(features, "failed-first")
+        assert scenario_names(features) == [
+            u"F1:B 1 -- @1.1 ", u"F1:B 2 -- @1.2 ", u"F1:A", u"F1:C",
+            u"F0:A", u"F0:B 1 -- @1.1 ", u"F0:B 2 -- @1.2 ", u"F0:C",
+        ]
+        assert features[0].run_items[-1].name == u"R"
+
+    def test_order_features__with_defined_order_keeps_order(self):
+        features = make_features(2)
+        run_history = make_run_history({"f0.feature:A": 5.0})
+        ordered = run_history.order_features(features, "defined")
+        assert ordered == features
+        assert scenario_names(ordered) == scenario_names(make_features(2))
+
+
+class TestModelRunnerWithRunHistory(object):
+
+    def test_run_model__orders_scenarios_and_updates_history(self, tmpdir):
+        filename = str(tmpdir.join("behave.history.json"))
+        names = []
+        steps = [("given", "a step",
+                  lambda context: names.append(context.scenario.name))]
+        features = make_features(1)
+        runner, _ = testing_support_runner.make_runner(
+            tmpdir, ["--order=failed-first", "-f", "null"], features, steps,
+            formatter=None)
+        runner.run_history = make_run_history({"f0.feature:A": 1.0},
+                                              failed=["f0.feature:C"])
+        runner.run_history.filename = filename
+        failed = runner.run_model()
+
+        assert failed is False
+        assert names == [u"B 1 -- @1.1 ", u"B 2 -- @1.2 ", u"A", u"C"]
+        run_history = RunHistory.load(filename)
+        assert len(run_history.scenarios) == 4
+        assert run_history.select_failed(features[0].walk_scenarios()[-1]) \
+               is False
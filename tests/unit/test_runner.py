@@ -161,6 +161,35 @@ class TestContext(unittest.TestCase):
         assert getattr(self.context, "other_thing", None) is None, "%s is not None" % self.context.other_thing
         assert getattr(self.context, "third_thing", None) is None, "%s is not None" % self.context.third_thing
 
+    def test_attribute_masked_at_lower_level_is_restored_after_pop(self):
+        self.context.thing = "stuff"
+        self.context._push()
+        self.context.thing = "other stuff"
+        self.context._push()
+        assert self.context.thing == "other stuff"
+        self.context._pop()
+        self.context._pop()
+        assert self.context.thing == "stuff"
+
+    def test_attribute_masked_at_lower_level_is_restored_after_delete(self):
+        self.context.thing = "stuff"
+        self.context._push()
+        self.context.thing = "other stuff"
+        del self.context.thing
+        assert self.context.thing == "stuff"
+        assert "thing" in self.context
+
+    def test_root_attribute_is_visible_unless_masked(self):
+        # pylint: disable=protected-access
+        self.context._push()
+        self.context._set_root_attribute("thing", "oak")
+        assert self.context.thing == "oak"
+        self.context.thing = "teak"
+        self.context._set_root_attribute("thing", "beech")
+        assert self.context.thing == "teak"
+        self.context._pop()
+        assert self.context.thing == "beech"
+
     def test_masking_existing_user_attribute_when_verbose_causes_warning(self):
         warns = []
 
@@ -267,6 +296,29 @@ class TestContext(unittest.TestCase):
             filename = filename.replace("$py", ".py")
         assert filename in info, "%r not in %r" % (filename, info)
 
+    def test_user_masking_root_attribute_of_behave_causes_warning(self):
+        # pylint: disable=protected-access
+        warns = []
+
+        def catch_warning(*args, **kwargs):
+            warns.append(args[0])
+
+        old_showwarning = warnings.showwarning
+        warnings.showwarning = catch_warning
+
+        self.context._set_root_attribute("thing", "oak")
+        with self.context.use_with_user_mode():
+            self.context._push()
+            self.context.thing = "teak"
+
+        warnings.showwarning = old_showwarning
+
+        assert self.context.thing == "teak"
+        assert warns
+        info = warns[0].args[0]
+        assert info.startswith("user code"), "%r doesn't start with 'user code'" % info
+        assert "'thing'" in info, "%r not in %r" % ("'thing'", info)
+
     def test_context_deletable(self):
         assert "thing" not in self.context
         self.context.thing = "stuff"
@@ -532,6 +584,25 @@ class TestRunner(object):
 
         assert len(hook.call_args_list) == 0
 
+    def test_use_lazy_outline_expansion__with_lazy_mode(self):
+        r = runner.Runner(Mock())
+        r.config.scenario_outline_expansion = "lazy"
+        r.config.reporters = [Mock(requires_expanded_outlines=False)]
+        r.formatters = [Mock(requires_expanded_outlines=False)]
+        assert r.use_lazy_outline_expansion()
+
+    def test_use_lazy_outline_expansion__is_disabled_by_reporter(self):
+        r = runner.Runner(Mock())
+        r.config.scenario_outline_expansion = "lazy"
+        r.config.reporters = [Mock(requires_expanded_outlines=True)]
+        r.formatters = []
+        assert not r.use_lazy_outline_expansion()
+
+    def test_use_lazy_outline_expansion__with_eager_mode(self):
+        r = runner.Runner(Mock())
+        r.config.scenario_outline_expansion = "eager"
+        assert not r.use_lazy_outline_expansion()
+
     def test_setup_capture_creates_stringio_for_stdout(self):
         r = runner.Runner(Mock())
         r.config.stdout_capture = True
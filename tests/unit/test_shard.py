@@ -0,0 +1,237 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.shard` module.
+"""
+
+from __future__ import absolute_import
+import argparse
+import io
+import json
+import os.path
+from xml.etree import ElementTree
+from behave.configuration import Configuration, parse_shard
+from behave.model_core import Status
+from behave.run_history import RunHistory
+from behave.shard import ShardSelector, merge_json_reports, merge_junit_reports
+import pytest
+from .. import testing_support_runner
+
+
+FEATURE_TEXT = u"""
+Feature: F{index}
+  Background:
+    Given a step
+
+  @smoke
+  Scenario: A{index}
+    Given a step
+
+  Scenario Outline: B{index} <x>
+    Given a step
+
+    Examples:
+      | x |
+      | 1 |
+      | 2 |
+      | 3 |
+
+  Rule: R
+    Scenario: C{index}
+      Given a step
+"""
+
+
+STEPS = [("given", "a step", lambda context: None)]
+
+
+def make_features(count=4):
+    return testing_support_runner.make_features(
+        count, FEATURE_TEXT, filename="features/f{index}.feature")
+
+
+def scenario_names(features):
+    return [scenario.name for feature in features
+            for scenario in feature.walk_scenarios()]
+
+
+def run_shard(tmpdir, name, shard=None):
+    json_file = str(tmpdir.join("%s.json" % name))
+    junit_directory = str(tmpdir.join(name))
+    args = ["-f", "json", "-o", json_file, "--junit",
+            "--junit-directory=%s" % junit_directory, "--no-summary"]
+    if shard:
+        args.append("--shard=%s" % shard)
+    runner, _ = testing_support_runner.make_runner(tmpdir, args, steps=STEPS,
+                                                   formatter=None)
+    runner.config.base_dir = str(tmpdir)
+    runner.features.extend(runner.select_shard(make_features()))
+    runner.run_model()
+    return json_file, junit_directory
+
+
+def run_shard_with_history(tmpdir, history_filename, shard):
+    names = set()
+    steps = [("given", "a step",
+              lambda context: names.add(RunHistory.make_key(
+                  context.scenario)))]
+    runner, _ = testing_support_runner.make_runner(
+        tmpdir, ["-f", "null", "--shard=%s" % shard,
+                 "--run-history=%s" % history_filename],
+        steps=steps, formatter=None)
+    runner.run_history = RunHistory.load(history_filename)
+    runner.features.extend(runner.select_shard(make_features()))
+    runner.run_model()
+    return names
+
+
+def strip_durations(data):
+    if isinstance(data, dict):
+        return dict((key, strip_durations(value))
+                    for key, value in data.items() if key != "duration")
+    elif isinstance(data, list):
+        return [strip_durations(value) for value in data]
+    return data
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestParseShard(object):
+
+    @pytest.mark.parametrize("text, expected", [
+        ("1/1", (1, 1)),
+        ("2/4", (2, 4)),
+        (" 3 / 3 ", (3, 3)),
+    ])
+    def test_parse_shard__with_valid_text(self, text, expected):
+        assert parse_shard(text) == expected
+
+    @pytest.mark.parametrize("text", ["0/2", "3/2", "1", "1/x", "-1/2"])
+    def test_parse_shard__with_invalid_text_raises_error(self, text):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(text)
+
+
+class TestShardSelector(object):
+
+    def test_select_features__shards_partition_all_scenarios(self):
+        all_names = scenario_names(make_features())
+        shard_names = []
+        for index in (1, 2, 3):
+            config = Configuration(["--tags=@smoke"], load_config=False)
+            shard_selector = ShardSelector(index, 3)
+            features = shard_selector.select_features(make_features(), config)
+            assert features, "EMPTY SHARD: %d" % index
+            shard_names.extend(scenario_names(features))
+        assert sorted(shard_names) == sorted(all_names)
+
+    def test_select_features__is_deterministic(self):
+        config = Configuration([], load_config=False)
+        names1 = scenario_names(ShardSelector(2, 3).select_features(
+            make_features(), config))
+        names2 = scenario_names(ShardSelector(2, 3).select_features(
+            make_features(), config))
+        assert names1 == names2
+
+    def test_select_features__balances_selected_scenarios_by_durations(self):
+        features = make_features(count=2)
+        run_history = RunHistory(scenarios={
+            RunHistory.make_key(scenario): dict(duration=duration,
+                                                status="passed")
+            for scenario, duration in zip(features[0].walk_scenarios(),
+                                          [8.0, 1.0, 1.0, 1.0, 4.0])
+        })
+        config = Configuration(["--tags=@smoke"], load_config=False)
+        assignment = ShardSelector(1, 2, run_history).make_assignment(
+            features, config)
+        # -- SELECTED: A0 (duration=8.0), A1 (unknown, average duration=3.0)
+        assert assignment[id(features[0].scenarios[0])] == 1
+        assert assignment[id(features[1].scenarios[0])] == 2
+
+
+class TestShardRunHistory(object):
+
+    @staticmethod
+    def make_node_histories(tmpdir, count):
+        features = make_features()
+        scenarios = dict(
+            (RunHistory.make_key(scenario),
+             dict(duration=float(position + 1), status="passed"))
+            for position, scenario in enumerate(
+                scenario for feature in features
+                for scenario in feature.walk_scenarios()))
+        filenames = []
+        for index in range(1, count + 1):
+            filename = str(tmpdir.join("node%d.history.json" % index))
+            run_history = RunHistory(filename, dict(scenarios))
+            run_history.modified = True
+            run_history.save()
+            filenames.append(filename)
+        return filenames, sorted(scenarios)
+
+    def test_run__with_run_history_partitions_scenarios_again(self, tmpdir):
+        filenames, all_names = self.make_node_histories(tmpdir, 2)
+        for _ in range(2):
+            names1 = run_shard_with_history(tmpdir, filenames[0], "1/2")
+            names2 = run_shard_with_history(tmpdir, filenames[1], "2/2")
+            assert not names1 & names2
+            assert sorted(names1 | names2) == all_names
+
+    def test_run__with_run_history_stores_results_per_shard(self, tmpdir):
+        filenames, all_names = self.make_node_histories(tmpdir, 2)
+        names1 = run_shard_with_history(tmpdir, filenames[0], "1/2")
+        shard_filename = str(tmpdir.join("node1.history.shard1.json"))
+        assert sorted(RunHistory.load(shard_filename).scenarios) == \
+               sorted(names1)
+
+        run_history = RunHistory.merge(filenames[1], [shard_filename])
+        assert sorted(run_history.scenarios) == all_names
+        for name in names1:
+            assert run_history.scenarios[name]["duration"] < \
+                   RunHistory.load(filenames[1]).scenarios[name]["duration"]
+
+
+class TestMergeReports(object):
+
+    def test_merge_json_reports__is_same_as_serial_run(self, tmpdir):
+        serial_json, _ = run_shard(tmpdir, "serial")
+        shard_jsons = [run_shard(tmpdir, "shard%d" % index, "%d/3" % index)[0]
+                       for index in (1, 2, 3)]
+        with io.open(serial_json, encoding="utf-8") as f:
+            expected = json.load(f)
+
+        merged = merge_json_reports(reversed(shard_jsons))
+        assert strip_durations(merged) == strip_durations(expected)
+
+    def test_merge_json_reports__with_failed_part_marks_feature_failed(self,
+                                                                       tmpdir):
+        for index, status in enumerate(["passed", "failed"]):
+            data = [dict(location="f.feature:1", status=status, elements=[
+                dict(type="scenario", location="f.feature:%d" % (3 + index))
+            ])]
+            tmpdir.join("%d.json" % index).write(json.dumps(data))
+
+        merged = merge_json_reports([str(tmpdir.join("0.json")),
+                                     str(tmpdir.join("1.json"))])
+        assert len(merged) == 1
+        assert merged[0]["status"] == Status.failed.name
+        assert len(merged[0]["elements"]) == 2
+
+    def test_merge_junit_reports__combines_testcases(self, tmpdir):
+        _, serial_directory = run_shard(tmpdir, "serial")
+        shard_directories = [run_shard(tmpdir, "shard%d" % index,
+                                       "%d/3" % index)[1]
+                             for index in (1, 2, 3)]
+        directory = str(tmpdir.join("merged"))
+        filenames = merge_junit_reports(shard_directories, directory)
+        assert len(filenames) == 4
+        for filename in filenames:
+            basename = os.path.basename(filename)
+            expected = ElementTree.parse(os.path.join(serial_directory,
+                                                      basename)).getroot()
+            merged = ElementTree.parse(filename).getroot()
+            assert merged.get("tests") == expected.get("tests") == "5"
+            assert sorted(case.get("name") for case in merged) == \
+                   sorted(case.get("name") for case in expected)
+            with io.open(filename, encoding="utf-8") as f:
+                assert u"<![CDATA[" in f.read()
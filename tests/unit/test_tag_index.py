@@ -0,0 +1,142 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for :mod:`behave.tag_index` module.
+"""
+
+from __future__ import absolute_import
+import os.path
+from behave.runner_util import collect_feature_locations, parse_features
+from behave.tag_expression import make_tag_expression
+from behave.tag_index import TagIndex
+
+
+FEATURE_TEXT_ALICE = u"""
+@alice
+Feature: Alice
+
+  @smoke
+  Scenario: A1
+    Given a step passes
+
+  Scenario: A2
+    Given a step passes
+"""
+
+FEATURE_TEXT_BOB = u"""
+Feature: Bob
+
+  @slow
+  Rule: R1
+    @outline.<index>
+    Scenario Outline: B1 <index>
+      Given a step passes
+
+      Examples:
+        | index |
+        | 1     |
+        | 2     |
+"""
+
+
+def write_features(directory):
+    filenames = []
+    for name, text in [("alice", FEATURE_TEXT_ALICE),
+                       ("bob", FEATURE_TEXT_BOB)]:
+        filename = directory.join("%s.feature" % name)
+        filename.write_text(text, encoding="utf-8")
+        filenames.append(str(filename))
+    return filenames
+
+
+def make_tag_index(tmpdir):
+    features_dir = tmpdir.mkdir("features")
+    filenames = write_features(features_dir)
+    tag_index = TagIndex(str(tmpdir.join("tag_index.json")))
+    parse_features(filenames, tag_index=tag_index)
+    return tag_index, str(features_dir), filenames
+
+
+# -----------------------------------------------------------------------------
+# TEST SUITE:
+# -----------------------------------------------------------------------------
+class TestTagIndex(object):
+
+    def test_parse_features_adds_features_to_tag_index(self, tmpdir):
+        tag_index, _, filenames = make_tag_index(tmpdir)
+        alice, bob = [os.path.abspath(filename) for filename in filenames]
+        assert tag_index.modified
+        assert tag_index.tag_locations[u"smoke"] == {alice: [6]}
+        assert tag_index.tag_locations[u"alice"] == {alice: [3, 6, 9]}
+        assert tag_index.tag_locations[u"outline.1"] == {bob: [12]}
+        assert tag_index.tag_locations[u"slow"] == {bob: [5, 7, 12, 13]}
+
+    def test_can_select_with_tag_expression(self, tmpdir):
+        tag_index, _, filenames = make_tag_index(tmpdir)
+        alice, bob = filenames
+        smoke = make_tag_expression("@smoke")
+        assert tag_index.can_select(alice, smoke) is True
+        assert tag_index.can_select(bob, smoke) is False
+        assert tag_index.select_lines(alice, smoke) == [6]
+        assert tag_index.select_lines(bob, make_tag_expression("@outline.2")) \
+               == [13]
+
+    def test_unknown_or_modified_file_is_not_known(self, tmpdir):
+        tag_index, _, filenames = make_tag_index(tmpdir)
+        alice = filenames[0]
+        smoke = make_tag_expression("@smoke")
+        with open(alice, "a") as f:
+            f.write("\n  Scenario: A3\n    Given another step\n")
+        assert tag_index.can_select(alice, smoke) is None
+        assert tag_index.can_select("unknown.feature", smoke) is None
+
+    def test_save_and_load_roundtrip(self, tmpdir):
+        tag_index, _, filenames = make_tag_index(tmpdir)
+        tag_index.save()
+        assert not tag_index.modified
+
+        tag_index2 = TagIndex.load(tag_index.filename)
+        assert tag_index2.files == tag_index.files
+        slow = make_tag_expression("@slow")
+        assert tag_index2.can_select(filenames[0], slow) is False
+        assert tag_index2.can_select(filenames[1], slow) is True
+
+    def test_load_with_corrupted_file_returns_empty_index(self, tmpdir):
+        filename = tmpdir.join("tag_index.json")
+        filename.write_text(u"{ NOT-JSON", encoding="utf-8")
+        tag_index = TagIndex.load(str(filename))
+        assert tag_index.files == {}
+
+    def test_collect_feature_locations_skips_unselected_features(self, tmpdir):
+        tag_index, features_dir, filenames = make_tag_index(tmpdir)
+        locations = collect_feature_locations([features_dir],
+            tag_expression=make_tag_expression("@smoke"), tag_index=tag_index)
+        assert [location.filename for location in locations] == filenames[:1]
+
+        locations = collect_feature_locations([features_dir],
+            tag_expression=make_tag_expression("not @smoke"),
+            tag_index=tag_index)
+        assert [location.filename for location in locations] == filenames
+
+    def test_modified_examples_data_file_is_not_known(self, tmpdir):
+        features_dir = tmpdir.mkdir("features")
+        data_file = features_dir.join("rows.csv")
+        data_file.write_text(u"index\n1\n", encoding="utf-8")
+        filename = features_dir.join("rows.feature")
+        filename.write_text(u"""
+Feature: Rows
+  @row.<index>
+  Scenario Outline: R <index>
+    Given a step passes
+
+    @examples.file=rows.csv
+    Examples:
+""", encoding="utf-8")
+        tag_index = TagIndex(str(tmpdir.join("tag_index.json")))
+        parse_features([str(filename)], tag_index=tag_index)
+        row2 = make_tag_expression("@row.2")
+        assert tag_index.can_select(str(filename), row2) is False
+
+        data_file.write_text(u"index\n1\n2\n", encoding="utf-8")
+        assert tag_index.can_select(str(filename), row2) is None
+        parse_features([str(filename)], tag_index=tag_index)
+        assert tag_index.can_select(str(filename), row2) is True
@@ -340,6 +340,47 @@ class TestActiveTagMatcher1(TestCase):
             self.assertEqual(not result1, result2, "%s: tags=%s" % (case, tags))
 
 
+class TestActiveTagMatcherCaching(object):
+
+    def test_should_exclude_with__retrieves_category_value_once(self):
+        value_provider = Mock()
+        value_provider.get.return_value = "alice"
+        tag_matcher = ActiveTagMatcher(value_provider)
+        tags1 = ["use.with_foo=alice", "other"]
+        tags2 = ["not.with_foo=bob"]
+        for _ in range(3):
+            assert tag_matcher.should_exclude_with(tags1) is False
+            assert tag_matcher.should_exclude_with(tags2) is False
+        value_provider.get.assert_called_once_with("foo", None)
+
+    def test_should_exclude_with__caches_tag_groups_per_tags(self):
+        tag_matcher = ActiveTagMatcher({"foo": "alice"})
+        tags = ("use.with_foo=bob", "other")
+        tag_groups = tag_matcher.select_tag_groups(tags)
+        assert tag_matcher.select_tag_groups(tags) is tag_groups
+        assert tag_matcher.should_exclude_with(list(tags)) is True
+
+    def test_should_exclude_with__provides_cached_exclude_reason(self):
+        tag_matcher = ActiveTagMatcher({"foo": "alice"})
+        tag_matcher.use_exclude_reason = True
+        tags = ["use.with_foo=bob"]
+        assert tag_matcher.should_exclude_with(tags) is True
+        tag_matcher.exclude_reason = None
+        assert tag_matcher.should_exclude_with(tags) is True
+        assert tag_matcher.exclude_reason == "foo (but: alice)"
+
+    def test_invalidate_cache__uses_changed_value_provider(self):
+        value_provider = {"foo": "alice"}
+        tag_matcher = ActiveTagMatcher(value_provider)
+        tags = ["use.with_foo=bob"]
+        assert tag_matcher.should_exclude_with(tags) is True
+
+        value_provider["foo"] = "bob"
+        assert tag_matcher.should_exclude_with(tags) is True    # -- CACHED
+        tag_matcher.invalidate_cache()
+        assert tag_matcher.should_exclude_with(tags) is False
+
+
 class TestPredicateTagMatcher(TestCase):
 
     def test_exclude_with__mechanics(self):